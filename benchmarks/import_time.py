@@ -0,0 +1,66 @@
+"""
+Benchmark for the import time of the engine, which dominates the cold
+start of the functions.
+
+Measures, in fresh interpreters, the time for importing the package, the
+lexer and the endpoints, and reports which heavy dependencies were loaded
+by each import.
+
+Usage:
+
+    python -m benchmarks.import_time [--repeat N]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+STATEMENTS = {
+    "morgana_engine": "import morgana_engine",
+    "lex": "from morgana_engine.services.interpreters.lex import lex",
+    "endpoint": "from morgana_engine import select_lambda_endpoint",
+    "endpoint + s3": (
+        "from morgana_engine import select_lambda_endpoint; import s3fs"
+    ),
+}
+
+HEAVY_DEPENDENCIES = ["pandas", "pyarrow", "s3fs", "boto3"]
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - t
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [m for m in {dependencies} if m in sys.modules],
+}}))
+"""
+
+
+def measure(statement: str) -> dict:
+    code = PROBE.format(
+        statement=statement, dependencies=repr(HEAVY_DEPENDENCIES)
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True
+    ).stdout
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'import':>16} {'seconds':>10}  loaded")
+    for name, statement in STATEMENTS.items():
+        results = [measure(statement) for _ in range(args.repeat)]
+        best = min([r["seconds"] for r in results])
+        loaded = ", ".join(results[0]["loaded"]) or "-"
+        print(f"{name:>16} {best:>10.3f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
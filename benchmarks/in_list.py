@@ -0,0 +1,113 @@
+"""
+Benchmark for queries filtering by large IN lists.
+
+Writes a synthetic table, partitioned by a grid cell, to a temporary
+directory and measures the time for lexing, validating and executing
+queries with IN lists of increasing sizes, both over a data column and
+over the partition column.
+
+Usage:
+
+    python -m benchmarks.in_list [--files N] [--rows N] [--sizes N ...]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+from morgana_engine.adapters.repository.connection import FSConnection
+
+
+def write_table(path: str, files: int, rows: int):
+    table_path = os.path.join(path, "bench")
+    os.makedirs(table_path)
+    rng = np.random.default_rng(0)
+    for i in range(files):
+        df = pd.DataFrame(
+            {
+                "usina": rng.integers(0, 1_000_000, rows),
+                "valor": rng.random(rows),
+            }
+        )
+        df.to_parquet(
+            os.path.join(table_path, f"bench-quadricula={i}.parquet.gzip"),
+            compression="gzip",
+        )
+    with open(os.path.join(table_path, "schema.json"), "w") as f:
+        json.dump(
+            {
+                "name": "bench",
+                "uri": "bench/schema.json",
+                "fileType": ".parquet.gzip",
+                "columns": [
+                    {"name": "usina", "type": "int"},
+                    {"name": "valor", "type": "float"},
+                ],
+                "partitions": [{"name": "quadricula", "type": "int"}],
+            },
+            f,
+        )
+    with open(os.path.join(path, "schema.json"), "w") as f:
+        json.dump(
+            {
+                "name": "bench",
+                "uri": "schema.json",
+                "tables": [{"name": "bench", "uri": "bench"}],
+            },
+            f,
+        )
+
+
+def run(query: str, conn: FSConnection) -> tuple[float, float, float, int]:
+    t0 = time.perf_counter()
+    statement = lex(query)
+    t1 = time.perf_counter()
+    parser = SELECTParser(statement, conn)
+    assert parser.validate() is None
+    t2 = time.perf_counter()
+    result = parser.parse()
+    t3 = time.perf_counter()
+    assert result.status and result.data is not None
+    return t1 - t0, t2 - t1, t3 - t2, len(result.data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        write_table(path, args.files, args.rows)
+        conn = FSConnection(path)
+        print(f"{args.files} files x {args.rows} rows")
+        print(
+            f"{'column':>11} {'values':>8} {'lex':>8} {'validate':>9}"
+            + f" {'execute':>8} {'rows':>9}"
+        )
+        for column in ["usina", "quadricula"]:
+            for size in args.sizes:
+                values = ", ".join([str(2 * v) for v in range(size)])
+                query = (
+                    f"SELECT {column}, valor FROM bench"
+                    + f" WHERE {column} IN ({values})"
+                )
+                lex_s, validate_s, execute_s, rows = run(query, conn)
+                print(
+                    f"{column:>11} {size:>8} {lex_s:>8.3f}"
+                    + f" {validate_s:>9.3f} {execute_s:>8.3f} {rows:>9}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark for the process pool decoding of gzip Parquet files.
+
+Writes a synthetic partitioned table to a temporary directory and
+measures the time for running the same query with an increasing number
+of worker processes, up to the number of available cores.
+
+Usage:
+
+    python -m benchmarks.process_pool [--files N] [--rows N]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.models.options import ExecutionOptions
+
+
+def write_table(path: str, files: int, rows: int):
+    table_path = os.path.join(path, "bench")
+    os.makedirs(table_path)
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2023-01-01", periods=rows, freq="h", tz="UTC")
+    for i in range(files):
+        df = pd.DataFrame(
+            {
+                "data_previsao": dates,
+                "dia_previsao": rng.integers(1, 15, rows),
+                "valor": rng.random(rows),
+            }
+        )
+        df.to_parquet(
+            os.path.join(table_path, f"bench-quadricula={i}.parquet.gzip"),
+            compression="gzip",
+        )
+    with open(os.path.join(table_path, "schema.json"), "w") as f:
+        json.dump(
+            {
+                "name": "bench",
+                "uri": "bench/schema.json",
+                "fileType": ".parquet.gzip",
+                "columns": [
+                    {"name": "data_previsao", "type": "datetime"},
+                    {"name": "dia_previsao", "type": "int"},
+                    {"name": "valor", "type": "float"},
+                ],
+                "partitions": [{"name": "quadricula", "type": "int"}],
+            },
+            f,
+        )
+    with open(os.path.join(path, "schema.json"), "w") as f:
+        json.dump(
+            {
+                "name": "bench",
+                "uri": "schema.json",
+                "tables": [{"name": "bench", "uri": "bench"}],
+            },
+            f,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    max_workers = args.max_workers or cores
+    workers = sorted(
+        {1, 2, 4, 8, 16, max_workers} & set(range(1, max_workers + 1))
+    )
+    query = "SELECT * FROM bench WHERE dia_previsao = 1"
+
+    with tempfile.TemporaryDirectory() as path:
+        write_table(path, args.files, args.rows)
+        conn = FSConnection(path)
+        print(f"{args.files} files x {args.rows} rows, {cores} cores")
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+        baseline = None
+        for w in workers:
+            options = ExecutionOptions(workers=w)
+            times = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                result = parse(lex(query), conn, options=options)
+                times.append(time.perf_counter() - t)
+                assert result.status
+            best = min(times)
+            baseline = baseline or best
+            print(f"{w:>8} {best:>10.3f} {baseline / best:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark for the peak memory of the serialization of results by the
+Lambda endpoint.
+
+Builds a synthetic result of increasing sizes in a fresh interpreter and
+measures the growth of the peak resident memory while the response is
+built, relative to the size of the result in Arrow buffers.
+
+Usage:
+
+    python -m benchmarks.serialization_memory [--rows N ...] [--format F]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from morgana_engine import engine
+from morgana_engine.models.sql import ParsingResult
+
+# The payload limit of the responses is not considered
+engine.MAX_INLINE_BODY_BYTES = float("inf")
+
+rows = {rows}
+rng = np.random.default_rng(0)
+df = pd.DataFrame(
+    {{
+        "data_previsao": pd.date_range(
+            "2023-01-01", periods=rows, freq="min", tz="UTC"
+        ),
+        "dia_previsao": rng.integers(1, 15, rows),
+        "valor": rng.random(rows),
+    }}
+)
+result_bytes = pa.Table.from_pandas(df, preserve_index=False).nbytes
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t = time.perf_counter()
+response = engine._result_response(
+    ParsingResult(status=True, message="", data=df), {request}
+)
+elapsed = time.perf_counter() - t
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "result_bytes": result_bytes,
+    "peak_bytes": (after - before) * 1024,
+    "body_bytes": len(response["body"]),
+    "seconds": elapsed,
+}}))
+"""
+
+
+def measure(rows: int, request: dict) -> dict:
+    code = PROBE.format(rows=rows, request=repr(request))
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True
+    ).stdout
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100_000, 500_000, 1_000_000]
+    )
+    parser.add_argument("--format", default="arrow")
+    parser.add_argument("--compression", default="none")
+    args = parser.parse_args()
+
+    request = {"format": args.format, "compression": args.compression}
+    print(f"{args.format}/{args.compression}")
+    print(
+        f"{'rows':>10} {'result MB':>10} {'peak MB':>10}"
+        + f" {'peak/result':>12} {'seconds':>8}"
+    )
+    for rows in args.rows:
+        m = measure(rows, request)
+        print(
+            f"{rows:>10} {m['result_bytes'] / 2**20:>10.1f}"
+            + f" {m['peak_bytes'] / 2**20:>10.1f}"
+            + f" {m['peak_bytes'] / m['result_bytes']:>12.2f}"
+            + f" {m['seconds']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,4 +8,24 @@ using SQL queries.
 
 __version__ = "0.4.0"
 
-from .engine import select_lambda_endpoint  # noqa
+# The endpoints are imported on first access, since they depend on
+# pandas and pyarrow, which dominate the import time of the package
+_LAZY_ATTRIBUTES = {
+    "select_lambda_endpoint": "morgana_engine.engine",
+    "async_select_lambda_endpoint": "morgana_engine.engine",
+    "warm_up": "morgana_engine.services.warmup",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals().keys()) + list(_LAZY_ATTRIBUTES.keys()))
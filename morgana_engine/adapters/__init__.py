@@ -1 +1,25 @@
-from .repository import connection_factory  # noqa
+# The attributes are imported on first access from the repository, as
+# in the repository package itself
+_LAZY_ATTRIBUTES = [
+    "connection_factory",
+    "connect",
+    "pin_tables",
+    "unpin_tables",
+    "write_table",
+    "remove_superseded_files",
+    "compact_table",
+]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        from morgana_engine.adapters import repository
+
+        value = getattr(repository, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals().keys()) + _LAZY_ATTRIBUTES)
@@ -1 +1,39 @@
-from .connection import factory as connection_factory  # noqa
+# The attributes are imported on first access, since most of their
+# modules depend on pandas and pyarrow, which dominate the import time
+# of the connections
+_LAZY_ATTRIBUTES = {
+    "connection_factory": (
+        "morgana_engine.adapters.repository.connection",
+        "factory",
+    ),
+    "connect": ("morgana_engine.adapters.repository.connection", "connect"),
+    "pin_tables": ("morgana_engine.adapters.repository.pinned", "pin_tables"),
+    "unpin_tables": (
+        "morgana_engine.adapters.repository.pinned",
+        "unpin_tables",
+    ),
+    "write_table": ("morgana_engine.adapters.repository.writer", "write_table"),
+    "remove_superseded_files": (
+        "morgana_engine.adapters.repository.writer",
+        "remove_superseded_files",
+    ),
+    "compact_table": (
+        "morgana_engine.adapters.repository.compaction",
+        "compact_table",
+    ),
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+
+        module, attribute = _LAZY_ATTRIBUTES[name]
+        value = getattr(import_module(module), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals().keys()) + list(_LAZY_ATTRIBUTES.keys()))
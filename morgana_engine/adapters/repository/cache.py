@@ -0,0 +1,239 @@
+import hashlib
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+
+# Extension of the files that hold the cached objects
+CACHE_FILE_EXTENSION = ".morgana-cache"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # Without a portable check, the process is assumed to be alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ObjectCache:
+    """
+    Class that keeps the contents of remote objects in files on a local
+    directory, limited by a budget of bytes, evicting the least recently
+    used objects when the budget is exceeded.
+
+    Each object is stored together with its version (i.e. the ETag or
+    the modification time), and is only served while the version that
+    is given by the caller is the same, so that modified objects are
+    fetched again.
+
+    Each process keeps its objects in its own subdirectory, named by its
+    id, so the budget is enforced for each process, such as the ones of
+    a pool, which do not share their indices. The objects of the earlier
+    processes that are no longer alive are adopted when the cache is
+    created, evicting the least recently used ones beyond the budget.
+
+    Attributes:
+    -----------
+    directory : str
+        The directory where the objects are stored.
+    max_bytes : int
+        The maximum number of bytes that are stored by each process.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._open()
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._process_directory = os.path.join(self._directory, str(self._pid))
+        self._lock = Lock()
+        # Indexed by the digests of the keys, with the digests of the
+        # versions and the sizes, as in the names of the files
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._nbytes = 0
+        os.makedirs(self._process_directory, exist_ok=True)
+        self._adopt_files()
+        self._load_index()
+
+    def _adopt_files(self):
+        """
+        Moves the objects of the processes that are no longer alive to the
+        subdirectory of this process, removing their temporary files.
+        """
+        for name in os.listdir(self._directory):
+            path = os.path.join(self._directory, name)
+            if not os.path.isdir(path):
+                # Written by the versions without subdirectories
+                if name.endswith(CACHE_FILE_EXTENSION) or name.endswith(".tmp"):
+                    os.remove(path)
+                continue
+            if not name.isdigit() or int(name) == self._pid:
+                continue
+            if _process_alive(int(name)):
+                continue
+            for f in os.listdir(path):
+                if f.endswith(CACHE_FILE_EXTENSION):
+                    os.replace(
+                        os.path.join(path, f),
+                        os.path.join(self._process_directory, f),
+                    )
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _load_index(self):
+        files = []
+        for f in os.listdir(self._process_directory):
+            path = os.path.join(self._process_directory, f)
+            parts = f[: -len(CACHE_FILE_EXTENSION)].split("-")
+            if not f.endswith(CACHE_FILE_EXTENSION) or len(parts) != 2:
+                os.remove(path)
+                continue
+            file_stat = os.stat(path)
+            files.append((file_stat.st_mtime_ns, parts, file_stat.st_size))
+        for _, (key_digest, version_digest), size in sorted(files):
+            if key_digest in self._entries:
+                self._remove(key_digest)
+            self._entries[key_digest] = (version_digest, size)
+            self._nbytes += size
+        self._evict()
+
+    def _ensure_process(self):
+        # A forked process, such as a worker of a pool, has its own files
+        if os.getpid() != self._pid:
+            self._open()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes that are currently stored.
+        """
+        return self._nbytes
+
+    @property
+    def hits(self) -> int:
+        """
+        The number of reads that were served from the local directory.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        The number of reads that had to fetch the object.
+        """
+        return self._misses
+
+    def _path(self, key_digest: str, version_digest: str) -> str:
+        return os.path.join(
+            self._process_directory,
+            f"{key_digest}-{version_digest}{CACHE_FILE_EXTENSION}",
+        )
+
+    def _remove(self, key_digest: str):
+        version_digest, size = self._entries.pop(key_digest)
+        self._nbytes -= size
+        try:
+            os.remove(self._path(key_digest, version_digest))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._nbytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def get(self, key: str, version: str) -> bytes | None:
+        """
+        Returns the content of an object if it is stored with the given
+        version, otherwise None.
+        """
+        self._ensure_process()
+        key_digest = _digest(key)
+        with self._lock:
+            entry = self._entries.get(key_digest)
+            if entry is None:
+                return None
+            if entry[0] != _digest(version):
+                self._remove(key_digest)
+                return None
+            self._entries.move_to_end(key_digest)
+            path = self._path(key_digest, entry[0])
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            # The order of use is kept for the next processes
+            os.utime(path)
+            return content
+        except FileNotFoundError:
+            with self._lock:
+                if self._entries.get(key_digest) == entry:
+                    self._remove(key_digest)
+            return None
+
+    def put(self, key: str, version: str, content: bytes):
+        """
+        Stores the content of an object with its version, evicting the
+        least recently used objects if needed. Objects that are larger
+        than the budget are not stored.
+        """
+        self._ensure_process()
+        size = len(content)
+        if size > self._max_bytes:
+            return
+        key_digest = _digest(key)
+        version_digest = _digest(version)
+        path = self._path(key_digest, version_digest)
+        # Written to a temporary file, with a unique name for each write,
+        # and renamed under the lock together with the update of the
+        # index, so that the readers never see a partial content and a
+        # concurrent eviction never removes a file that was just stored
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(content)
+            with self._lock:
+                if key_digest in self._entries:
+                    self._remove(key_digest)
+                os.replace(temp_path, path)
+                self._entries[key_digest] = (version_digest, size)
+                self._nbytes += size
+                self._evict()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def read(
+        self,
+        key: str,
+        version: str,
+        fetch: Callable[[], tuple[bytes, str]],
+    ) -> bytes:
+        """
+        Returns the content of an object, from the local directory if it
+        is stored with the given version, otherwise fetching and storing
+        it. The fetch returns the content together with its version, as
+        reported by the same response, which may be newer than the given
+        one, so that the content is never stored under a stale version.
+        """
+        content = self.get(key, version)
+        if content is not None:
+            self._hits += 1
+            return content
+        self._misses += 1
+        content, fetched_version = fetch()
+        self.put(key, fetched_version, content)
+        return content
@@ -0,0 +1,154 @@
+import math
+from typing import Any, Optional
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+
+from morgana_engine.adapters.repository.writer import (
+    DEFAULT_ROW_GROUP_SIZE,
+    FILE_COMPRESSIONS,
+    _filesystem,
+    _read_json,
+    encode_parquet,
+    list_table_files,
+    _remove_superseded,
+    write_file_atomic,
+)
+from morgana_engine.utils.sql import (
+    current_partition_files,
+    file_generation,
+    split_file_part,
+)
+
+# Size of the compacted files, which balances the number of requests
+# for reading a partition against the data read by selective queries
+DEFAULT_TARGET_FILE_BYTES = 128 * 2**20
+
+
+def _read_file(fs: Any, path: str) -> pa.Table:
+    with fs.open(path, "rb") as f:
+        table = pq.read_table(f)
+    # The indices stored by pandas are not part of the table columns
+    index_columns = [c for c in table.column_names if c.startswith("__")]
+    return table.drop_columns(index_columns).replace_schema_metadata(None)
+
+
+def _generation(name: str) -> tuple[int, int, int]:
+    generation = file_generation(split_file_part(name)[1])
+    assert generation is not None
+    return generation
+
+
+def _needs_compaction(names: list[str], count: int) -> bool:
+    if len(names) <= count:
+        return False
+    # The files of a single compaction are not compacted again
+    generations = {(g[0], g[2]) for g in map(_generation, names)}
+    return len(generations) > 1 or min(generations)[1] < 0
+
+
+def compact_table(
+    uri: str,
+    sort_by: Optional[list[str]] = None,
+    target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: Optional[str] = None,
+    remove_superseded: bool = False,
+    storage_options: Optional[dict] = None,
+) -> list[str]:
+    """
+    Merges the files of each partition of a table, such as the ones that
+    are appended by frequent ingestions, into files of about
+    `target_file_bytes`, sorted by the `sort_by` columns and with the
+    row groups, statistics and page index of `write_table`.
+
+    The merged files are a new generation of the partition, named
+    `<table>-<key>=<value>-<generation>_<index>_<count>.<ext>`, which the
+    readers only use once all of its files are written, ignoring the files
+    that it replaces from then on. The files appended while the partition
+    is compacted are kept. Only one compaction may run at a time for the
+    same table.
+
+    The queries list the files of a table before reading them, so a query
+    that started before the merge may still read the replaced files after
+    it. These are therefore kept by default, and should be removed with
+    `remove_superseded_files` only once the queries that may have listed
+    them are finished, such as after the longest query timeout. Removing
+    them with `remove_superseded` is only safe when no queries run on the
+    table during the compaction.
+
+    Parameters:
+    -----------
+    uri : str
+        The URI of the directory of the table.
+    sort_by : list[str] | None
+        The columns that sort the rows of each partition.
+    target_file_bytes : int
+        The approximate size of each merged file. The partitions that
+        already have at most the files needed for their size are kept.
+    row_group_size : int
+        The maximum number of rows in each row group.
+    compression : str | None
+        The compression of the files. If None, the one of the file type.
+    remove_superseded : bool
+        Whether the replaced files are removed right after the merge,
+        which fails the queries that already listed them.
+    storage_options : dict | None
+        The options for authenticating to the storage.
+
+    Returns:
+    --------
+    list[str]
+        The URIs of the written files.
+    """
+    fs, path = _filesystem(uri, storage_options)
+    path = path.rstrip("/")
+    schema = _read_json(fs, f"{path}/schema.json")
+    if schema is None or "columns" not in schema:
+        raise ValueError(f"Table schema not found in {uri}")
+    file_type = schema.get("fileType")
+    if file_type not in FILE_COMPRESSIONS:
+        raise ValueError(f"File type {file_type} not supported for writing")
+    # Tables without partitions are always read from a single file
+    if len(schema.get("partitions", [])) == 0:
+        return []
+
+    files = list_table_files(fs, path)
+    partitions: dict[str, list[str]] = {}
+    for name in current_partition_files(sorted(files.keys())):
+        partition, part = split_file_part(name)
+        # The files that are not named by the engine are kept as they are
+        if file_generation(part) is not None:
+            partitions.setdefault(partition, []).append(name)
+
+    written: list[str] = []
+    for partition, names in partitions.items():
+        total_bytes = sum(files[n][1] for n in names)
+        count = max(1, math.ceil(total_bytes / target_file_bytes))
+        if not _needs_compaction(names, count):
+            continue
+        table = pa.concat_tables(
+            [_read_file(fs, files[n][0]) for n in names],
+            promote_options="permissive",
+        )
+        if sort_by:
+            table = table.sort_by([(c, "ascending") for c in sort_by])
+        # Covers exactly the merged files, since the files appended
+        # meanwhile have newer generations
+        generation = max(_generation(n)[0] for n in names)
+        rows = math.ceil(table.num_rows / count)
+        for i in range(count):
+            file_path = (
+                f"{path}/{partition}-{generation}_{i}_{count}{file_type}"
+            )
+            content = encode_parquet(
+                table.slice(i * rows, rows),
+                sort_by,
+                row_group_size,
+                compression or FILE_COMPRESSIONS[file_type],
+                presorted=True,
+            )
+            write_file_atomic(fs, file_path, content)
+            written.append(fs.unstrip_protocol(file_path))
+    if remove_superseded:
+        _remove_superseded(fs, path)
+    return written
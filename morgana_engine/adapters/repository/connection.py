@@ -1,11 +1,22 @@
 from abc import ABC
+from contextlib import asynccontextmanager, closing
 import json
-from os import listdir
+import sqlite3
+from os import listdir, stat
 from os.path import join
-import s3fs  # type: ignore
 import pathlib
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Iterator,
+    TYPE_CHECKING,
+)
+from urllib.parse import urlparse, parse_qs
 
 from morgana_engine.models.schema import Schema
+from morgana_engine.models.filemetadata import FileMetadata
+from morgana_engine.adapters.repository import registry
 from morgana_engine.utils.uri import (
     is_uri,
     uri_scheme,
@@ -13,6 +24,12 @@ from morgana_engine.utils.uri import (
     path_to_uri,
     uri_to_path,
 )
+from morgana_engine.utils.sql import quote_identifier
+
+# The heavy dependencies are imported on first use, so that importing
+# the engine (e.g. in the cold start of a function) stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class Connection(ABC):
@@ -26,7 +43,7 @@ class Connection(ABC):
     """
 
     def __init__(self, *args, **kwargs) -> None:
-        self._schema: Schema | None = None
+        pass
 
     @property
     def uri(self) -> str:
@@ -35,6 +52,14 @@ class Connection(ABC):
         """
         raise NotImplementedError
 
+    @property
+    def path(self) -> str:
+        """
+        The location of the data in the storage, as expected by the
+        filesystem clients.
+        """
+        raise NotImplementedError
+
     @property
     def storage_options(self) -> dict:
         """
@@ -56,6 +81,14 @@ class Connection(ABC):
         """
         raise NotImplementedError
 
+    def list_files_metadata(self) -> dict[str, FileMetadata]:
+        """
+        Lists the metadata (size and version) of the files that are available
+        for reading in the connection's URI, indexed by the same names that
+        are returned by `list_files`.
+        """
+        raise NotImplementedError
+
     def list_partition_files(self, column: str) -> list[str]:
         """
         Lists the files that are available for reading in the connection's URI and
@@ -70,6 +103,60 @@ class Connection(ABC):
         """
         raise NotImplementedError
 
+    @property
+    def pushdown(self) -> bool:
+        """
+        Whether the tables are read with `select`, which applies the
+        projection and filters in the storage, instead of reading files.
+        """
+        return False
+
+    def select(
+        self,
+        columns: list[str],
+        where: str | None = None,
+        parameters: list | None = None,
+    ) -> Iterator["pd.DataFrame"]:
+        """
+        Reads the given columns of the table, keeping only the rows that
+        match the SQL condition in `where`, whose placeholders are replaced
+        by the `parameters`. The rows are returned in batches, with at
+        least one (maybe empty) batch.
+        """
+        raise NotImplementedError
+
+    @property
+    def pinned(self) -> bool:
+        """
+        Whether the data of the table is held in memory by the connection.
+        """
+        return False
+
+    def pinned_data(
+        self, file: str, columns: list[str] | None = None
+    ) -> "pd.DataFrame | None":
+        """
+        Returns the given columns (or all the columns) of a data file that
+        is held in memory, or None if the file is not in memory.
+        """
+        return None
+
+    def cached_content(self, file: str) -> bytes | None:
+        """
+        Returns the content of a data file from the local object cache,
+        fetching and storing it when it is missing or outdated, or None
+        if the connection does not use a cache.
+        """
+        return None
+
+    def async_filesystem(self) -> AsyncContextManager[Any]:
+        """
+        Opens an asynchronous fsspec filesystem for fetching the data
+        concurrently, which is bound to the running event loop and must
+        be used as an async context manager.
+        """
+        raise NotImplementedError
+
 
 class FSConnection(Connection):
     """
@@ -98,10 +185,17 @@ class FSConnection(Connection):
 
     @property
     def schema(self) -> Schema:
-        if self._schema is None:
-            with open(join(self.path, "schema.json"), "r") as file:
-                self._schema = Schema(json.load(file))
-        return self._schema
+        schema_path = join(self.path, "schema.json")
+
+        def __version() -> str:
+            file_stat = stat(schema_path)
+            return f"{file_stat.st_mtime_ns}-{file_stat.st_size}"
+
+        def __load() -> Schema:
+            with open(schema_path, "r") as file:
+                return Schema(json.load(file))
+
+        return registry.schema(schema_path, __version, __load)
 
     def list_files(self) -> list[str]:
         if not self.schema.is_table:
@@ -109,6 +203,22 @@ class FSConnection(Connection):
         files_with_extension = listdir(self.path)
         return [f.split(".")[0] for f in files_with_extension]
 
+    def list_files_metadata(self) -> dict[str, FileMetadata]:
+        if not self.schema.is_table:
+            raise ValueError("Cannot list files from a database schema")
+        metadata: dict[str, FileMetadata] = {}
+        for f in listdir(self.path):
+            if f == "schema.json":
+                continue
+            name = f.split(".")[0]
+            file_stat = stat(join(self.path, f))
+            metadata[name] = FileMetadata(
+                name=name,
+                size=file_stat.st_size,
+                version=f"{file_stat.st_mtime_ns}-{file_stat.st_size}",
+            )
+        return metadata
+
     def list_partition_files(self, column: str) -> list[str]:
         files = self.list_files()
         # TODO - replace simple comparison by regex
@@ -130,8 +240,8 @@ class FSConnection(Connection):
             # Field id already an URI: just access
             if is_uri(table_uri):
                 if uri_scheme(table_uri).lower() == "file":
-                    return FSConnection(
-                        table_uri, storage_options=self.storage_options
+                    return registry.connection(
+                        FSConnection, table_uri, self.storage_options
                     )
                 else:
                     raise ValueError(
@@ -140,21 +250,208 @@ class FSConnection(Connection):
             else:
                 # Field is a path: convert to URI and access
                 table_path = ensure_absolute_path(table_uri, self.path)
-                return FSConnection(
+                return registry.connection(
+                    FSConnection,
                     path_to_uri(table_path, "file"),
-                    storage_options=self.storage_options,
+                    self.storage_options,
                 )
         else:
             raise ValueError(f"Table {table_name} not found!")
 
+    @asynccontextmanager
+    async def async_filesystem(self) -> AsyncIterator[Any]:
+        from fsspec.implementations.asyn_wrapper import (  # type: ignore
+            AsyncFileSystemWrapper,
+        )
+        from fsspec.implementations.local import LocalFileSystem  # type: ignore
+
+        yield AsyncFileSystemWrapper(LocalFileSystem())
+
 
 class SQLConnection(Connection):
     """
-    TODO - is it possible to wrap a SQL database connection, transcribing
-    the required schema fields to specific DB-SQL table metadata commands?
+    Class that wraps a connection to a SQLite database, where each table
+    of the database is viewed as a table with a single data file.
+
+    The schemas are derived from the database catalog, and the reading
+    of the tables is made by SQL queries, where the projection and the
+    supported filters of the statement are pushed down, fetching the
+    rows in batches.
+
+    The connection URI has the `sqlite` scheme, such as
+    `sqlite:///path/to/db.sqlite`, and the table connections add the
+    table name as a query parameter, such as `...db.sqlite?table=name`.
     """
 
-    pass
+    BATCH_SIZE = 65536
+
+    TYPE_MAPPINGS = [
+        ("INT", "int"),
+        ("REAL", "float"),
+        ("FLOA", "float"),
+        ("DOUB", "float"),
+        ("NUM", "float"),
+        ("BOOL", "bool"),
+        ("DATETIME", "datetime"),
+        ("TIMESTAMP", "datetime"),
+        ("DATE", "date"),
+    ]
+
+    def __init__(self, uri: str, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if is_uri(uri):
+            self._uri = uri
+        else:
+            self._uri = "sqlite://" + ensure_absolute_path(uri, ".")
+        parsed = urlparse(self._uri)
+        self._table: str | None = parse_qs(parsed.query).get("table", [None])[0]
+
+    @property
+    def uri(self) -> str:
+        return self._uri
+
+    @property
+    def path(self) -> str:
+        return uri_to_path(self._uri.split("?")[0])
+
+    @property
+    def storage_options(self) -> dict:
+        return {}
+
+    @property
+    def pushdown(self) -> bool:
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+        )
+
+    @classmethod
+    def _column_type(cls, declared_type: str) -> str:
+        declared_type = declared_type.upper()
+        for affinity, column_type in cls.TYPE_MAPPINGS:
+            if affinity in declared_type:
+                return column_type
+        # Columns without a declared type (BLOB affinity) may hold values
+        # of any type, which SQLite never converts when comparing them,
+        # so their filters are not pushed down
+        if len(declared_type.strip()) == 0 or "BLOB" in declared_type:
+            return "any"
+        return "string"
+
+    def _load_schema(self) -> Schema:
+        with closing(self._connect()) as db:
+            if self._table is None:
+                names = [
+                    r[0]
+                    for r in db.execute(
+                        "SELECT name FROM sqlite_master"
+                        + " WHERE type IN ('table', 'view') ORDER BY name"
+                    )
+                ]
+                return Schema(
+                    {
+                        "name": pathlib.Path(self.path).stem,
+                        "uri": self._uri,
+                        "tables": [
+                            {"name": n, "uri": f"{self._uri}?table={n}"}
+                            for n in names
+                        ],
+                    }
+                )
+            columns = [
+                {"name": r[1], "type": self._column_type(r[2])}
+                for r in db.execute(
+                    f"PRAGMA table_info({quote_identifier(self._table)})"
+                )
+            ]
+            return Schema(
+                {
+                    "name": self._table,
+                    "uri": self._uri,
+                    "columns": columns,
+                    "partitions": [],
+                }
+            )
+
+    @property
+    def schema(self) -> Schema:
+        def __version() -> str:
+            file_stat = stat(self.path)
+            return f"{file_stat.st_mtime_ns}-{file_stat.st_size}"
+
+        return registry.schema(self._uri, __version, self._load_schema)
+
+    def list_files(self) -> list[str]:
+        if not self.schema.is_table:
+            raise ValueError("Cannot list files from a database schema")
+        return [self.schema.name]
+
+    def list_files_metadata(self) -> dict[str, FileMetadata]:
+        if not self.schema.is_table:
+            raise ValueError("Cannot list files from a database schema")
+        file_stat = stat(self.path)
+        name = self.schema.name
+        return {
+            name: FileMetadata(
+                name=name,
+                size=file_stat.st_size,
+                version=f"{file_stat.st_mtime_ns}-{file_stat.st_size}",
+            )
+        }
+
+    def list_partition_files(self, column: str) -> list[str]:
+        return []
+
+    def access(self, table_name: str) -> "Connection":
+        if not self.schema.is_database:
+            raise ValueError(
+                f"Schema {self.uri} is not associated with a database"
+            )
+        tables = self.schema.tables
+        if table_name not in tables:
+            raise ValueError(f"Table {table_name} not found!")
+        return registry.connection(
+            SQLConnection, tables[table_name], self.storage_options
+        )
+
+    def select(
+        self,
+        columns: list[str],
+        where: str | None = None,
+        parameters: list | None = None,
+    ) -> Iterator["pd.DataFrame"]:
+        if not self.schema.is_table:
+            raise ValueError("Cannot select from a database schema")
+        if len(columns) == 0:
+            columns = list(self.schema.columns.keys())
+        query = (
+            "SELECT "
+            + ", ".join([quote_identifier(c) for c in columns])
+            + f" FROM {quote_identifier(str(self._table))}"
+        )
+        if where:
+            query += f" WHERE {where}"
+        import pandas as pd
+
+        with closing(self._connect()) as db:
+            cursor = db.execute(query, parameters or [])
+            yielded = False
+            while True:
+                rows = cursor.fetchmany(self.BATCH_SIZE)
+                if len(rows) == 0 and yielded:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+                yielded = True
+                if len(rows) < self.BATCH_SIZE:
+                    break
+
+
+def _s3_filesystem(**kwargs) -> Any:
+    import s3fs  # type: ignore
+
+    return s3fs.S3FileSystem(**kwargs)
 
 
 class S3Connection(Connection):
@@ -192,7 +489,7 @@ class S3Connection(Connection):
             self._storage_options = kwargs["storage_options"]
         else:
             self._storage_options = {}
-        self._s3 = s3fs.S3FileSystem(**self._storage_options)
+        self._s3 = registry.filesystem(self._storage_options, _s3_filesystem)
 
     @property
     def uri(self) -> str:
@@ -208,20 +505,45 @@ class S3Connection(Connection):
 
     @property
     def schema(self) -> Schema:
-        if self._schema is None:
-            with self._s3.open(join(self.path, "schema.json"), "r") as file:
-                self._schema = Schema(json.load(file))
-        return self._schema
+        schema_path = join(self.path, "schema.json")
+
+        def __version() -> str:
+            info = self._s3.info(schema_path, refresh=True)
+            version = info.get("ETag") or str(info.get("LastModified", ""))
+            return version.strip('"')
+
+        def __load() -> Schema:
+            with self._s3.open(schema_path, "r") as file:
+                return Schema(json.load(file))
+
+        return registry.schema(f"s3://{schema_path}", __version, __load)
 
     def list_files(self) -> list[str]:
         if not self.schema.is_table:
             raise ValueError("Cannot list files from a database schema")
-        files_with_extension = self._s3.ls(self.uri)
+        files_with_extension = self._s3.ls(self.uri, refresh=True)
         filenames_with_extension = [
             pathlib.Path(f).parts[-1] for f in files_with_extension
         ]
         return [f.split(".")[0] for f in filenames_with_extension]
 
+    def list_files_metadata(self) -> dict[str, FileMetadata]:
+        if not self.schema.is_table:
+            raise ValueError("Cannot list files from a database schema")
+        metadata: dict[str, FileMetadata] = {}
+        for f in self._s3.ls(self.uri, detail=True, refresh=True):
+            filename = pathlib.Path(f["name"]).parts[-1]
+            if filename == "schema.json":
+                continue
+            name = filename.split(".")[0]
+            version = f.get("ETag") or str(f.get("LastModified", ""))
+            metadata[name] = FileMetadata(
+                name=name,
+                size=int(f.get("size", 0)),
+                version=version.strip('"'),
+            )
+        return metadata
+
     def list_partition_files(self, column: str) -> list[str]:
         files = self.list_files()
         # TODO - replace simple comparison by regex
@@ -243,8 +565,8 @@ class S3Connection(Connection):
             # Field id already an URI: just access
             if is_uri(table_uri):
                 if uri_scheme(table_uri).lower() == "s3":
-                    return S3Connection(
-                        table_uri, storage_options=self.storage_options
+                    return registry.connection(
+                        S3Connection, table_uri, self.storage_options
                     )
                 else:
                     raise ValueError(
@@ -253,13 +575,55 @@ class S3Connection(Connection):
             else:
                 # Field is a path: convert to URI and access
                 table_path = join(self.path, table_uri)
-                return S3Connection(
+                return registry.connection(
+                    S3Connection,
                     path_to_uri(table_path, "s3"),
-                    storage_options=self.storage_options,
+                    self.storage_options,
                 )
         else:
             raise ValueError(f"Table {table_name} not found!")
 
+    def cached_content(self, file: str) -> bytes | None:
+        cache = registry.object_cache()
+        if cache is None:
+            return None
+        path = join(self.path, file + str(self.schema.file_type))
+        info = self._s3.info(path, refresh=True)
+        return cache.read(
+            f"s3://{path}", _s3_version(info), lambda: self._fetch(path)
+        )
+
+    def _fetch(self, path: str) -> tuple[bytes, str]:
+        """
+        Fetches the content of an object together with its version. The
+        files of s3fs read the content only while it has the ETag of
+        their details, so both belong to the same object version.
+        """
+        self._s3.invalidate_cache(path)
+        with self._s3.open(path, "rb") as f:
+            content = f.read()
+            return content, _s3_version(f.details)
+
+    @asynccontextmanager
+    async def async_filesystem(self) -> AsyncIterator[Any]:
+        # The asynchronous clients are bound to the event loop where
+        # their sessions are created, so they are not shared
+        fs = _s3_filesystem(
+            asynchronous=True,
+            skip_instance_cache=True,
+            **self._storage_options,
+        )
+        session = await fs.set_session()
+        try:
+            yield fs
+        finally:
+            await session.close()
+
+
+def _s3_version(info: dict) -> str:
+    version = info.get("ETag") or str(info.get("LastModified", ""))
+    return version.strip('"')
+
 
 MAPPING: dict[str, type[Connection]] = {
     "FS": FSConnection,
@@ -270,3 +634,14 @@ MAPPING: dict[str, type[Connection]] = {
 
 def factory(kind: str) -> type[Connection]:
     return MAPPING.get(kind, S3Connection)
+
+
+def connect(
+    kind: str, uri: str, storage_options: dict | None = None
+) -> Connection:
+    """
+    Returns a connection of the given kind to an URI, reusing the one
+    that was created by a previous call in the same process, together
+    with its schemas and filesystem client.
+    """
+    return registry.connection(factory(kind), uri, storage_options)
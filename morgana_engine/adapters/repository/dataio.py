@@ -1,4 +1,5 @@
 from abc import ABC
+from io import BytesIO
 import pandas as pd
 import pyarrow as pa  # type: ignore
 import pyarrow.parquet as pq  # type: ignore
@@ -26,6 +27,14 @@ class DataIO(ABC):
         """
         raise NotImplementedError
 
+    @classmethod
+    def read_buffer(cls, content: bytes, *args, **kwargs) -> pd.DataFrame:
+        """
+        Reads the content of a file, already fetched in memory, as
+        a DataFrame.
+        """
+        raise NotImplementedError
+
     @classmethod
     def write(cls, df: pd.DataFrame, path: str, *args, **kwargs):
         """
@@ -41,6 +50,10 @@ class ParquetIO(DataIO):
     def read(cls, path: str, *args, **kwargs) -> pd.DataFrame:
         return pd.read_parquet(path + cls.EXTENSION, *args, **kwargs)
 
+    @classmethod
+    def read_buffer(cls, content: bytes, *args, **kwargs) -> pd.DataFrame:
+        return pd.read_parquet(BytesIO(content), *args, **kwargs)
+
     @classmethod
     def write(cls, df: pd.DataFrame, path: str, *args, **kwargs):
         pq.write_table(
@@ -58,6 +71,10 @@ class ParquetGzipIO(DataIO):
     def read(cls, path: str, *args, **kwargs) -> pd.DataFrame:
         return pd.read_parquet(path + cls.EXTENSION, *args, **kwargs)
 
+    @classmethod
+    def read_buffer(cls, content: bytes, *args, **kwargs) -> pd.DataFrame:
+        return pd.read_parquet(BytesIO(content), *args, **kwargs)
+
     @classmethod
     def write(cls, df: pd.DataFrame, path: str, *args, **kwargs):
         pq.write_table(
@@ -74,8 +91,18 @@ class CSVIO(DataIO):
 
     @classmethod
     def read(cls, path: str, *args, **kwargs) -> pd.DataFrame:
+        columns = kwargs.pop("columns", None)
+        if columns is not None:
+            kwargs["usecols"] = columns
         return pd.read_csv(path + cls.EXTENSION, *args, **kwargs)
 
+    @classmethod
+    def read_buffer(cls, content: bytes, *args, **kwargs) -> pd.DataFrame:
+        columns = kwargs.pop("columns", None)
+        if columns is not None:
+            kwargs["usecols"] = columns
+        return pd.read_csv(BytesIO(content), *args, **kwargs)
+
     @classmethod
     def write(cls, df: pd.DataFrame, path: str, *args, **kwargs):
         if "index" not in kwargs:
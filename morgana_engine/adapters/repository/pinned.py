@@ -0,0 +1,168 @@
+import time
+from threading import Lock
+import pandas as pd
+import pyarrow as pa  # type: ignore
+
+from morgana_engine.models.schema import Schema
+from morgana_engine.models.filemetadata import FileMetadata
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.adapters.repository.reader import FileReader
+
+
+class PinnedConnection(Connection):
+    """
+    Class that holds all the data of a table in memory, as Arrow tables,
+    serving the schema, the listings and the files of the table without
+    accessing the storage.
+
+    The source of the table is revalidated at most once every
+    `REVALIDATION_INTERVAL` seconds, by listing the file versions, and
+    only the files that were added or modified are read again.
+
+    Attributes:
+    -----------
+    source : Connection
+        The connection to the table in the storage.
+    """
+
+    REVALIDATION_INTERVAL = 60.0
+
+    def __init__(self, source: Connection, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if not source.schema.is_table:
+            raise ValueError(f"Schema {source.uri} is not a table")
+        self._source = source
+        self._lock = Lock()
+        self._schema: Schema = source.schema
+        self._files: dict[str, tuple[str, pa.Table]] = {}
+        self._checked_at = 0.0
+        self.refresh()
+
+    @property
+    def source(self) -> Connection:
+        return self._source
+
+    @property
+    def uri(self) -> str:
+        return self._source.uri
+
+    @property
+    def path(self) -> str:
+        return self._source.path
+
+    @property
+    def storage_options(self) -> dict:
+        return self._source.storage_options
+
+    @property
+    def pinned(self) -> bool:
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes held by the Arrow tables of the files.
+        """
+        return sum([t.nbytes for _, t in self._files.values()])
+
+    def _read_source_file(self, file: str) -> pa.Table:
+        if self._source.pushdown:
+            df = pd.concat(list(self._source.select([])), ignore_index=True)
+        else:
+            df = FileReader().read(self._source, file)
+        return pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+
+    def refresh(self):
+        """
+        Reads the files of the table that were added or modified in the
+        source since the last refresh, releasing the removed ones.
+        """
+        with self._lock:
+            schema = self._source.schema
+            metadata = self._source.list_files_metadata()
+            files = {
+                name: self._files[name]
+                for name, m in metadata.items()
+                if name in self._files and self._files[name][0] == m.version
+            }
+            for name, m in metadata.items():
+                if name not in files:
+                    files[name] = (m.version, self._read_source_file(name))
+            self._schema = schema
+            self._files = files
+            self._checked_at = time.monotonic()
+
+    def _revalidate(self):
+        if time.monotonic() - self._checked_at >= self.REVALIDATION_INTERVAL:
+            self.refresh()
+
+    @property
+    def schema(self) -> Schema:
+        self._revalidate()
+        return self._schema
+
+    def list_files(self) -> list[str]:
+        self._revalidate()
+        return sorted(self._files.keys())
+
+    def list_files_metadata(self) -> dict[str, FileMetadata]:
+        self._revalidate()
+        return {
+            name: FileMetadata(name=name, size=table.nbytes, version=version)
+            for name, (version, table) in self._files.items()
+        }
+
+    def list_partition_files(self, column: str) -> list[str]:
+        return [f for f in self.list_files() if f"-{column}" in f]
+
+    def access(self, table_name: str) -> "Connection":
+        raise ValueError(f"Schema {self.uri} is not associated with a database")
+
+    def pinned_data(
+        self, file: str, columns: list[str] | None = None
+    ) -> pd.DataFrame | None:
+        self._revalidate()
+        if file not in self._files:
+            return None
+        table = self._files[file][1]
+        if columns:
+            table = table.select(columns)
+        return table.to_pandas()
+
+
+def pin_tables(conn: Connection, table_names: list[str]) -> list[Connection]:
+    """
+    Pins tables of a database in memory, for the current process, so that
+    the following queries read them from memory instead of the storage.
+    The tables are read when they are pinned.
+
+    Parameters:
+    -----------
+    conn : Connection
+        The connection to the database.
+    table_names : list[str]
+        The names of the tables that are pinned.
+
+    Returns:
+    --------
+    list[Connection]
+        The connections that hold the pinned tables.
+    """
+    pinned: list[Connection] = []
+    for name in table_names:
+        table_conn = conn.access(name)
+        if not table_conn.pinned:
+            table_conn = registry.pin(PinnedConnection(table_conn))
+        pinned.append(table_conn)
+    return pinned
+
+
+def unpin_tables(conn: Connection, table_names: list[str]):
+    """
+    Releases the tables of a database that were pinned in memory.
+    """
+    for name in table_names:
+        table_conn = conn.access(name)
+        if table_conn.pinned:
+            registry.unpin(table_conn.uri)
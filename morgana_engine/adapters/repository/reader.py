@@ -0,0 +1,275 @@
+from os.path import join
+from threading import Condition
+from time import perf_counter
+from typing import Callable, Iterator
+import pandas as pd
+
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.adapters.repository.dataio import factory as io_factory
+from morgana_engine.models.filemetadata import FileMetadata
+
+
+class FileReader:
+    """
+    Class that reads the data files of a table, given a connection to the
+    table, returning only the requested columns when the file format
+    supports it.
+    """
+
+    def read(
+        self, conn: Connection, file: str, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Reads a file from the table as a DataFrame.
+
+        Parameters:
+        -----------
+        conn : Connection
+            The connection to the table where the file is located.
+        file : str
+            The filename, without extension.
+        columns : list[str] | None
+            The columns to be read. If None or empty, all the columns
+            are read.
+
+        Returns:
+        --------
+        pd.DataFrame
+            The data in the file.
+        """
+        pinned_data = conn.pinned_data(file, columns)
+        if pinned_data is not None:
+            return pinned_data
+        table_io = io_factory(str(conn.schema.file_type))
+        content = conn.cached_content(file)
+        if content is not None:
+            return table_io.read_buffer(
+                content, columns=columns if columns else None
+            )
+        return table_io.read(
+            join(conn.uri, file),
+            columns=columns if columns else None,
+            storage_options=conn.storage_options,
+        )
+
+    def select(
+        self,
+        conn: Connection,
+        file: str,
+        columns: list[str],
+        where: str | None = None,
+        parameters: list | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Reads a table from a data source that evaluates the projection and
+        the filters, such as a SQL backend, in batches.
+
+        Parameters:
+        -----------
+        conn : Connection
+            The connection to the table, which supports pushdown.
+        file : str
+            The name of the table file, as listed by the connection.
+        columns : list[str]
+            The columns to be read.
+        where : str | None
+            The SQL condition over the rows, if any.
+        parameters : list | None
+            The values of the placeholders in the condition.
+
+        Returns:
+        --------
+        Iterator[pd.DataFrame]
+            The batches of rows that match the condition.
+        """
+        return conn.select(columns, where, parameters)
+
+
+class SharedFileReader(FileReader):
+    """
+    File reader that is shared among a batch of queries, reading each
+    file only once with the union of the columns that are requested by
+    every query, and serving the queries from memory afterwards.
+
+    The files must be announced with `request` before being read, so that
+    the reader is able to know which columns must be read and when the
+    data can be released.
+    """
+
+    def __init__(self) -> None:
+        self._columns: dict[str, set[str] | None] = {}
+        self._pending: dict[str, int] = {}
+        self._data: dict[str, pd.DataFrame] = {}
+        self._reads = 0
+
+    @property
+    def reads(self) -> int:
+        """
+        The number of files that were actually read from the storage.
+        """
+        return self._reads
+
+    def request(
+        self, conn: Connection, file: str, columns: list[str] | None = None
+    ):
+        """
+        Announces that a file will be read with the given columns.
+        """
+        key = join(conn.uri, file)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        if key in self._columns:
+            known_columns = self._columns[key]
+            if known_columns is not None and columns:
+                known_columns.update(columns)
+            else:
+                self._columns[key] = None
+        else:
+            self._columns[key] = set(columns) if columns else None
+
+    def read(
+        self, conn: Connection, file: str, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        key = join(conn.uri, file)
+        if key not in self._pending:
+            return super().read(conn, file, columns)
+        if key not in self._data:
+            shared_columns = self._columns[key]
+            self._data[key] = super().read(
+                conn,
+                file,
+                sorted(shared_columns) if shared_columns else None,
+            )
+            self._reads += 1
+        df = self._data[key]
+        self._pending[key] -= 1
+        if self._pending[key] == 0:
+            self._data.pop(key)
+            self._pending.pop(key)
+            self._columns.pop(key)
+        # Shallow copies, so that the callers may add columns without
+        # changing the data that is shared with other queries
+        if columns:
+            return df[columns].copy(deep=False)
+        return df.copy(deep=False)
+
+
+class PrefetchedFileReader(FileReader):
+    """
+    File reader that serves the files whose contents are fetched in
+    advance, such as concurrently by an asynchronous filesystem, while
+    the statement is executed by another thread, reading the other files
+    from the storage.
+
+    The reads of the files that are being fetched wait for their contents,
+    and each fetched content is released after being read, when the
+    `on_release` callback is called with the connection and the file.
+    """
+
+    def __init__(
+        self, on_release: Callable[[Connection, str], None] | None = None
+    ) -> None:
+        self._contents: dict[str, bytes] = {}
+        self._fetching: set[str] = set()
+        self._read: set[str] = set()
+        self._condition = Condition()
+        self._on_release = on_release
+
+    def start(self, conn: Connection, file: str) -> bool:
+        """
+        Marks a file as being fetched, returning False if it was already
+        read, when it must not be fetched.
+        """
+        key = join(conn.uri, file)
+        with self._condition:
+            if key in self._read:
+                return False
+            self._fetching.add(key)
+            return True
+
+    def add(self, conn: Connection, file: str, content: bytes | None):
+        """
+        Stores the content of a file, which was fetched from the storage,
+        or None when the fetch failed and the file must be read again.
+        """
+        key = join(conn.uri, file)
+        with self._condition:
+            self._fetching.discard(key)
+            if content is not None:
+                self._contents[key] = content
+            self._condition.notify_all()
+
+    def read(
+        self, conn: Connection, file: str, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        key = join(conn.uri, file)
+        with self._condition:
+            self._read.add(key)
+            while key in self._fetching:
+                self._condition.wait()
+            content = self._contents.pop(key, None)
+        if content is None:
+            return super().read(conn, file, columns)
+        table_io = io_factory(str(conn.schema.file_type))
+        try:
+            return table_io.read_buffer(
+                content, columns=columns if columns else None
+            )
+        finally:
+            if self._on_release is not None:
+                self._on_release(conn, file)
+
+
+class ProfilingFileReader(FileReader):
+    """
+    File reader that records which files were read, their sizes in the
+    storage and the time spent reading them, for diagnosing the queries.
+
+    The sizes are the ones reported by the listing of each table, so they
+    are an upper bound for the bytes read from the formats that read only
+    the requested columns. The pinned files are not counted as read bytes.
+    For the data sources that evaluate the filters, such as SQL backends,
+    the bytes are the ones of the fetched rows, in memory.
+    """
+
+    def __init__(self) -> None:
+        self._metadata: dict[str, dict[str, FileMetadata]] = {}
+        self.files: list[str] = []
+        self.bytes_read = 0
+        self.seconds = 0.0
+
+    def _file_size(self, conn: Connection, file: str) -> int:
+        if conn.uri not in self._metadata:
+            self._metadata[conn.uri] = conn.list_files_metadata()
+        metadata = self._metadata[conn.uri].get(file)
+        return metadata.size if metadata is not None else 0
+
+    def read(
+        self, conn: Connection, file: str, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        start = perf_counter()
+        df = super().read(conn, file, columns)
+        self.seconds += perf_counter() - start
+        self.files.append(join(conn.uri, file))
+        if not conn.pinned:
+            self.bytes_read += self._file_size(conn, file)
+        return df
+
+    def select(
+        self,
+        conn: Connection,
+        file: str,
+        columns: list[str],
+        where: str | None = None,
+        parameters: list | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        # The URI of the connection already identifies the table
+        self.files.append(conn.uri)
+        batches = super().select(conn, file, columns, where, parameters)
+        while True:
+            start = perf_counter()
+            df = next(batches, None)
+            self.seconds += perf_counter() - start
+            if df is None:
+                return
+            self.bytes_read += int(df.memory_usage(deep=True).sum())
+            yield df
@@ -0,0 +1,246 @@
+import atexit
+import json
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, TYPE_CHECKING
+
+from morgana_engine.adapters.repository.cache import ObjectCache
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from morgana_engine.adapters.repository.connection import Connection
+
+# Process-wide caches, which survive between queries and warm
+# invocations of the same function
+_LOCK = Lock()
+_FILESYSTEMS: dict[str, Any] = {}
+_CONNECTIONS: dict[tuple[str, str, str], "Connection"] = {}
+# Schema files, indexed by location, with their versions and the
+# time of the last revalidation
+_SCHEMAS: dict[str, tuple[str, float, Any]] = {}
+
+_OBJECT_CACHE: list[ObjectCache | None] = []
+# Connections to tables that are held in memory, indexed by URI
+_PINNED: dict[str, "Connection"] = {}
+# Pools of processes for scanning the files of the queries, indexed by
+# their number of workers
+_PROCESS_POOLS: dict[int, "ProcessPoolExecutor"] = {}
+
+SCHEMA_REVALIDATION_INTERVAL = 1.0
+"""
+The minimum number of seconds between the revalidations of a cached
+schema against its file version.
+"""
+
+
+def _options_key(storage_options: dict | None) -> str:
+    return json.dumps(storage_options or {}, sort_keys=True, default=str)
+
+
+def filesystem(storage_options: dict | None, builder: Callable) -> Any:
+    """
+    Returns the filesystem client for the given storage options, building
+    it with `builder(**storage_options)` only on the first request.
+
+    Parameters:
+    -----------
+    storage_options : dict | None
+        The options for authenticating and configuring the client.
+    builder : Callable
+        The filesystem class, such as `s3fs.S3FileSystem`.
+
+    Returns:
+    --------
+    Any
+        The shared filesystem client.
+    """
+    key = f"{builder.__module__}.{builder.__qualname__}:" + _options_key(
+        storage_options
+    )
+    with _LOCK:
+        if key not in _FILESYSTEMS:
+            _FILESYSTEMS[key] = builder(**(storage_options or {}))
+        return _FILESYSTEMS[key]
+
+
+def connection(
+    connection_type: "type[Connection]",
+    uri: str,
+    storage_options: dict | None = None,
+) -> "Connection":
+    """
+    Returns the connection of the given type to an URI, constructing it
+    only on the first request, so that the schemas that were already read
+    by the connection are reused. If the table in the URI was pinned, the
+    connection that holds it in memory is returned.
+
+    Parameters:
+    -----------
+    connection_type : type[Connection]
+        The class of the connection.
+    uri : str
+        The URI of the database or table.
+    storage_options : dict | None
+        The connection options.
+
+    Returns:
+    --------
+    Connection
+        The shared connection.
+    """
+    key = (connection_type.__name__, uri, _options_key(storage_options))
+    with _LOCK:
+        if key not in _CONNECTIONS:
+            _CONNECTIONS[key] = connection_type(
+                uri, storage_options=storage_options or {}
+            )
+        conn = _CONNECTIONS[key]
+        return _PINNED.get(conn.uri, conn)
+
+
+def pin(conn: "Connection") -> "Connection":
+    """
+    Registers a connection that holds a table in memory, which replaces
+    the connections to the same URI that are returned by `connection`.
+    """
+    with _LOCK:
+        _PINNED[conn.uri] = conn
+    return conn
+
+
+def unpin(uri: str):
+    """
+    Removes the connection that holds the table in the URI in memory.
+    """
+    with _LOCK:
+        _PINNED.pop(uri, None)
+
+
+def schema(location: str, version: Callable, loader: Callable) -> Any:
+    """
+    Returns the schema that is stored in a given location, loading it
+    only when it is not cached or when its version changed. The version
+    is checked at most once every `SCHEMA_REVALIDATION_INTERVAL` seconds.
+
+    Parameters:
+    -----------
+    location : str
+        The location of the schema file, which identifies the schema.
+    version : Callable
+        A function that returns the current version of the schema file,
+        such as its ETag or modification time.
+    loader : Callable
+        A function that reads and returns the schema.
+
+    Returns:
+    --------
+    Schema
+        The cached or loaded schema.
+    """
+    now = time.monotonic()
+    with _LOCK:
+        cached = _SCHEMAS.get(location)
+    if cached is not None:
+        cached_version, checked_at, cached_schema = cached
+        if now - checked_at < SCHEMA_REVALIDATION_INTERVAL:
+            return cached_schema
+    current_version = version()
+    if cached is not None and cached_version == current_version:
+        loaded_schema = cached_schema
+    else:
+        loaded_schema = loader()
+    with _LOCK:
+        _SCHEMAS[location] = (current_version, now, loaded_schema)
+    return loaded_schema
+
+
+def object_cache() -> ObjectCache | None:
+    """
+    Returns the local cache for the objects that are read from remote
+    storages, if any. Unless it was set with `set_object_cache`, the cache
+    is created on the first call when the `MORGANA_CACHE_DIRECTORY` and
+    `MORGANA_CACHE_BYTES` environment variables are given.
+    """
+    with _LOCK:
+        if len(_OBJECT_CACHE) == 0:
+            directory = os.environ.get("MORGANA_CACHE_DIRECTORY")
+            max_bytes = os.environ.get("MORGANA_CACHE_BYTES")
+            _OBJECT_CACHE.append(
+                ObjectCache(directory, int(max_bytes))
+                if directory and max_bytes
+                else None
+            )
+        return _OBJECT_CACHE[0]
+
+
+def set_object_cache(cache: ObjectCache | None):
+    """
+    Sets the local cache for the objects that are read from remote
+    storages. If None, the objects are always fetched.
+    """
+    with _LOCK:
+        _OBJECT_CACHE[:] = [cache]
+
+
+def process_pool(workers: int) -> "ProcessPoolExecutor":
+    """
+    Returns the pool with the given number of processes, starting it only
+    on the first request, so that the queries and their subqueries share
+    the processes instead of starting new ones for each table.
+
+    Parameters:
+    -----------
+    workers : int
+        The number of processes of the pool.
+
+    Returns:
+    --------
+    ProcessPoolExecutor
+        The shared pool.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _LOCK:
+        if workers not in _PROCESS_POOLS:
+            _PROCESS_POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+        return _PROCESS_POOLS[workers]
+
+
+def _shutdown_process_pools():
+    with _LOCK:
+        pools = list(_PROCESS_POOLS.values())
+        _PROCESS_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# The pools are stopped before the interpreter tears down the modules
+# that are used by their management threads
+atexit.register(_shutdown_process_pools)
+
+
+def discard_process_pool(pool: "ProcessPoolExecutor"):
+    """
+    Removes a pool from the registry, such as when one of its processes
+    died, so that a new one is started on the next request.
+    """
+    with _LOCK:
+        for workers, registered in list(_PROCESS_POOLS.items()):
+            if registered is pool:
+                del _PROCESS_POOLS[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def clear():
+    """
+    Removes all the filesystem clients, connections, schemas and pinned
+    tables from the registry, and shuts down the process pools.
+    """
+    with _LOCK:
+        _FILESYSTEMS.clear()
+        _CONNECTIONS.clear()
+        _SCHEMAS.clear()
+        _OBJECT_CACHE.clear()
+        _PINNED.clear()
+    _shutdown_process_pools()
@@ -0,0 +1,200 @@
+import os
+import tempfile
+from typing import Iterator
+import pandas as pd
+import pyarrow as pa  # type: ignore
+
+from morgana_engine.utils.ipc import has_null_fields, promote_null_fields
+
+
+class ResultBuffer:
+    """
+    Class that accumulates the partial results of a query as Arrow tables,
+    keeping track of the memory used by their buffers.
+
+    When a memory budget is given and the buffered tables exceed it, they
+    are spilled to a local file in the Arrow IPC format and released from
+    memory. The spilled batches are streamed back, memory-mapped, when the
+    result is consumed.
+
+    The schema is the one of the first non-empty partial result. Its
+    columns whose values were all missing, which have the null type, get
+    the type of the first partial result that has values for them, when
+    the buffered data is casted to it.
+
+    Attributes:
+    -----------
+    memory_budget : int | None
+        The maximum number of bytes that may be kept in memory. If None,
+        the data is never spilled.
+    directory : str | None
+        The directory where the spill file is created. If None, the
+        default temporary directory is used.
+    """
+
+    def __init__(
+        self, memory_budget: int | None = None, directory: str | None = None
+    ) -> None:
+        self._memory_budget = memory_budget
+        self._directory = directory
+        self._tables: list[pa.Table] = []
+        self._nbytes = 0
+        self._num_rows = 0
+        self._schema: pa.Schema | None = None
+        # The schema of the empty partial results, for an empty buffer
+        self._empty_schema: pa.Schema | None = None
+        self._spill_path: str | None = None
+        self._spill_file: pa.OSFile | None = None
+        self._spill_writer: pa.ipc.RecordBatchFileWriter | None = None
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes that are currently held in memory.
+        """
+        return self._nbytes
+
+    @property
+    def num_rows(self) -> int:
+        """
+        The total number of rows in the buffer.
+        """
+        return self._num_rows
+
+    @property
+    def spilled(self) -> bool:
+        """
+        Whether some of the data was spilled to disk.
+        """
+        return self._spill_path is not None
+
+    @property
+    def schema(self) -> pa.Schema | None:
+        """
+        The schema of the buffered data, if any data was appended.
+        """
+        if self._schema is None:
+            return self._empty_schema
+        return self._schema
+
+    def append(self, df: pd.DataFrame):
+        """
+        Appends a partial result to the buffer, spilling the buffered
+        data to disk if the memory budget is exceeded.
+        """
+        self.append_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def append_table(self, table: pa.Table):
+        """
+        Appends a partial result that is already an Arrow table to the
+        buffer, spilling the buffered data to disk if the memory budget
+        is exceeded.
+        """
+        if table.num_rows == 0:
+            if self._empty_schema is None:
+                self._empty_schema = table.schema
+            return
+        if self._schema is None:
+            self._schema = table.schema
+        elif not table.schema.equals(self._schema, check_metadata=False):
+            if has_null_fields(self._schema):
+                self._promote(promote_null_fields(self._schema, table.schema))
+            table = table.cast(self._schema)
+        self._tables.append(table)
+        self._nbytes += table.nbytes
+        self._num_rows += table.num_rows
+        if (
+            self._memory_budget is not None
+            and self._nbytes > self._memory_budget
+        ):
+            self._spill()
+
+    def _promote(self, schema: pa.Schema):
+        """
+        Casts the buffered data to a schema whose null-typed columns got
+        a type, rewriting the spill file if some data was spilled.
+        """
+        if schema.equals(self._schema, check_metadata=False):
+            return
+        self._schema = schema
+        self._tables = [t.cast(schema) for t in self._tables]
+        self._nbytes = sum(t.nbytes for t in self._tables)
+        if self._spill_path is None:
+            return
+        self._close_spill_writer()
+        spill_path = self._spill_path
+        fd, self._spill_path = tempfile.mkstemp(
+            prefix="morgana-", suffix=".arrow", dir=self._directory
+        )
+        os.close(fd)
+        self._spill_file = pa.OSFile(self._spill_path, "wb")
+        self._spill_writer = pa.ipc.new_file(self._spill_file, schema)
+        with pa.memory_map(spill_path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                self._spill_writer.write_batch(reader.get_batch(i).cast(schema))
+        os.remove(spill_path)
+
+    def _spill(self):
+        if self._spill_writer is None:
+            fd, self._spill_path = tempfile.mkstemp(
+                prefix="morgana-", suffix=".arrow", dir=self._directory
+            )
+            os.close(fd)
+            self._spill_file = pa.OSFile(self._spill_path, "wb")
+            self._spill_writer = pa.ipc.new_file(self._spill_file, self._schema)
+        for table in self._tables:
+            self._spill_writer.write_table(table)
+        self._tables = []
+        self._nbytes = 0
+
+    def _close_spill_writer(self):
+        if self._spill_writer is not None:
+            self._spill_writer.close()
+            self._spill_writer = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def iter_batches(self) -> Iterator[pa.RecordBatch]:
+        """
+        Iterates over the buffered data as record batches, in the same
+        order they were appended, reading the spilled ones from disk.
+        """
+        self._close_spill_writer()
+        if self._spill_path is not None:
+            with pa.memory_map(self._spill_path, "r") as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i)
+        for table in self._tables:
+            yield from table.to_batches()
+
+    def to_arrow(self) -> pa.Table:
+        """
+        Returns all the buffered data as a single Arrow table.
+        """
+        if self.schema is None:
+            return pa.table({})
+        return pa.Table.from_batches(list(self.iter_batches()), self.schema)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Returns all the buffered data as a single DataFrame.
+        """
+        return self.to_arrow().to_pandas()
+
+    def close(self):
+        """
+        Releases the buffered data and removes the spill file, if any.
+        """
+        self._close_spill_writer()
+        if self._spill_path is not None:
+            if os.path.exists(self._spill_path):
+                os.remove(self._spill_path)
+            self._spill_path = None
+        self._tables = []
+        self._nbytes = 0
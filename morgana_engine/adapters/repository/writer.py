@@ -0,0 +1,414 @@
+import json
+import time
+import uuid
+from typing import Any, Optional, Union
+import numpy as np
+import pandas as pd
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+
+from morgana_engine.utils.sql import (
+    split_file_part,
+    superseded_partition_files,
+)
+
+# Number of rows in each row group of the written files. Smaller groups
+# allow finer pruning by their statistics, at the cost of more metadata
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+
+# Compression of the data files, for each file type of the tables
+FILE_COMPRESSIONS: dict[str, str] = {
+    ".parquet": "snappy",
+    ".parquet.gzip": "gzip",
+}
+
+# Characters that would break the parsing of the filenames, which
+# are split on dots and dashes, and the partitions on equals signs
+_RESERVED_CHARACTERS = ".-=/\\"
+
+
+def _schema_type(data_type: pa.DataType) -> str:
+    if pa.types.is_boolean(data_type):
+        return "bool"
+    if pa.types.is_integer(data_type):
+        return "int"
+    if pa.types.is_floating(data_type):
+        return "float"
+    if pa.types.is_timestamp(data_type):
+        return "datetime"
+    if pa.types.is_date(data_type):
+        return "date"
+    return "string"
+
+
+def _validate_name(name: str, kind: str) -> str:
+    if len(name) == 0 or any(c in name for c in _RESERVED_CHARACTERS):
+        raise ValueError(
+            f"Invalid {kind} {name!r}: must not be empty or contain any"
+            + f" of {_RESERVED_CHARACTERS!r}"
+        )
+    return name
+
+
+def _filesystem(uri: str, storage_options: Optional[dict]) -> tuple[Any, str]:
+    import fsspec  # type: ignore
+
+    return fsspec.core.url_to_fs(uri, **(storage_options or {}))
+
+
+def write_file_atomic(fs: Any, path: str, content: Union[bytes, pa.Buffer]):
+    """
+    Writes a file that replaces any existing one in a single step for the
+    readers. In local filesystems, the content is written to a hidden
+    temporary file, which is then renamed. Object storages already
+    publish the objects only when they are completely written.
+    """
+    if "file" not in fs.protocol:
+        with fs.open(path, "wb") as f:
+            f.write(memoryview(content))
+        return
+    directory, _, filename = path.rpartition("/")
+    temporary_path = f"{directory}/.{uuid.uuid4().hex}-{filename}"
+    try:
+        with fs.open(temporary_path, "wb") as f:
+            f.write(memoryview(content))
+        fs.mv(temporary_path, path)
+    finally:
+        if fs.exists(temporary_path):
+            fs.rm(temporary_path)
+
+
+def list_table_files(fs: Any, path: str) -> dict[str, tuple[str, int]]:
+    """
+    Lists the data files of a table, returning their paths and sizes
+    indexed by their names without extensions, as listed by the
+    connections. The schema and the hidden temporary files are skipped.
+    """
+    files: dict[str, tuple[str, int]] = {}
+    for f in fs.ls(path, detail=True, refresh=True):
+        filename = f["name"].rstrip("/").rpartition("/")[2]
+        name = filename.split(".")[0]
+        if filename == "schema.json" or len(name) == 0:
+            continue
+        files[name] = (f["name"], int(f.get("size") or 0))
+    return files
+
+
+def _remove_superseded(
+    fs: Any, path: str, partitions: Optional[set[str]] = None
+) -> list[str]:
+    files = list_table_files(fs, path)
+    removed: list[str] = []
+    for name in superseded_partition_files(sorted(files.keys())):
+        if partitions is None or split_file_part(name)[0] in partitions:
+            fs.rm(files[name][0])
+            removed.append(fs.unstrip_protocol(files[name][0]))
+    return removed
+
+
+def remove_superseded_files(
+    uri: str, storage_options: Optional[dict] = None
+) -> list[str]:
+    """
+    Removes the files of a table that were replaced by a newer complete
+    generation of their partitions, which are no longer read by new
+    queries, returning their URIs. The queries that listed the files
+    before the newer generation was complete may still read them, so
+    they should be finished before the removal.
+    """
+    fs, path = _filesystem(uri, storage_options)
+    return _remove_superseded(fs, path.rstrip("/"))
+
+
+def encode_parquet(
+    table: pa.Table,
+    sort_by: Optional[list[str]] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "snappy",
+    presorted: bool = False,
+) -> pa.Buffer:
+    """
+    Encodes a table as a Parquet file laid out for fast reads, sorted by
+    the given columns, unless already `presorted`, with row groups of
+    `row_group_size` rows, and with the column statistics and the page
+    index enabled, so that the row groups and pages may be skipped by
+    the readers.
+    """
+    sorting_columns = None
+    if sort_by:
+        if not presorted:
+            table = table.sort_by([(c, "ascending") for c in sort_by])
+        sorting_columns = [
+            pq.SortingColumn(table.schema.get_field_index(c)) for c in sort_by
+        ]
+    sink = pa.BufferOutputStream()
+    pq.write_table(
+        table,
+        sink,
+        row_group_size=row_group_size,
+        compression=compression,
+        write_statistics=True,
+        write_page_index=True,
+        sorting_columns=sorting_columns,
+    )
+    return sink.getvalue()
+
+
+def _partition_groups(
+    table: pa.Table, partition_keys: list[str]
+) -> list[tuple[dict[str, Any], pa.Table]]:
+    """
+    Splits a table in the rows of each combination of values of the
+    partition keys, dropping the partition columns from the rows.
+    """
+    if len(partition_keys) == 0:
+        return [({}, table)]
+    for k in partition_keys:
+        if table.column(k).null_count > 0:
+            raise ValueError(f"Partition key {k} has null values")
+    row_column = "__morgana_row__"
+    indexed = table.select(partition_keys).append_column(
+        row_column, pa.array(np.arange(table.num_rows, dtype=np.int64))
+    )
+    groups = indexed.group_by(partition_keys, use_threads=False).aggregate(
+        [(row_column, "list")]
+    )
+    data = table.drop_columns(partition_keys)
+    partitions: list[tuple[dict[str, Any], pa.Table]] = []
+    for group in groups.to_pylist():
+        rows = group.pop(f"{row_column}_list")
+        partitions.append((group, data.take(pa.array(rows))))
+    return partitions
+
+
+def _partition_filename(
+    name: str, values: dict[str, Any], partition_keys: list[str]
+) -> str:
+    filename = name
+    for k in partition_keys:
+        filename += f"-{k}=" + _validate_name(str(values[k]), "partition value")
+    return filename
+
+
+def _merge_columns(
+    existing: list[dict], new: list[dict], kind: str
+) -> list[dict]:
+    merged = [dict(c) for c in existing]
+    types = {c["name"]: c["type"] for c in existing}
+    for c in new:
+        if c["name"] not in types:
+            merged.append(c)
+        elif types[c["name"]] != c["type"]:
+            raise ValueError(
+                f"The {kind} {c['name']} has type {c['type']}, but the"
+                + f" schema has {types[c['name']]}"
+            )
+    return merged
+
+
+def _read_json(fs: Any, path: str) -> Optional[dict]:
+    if not fs.exists(path):
+        return None
+    with fs.open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_json(fs: Any, path: str, content: dict):
+    write_file_atomic(fs, path, json.dumps(content, indent=4).encode("utf-8"))
+
+
+def _table_schema(
+    existing: Optional[dict],
+    name: str,
+    uri: str,
+    file_type: str,
+    columns: list[dict],
+    partitions: list[dict],
+) -> dict:
+    if existing is None:
+        return {
+            "name": name,
+            "description": "",
+            "uri": uri.rstrip("/") + "/schema.json",
+            "fileType": file_type,
+            "columns": columns,
+            "partitions": partitions,
+        }
+    if existing.get("fileType") != file_type:
+        raise ValueError(
+            f"Table {name} has files of type {existing.get('fileType')}"
+        )
+    existing_keys = [p["name"] for p in existing.get("partitions", [])]
+    if existing_keys != [p["name"] for p in partitions]:
+        raise ValueError(f"Table {name} is partitioned by {existing_keys}")
+    schema = dict(existing)
+    schema["columns"] = _merge_columns(
+        existing.get("columns", []), columns, "column"
+    )
+    schema["partitions"] = _merge_columns(
+        existing.get("partitions", []), partitions, "partition"
+    )
+    return schema
+
+
+def _register_table(fs: Any, database_path: str, name: str, table_path: str):
+    schema_path = database_path.rstrip("/") + "/schema.json"
+    schema = _read_json(fs, schema_path)
+    if schema is None:
+        raise ValueError(f"Database schema {schema_path} not found")
+    tables = schema.setdefault("tables", [])
+    if any(t["name"] == name for t in tables):
+        return
+    prefix = database_path.rstrip("/") + "/"
+    if table_path.startswith(prefix):
+        table_uri = table_path[len(prefix) :]
+    else:
+        table_uri = fs.unstrip_protocol(table_path)
+    tables.append({"name": name, "uri": table_uri})
+    _write_json(fs, schema_path, schema)
+
+
+def write_table(
+    data: Union[pd.DataFrame, pa.Table],
+    uri: str,
+    partition_keys: Optional[list[str]] = None,
+    sort_by: Optional[list[str]] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    file_type: str = ".parquet",
+    compression: Optional[str] = None,
+    database: Optional[str] = None,
+    append: bool = False,
+    remove_superseded: bool = False,
+    storage_options: Optional[dict] = None,
+) -> list[str]:
+    """
+    Writes data to a table in the layout that is read by the engine, with
+    one file for each combination of values of the partition keys, named
+    `<table>-<key>=<value>.<ext>`, and updates the `schema.json` of the
+    table. The files of the written partitions are replaced, one at a
+    time, while the files of the other partitions are kept.
+
+    When appending, the data is added to the partitions as new files,
+    named `<table>-<key>=<value>-<generation>.<ext>`, which may be merged
+    later by `compact_table`. A partition that has such files is replaced
+    by a new generation, and its previous files are kept, as in
+    `compact_table`, for the queries that already listed them, until they
+    are removed with `remove_superseded_files`.
+
+    The files are sorted by the `sort_by` columns and written with the
+    column statistics and page index, so that the values in each row group
+    fall in narrow ranges that the readers may skip.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame | pa.Table
+        The data to be written, including the partition columns.
+    uri : str
+        The URI of the directory of the table, whose name is the name of
+        the table.
+    partition_keys : list[str] | None
+        The columns that partition the table. Their values must not be
+        null or contain any of `.-=/`.
+    sort_by : list[str] | None
+        The columns that sort the rows in each file.
+    row_group_size : int
+        The maximum number of rows in each row group.
+    file_type : str
+        The extension of the files, which must be a Parquet one.
+    compression : str | None
+        The compression of the files. If None, the one of the file type.
+    database : str | None
+        The URI of a database where the table is registered, if not yet.
+    append : bool
+        Whether the data is added to the partitions instead of replacing
+        them. Only partitioned tables may be appended to.
+    remove_superseded : bool
+        Whether the previous files of the replaced partitions are removed
+        right after the write, which fails the queries that already
+        listed them.
+    storage_options : dict | None
+        The options for authenticating to the storage.
+
+    Returns:
+    --------
+    list[str]
+        The URIs of the written files.
+    """
+    if file_type not in FILE_COMPRESSIONS:
+        raise ValueError(f"File type {file_type} not supported for writing")
+    partition_keys = list(partition_keys or [])
+    sort_by = list(sort_by or [])
+    table = (
+        pa.Table.from_pandas(data, preserve_index=False)
+        if isinstance(data, pd.DataFrame)
+        else data
+    )
+    for c in partition_keys + sort_by:
+        if c not in table.column_names:
+            raise ValueError(f"Column {c} not found in the data")
+    if set(partition_keys) & set(sort_by):
+        raise ValueError("The data cannot be sorted by the partition keys")
+    if append and len(partition_keys) == 0:
+        raise ValueError("Only partitioned tables may be appended to")
+
+    fs, path = _filesystem(uri, storage_options)
+    path = path.rstrip("/")
+    name = _validate_name(path.rpartition("/")[2], "table name")
+    fs.makedirs(path, exist_ok=True)
+    schema_path = f"{path}/schema.json"
+    table_schema = _table_schema(
+        _read_json(fs, schema_path),
+        name,
+        uri,
+        file_type,
+        [
+            {"name": f.name, "type": _schema_type(f.type)}
+            for f in table.schema
+            if f.name not in partition_keys
+        ],
+        [
+            {"name": k, "type": _schema_type(table.schema.field(k).type)}
+            for k in partition_keys
+        ],
+    )
+
+    # The filenames are validated before any file is written
+    partitions = [
+        (_partition_filename(name, values, partition_keys), partition)
+        for values, partition in _partition_groups(table, partition_keys)
+    ]
+    # Partitions with appended or compacted files are replaced by a new
+    # generation, which hides all of their previous files at once
+    generation = time.time_ns()
+    existing = list_table_files(fs, path) if len(partition_keys) > 0 else {}
+    with_parts = {
+        partition
+        for partition, part in map(split_file_part, existing.keys())
+        if part is not None
+    }
+    written: list[str] = []
+    for filename, partition in partitions:
+        if append:
+            file_path = f"{path}/{filename}-{generation}{file_type}"
+        elif filename in with_parts:
+            file_path = f"{path}/{filename}-{generation}_0_1{file_type}"
+        else:
+            file_path = f"{path}/{filename}{file_type}"
+        content = encode_parquet(
+            partition,
+            sort_by,
+            row_group_size,
+            compression or FILE_COMPRESSIONS[file_type],
+        )
+        write_file_atomic(fs, file_path, content)
+        written.append(fs.unstrip_protocol(file_path))
+    # The schema is updated last, so that the readers never find new
+    # columns or partitions without their files
+    _write_json(fs, schema_path, table_schema)
+    replaced = {filename for filename, _ in partitions} & with_parts
+    if remove_superseded and not append and len(replaced) > 0:
+        _remove_superseded(fs, path, replaced)
+    if database is not None:
+        database_fs, database_path = _filesystem(database, storage_options)
+        _register_table(database_fs, database_path, name, path)
+    return written
@@ -0,0 +1,246 @@
+"""
+Command-line interface for running queries locally, such as for
+reproducing slow queries of the deployed functions.
+
+Usage:
+
+    morgana DATABASE QUERY [--connection KIND] [--format F]
+        [--compression C] [--output PATH] [--memory-budget BYTES]
+        [--profile [text|json]]
+"""
+
+import argparse
+import json
+import sys
+from time import perf_counter
+from typing import BinaryIO, Optional
+
+
+# Formats of the results, besides the ones of `encode_batches`
+TEXT_FORMATS = ["table", "csv", "json"]
+
+
+def _peak_memory() -> Optional[int]:
+    """
+    Returns the peak resident memory of the process, in bytes, when the
+    platform reports it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes, except on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _write_result(
+    result, output_format: str, compression: str, stream: BinaryIO
+) -> int:
+    """
+    Writes the data of a successful result to a binary stream, returning
+    the number of rows.
+    """
+    import pyarrow as pa  # type: ignore
+    from morgana_engine.utils.ipc import encode_batches
+
+    if result.batches is not None:
+        try:
+            if output_format not in TEXT_FORMATS:
+                stream.write(
+                    encode_batches(
+                        result.batches.schema,
+                        result.batches.iter_batches(),
+                        output_format,
+                        compression,
+                    )
+                )
+                return result.batches.num_rows
+            df = pa.Table.from_batches(
+                list(result.batches.iter_batches()), result.batches.schema
+            ).to_pandas()
+        finally:
+            result.batches.close()
+    else:
+        df = result.data.reset_index(drop=True)
+    if output_format == "table":
+        stream.write((df.to_string() + "\n").encode("utf-8"))
+    elif output_format == "csv":
+        stream.write(df.to_csv(index=False).encode("utf-8"))
+    elif output_format == "json":
+        stream.write(
+            df.to_json(orient="records", date_format="iso").encode("utf-8")
+        )
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        stream.write(
+            encode_batches(
+                table.schema, table.to_batches(), output_format, compression
+            )
+        )
+    return len(df)
+
+
+# Stages of the execution that are measured within other stages
+NESTED_STAGES = {"read": "execute"}
+
+
+def _profile(
+    timings: dict[str, float], reader, rows: int, peak: Optional[int]
+) -> dict:
+    """
+    Returns the measurements of a query execution, with the seconds of
+    each stage, the files and bytes read and the peak memory in bytes.
+    """
+    return {
+        "seconds": timings,
+        "rows": rows,
+        "files": list(reader.files),
+        "bytes_read": reader.bytes_read,
+        "peak_memory": peak,
+    }
+
+
+def _print_profile(profile: dict, output_format: str):
+    if output_format == "json":
+        print(json.dumps(profile), file=sys.stderr)
+        return
+    lines = ["", "stage         seconds"]
+    for stage, seconds in profile["seconds"].items():
+        if stage in NESTED_STAGES:
+            stage = "  " + stage
+        lines.append(f"{stage:<12} {seconds:>8.3f}")
+    lines.append("")
+    lines.append(f"rows          {profile['rows']}")
+    lines.append(f"files read    {len(profile['files'])}")
+    lines.append(f"bytes read    {profile['bytes_read']}")
+    if profile["peak_memory"] is not None:
+        lines.append(f"peak memory   {profile['peak_memory'] / 2**20:.1f} MB")
+    for f in profile["files"]:
+        lines.append(f"  {f}")
+    print("\n".join(lines), file=sys.stderr)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from morgana_engine.utils.ipc import OUTPUT_COMPRESSIONS
+
+    parser = argparse.ArgumentParser(
+        prog="morgana", description="Runs a SQL query on a morgana database"
+    )
+    parser.add_argument("database", help="The URI of the database")
+    parser.add_argument("query", help="The SQL query")
+    parser.add_argument(
+        "--connection",
+        default="FS",
+        help="The kind of connection to the database (FS, S3 or SQL)",
+    )
+    parser.add_argument(
+        "--format",
+        default="table",
+        choices=TEXT_FORMATS + list(OUTPUT_COMPRESSIONS.keys()),
+        help="The format of the result",
+    )
+    parser.add_argument(
+        "--compression",
+        default="none",
+        help="The compression of the arrow and parquet formats",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="The file where the result is written, instead of stdout",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        help="The memory budget of the execution, in bytes",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="text",
+        default=None,
+        choices=["text", "json"],
+        help="Prints the timings, files and bytes read and peak memory"
+        + " to stderr, as text (the default) or JSON",
+    )
+    args = parser.parse_args(argv)
+    if args.format not in TEXT_FORMATS and (
+        args.compression not in OUTPUT_COMPRESSIONS[args.format]
+    ):
+        parser.error(
+            f"Compression {args.compression} not supported by {args.format}"
+        )
+
+    timings: dict[str, float] = {}
+    start = perf_counter()
+    from morgana_engine.models.options import ExecutionOptions
+    from morgana_engine.adapters import connect
+    from morgana_engine.adapters.repository.reader import ProfilingFileReader
+    from morgana_engine.services.interpreters.lex import lex
+    from morgana_engine.services.interpreters.parse import statement_parser
+    from morgana_engine.services.interpreters.parsers.select import (
+        SELECTParser,
+    )
+
+    timings["import"] = perf_counter() - start
+
+    reader = ProfilingFileReader()
+    options = ExecutionOptions(memory_budget=args.memory_budget)
+    try:
+        start = perf_counter()
+        conn = connect(args.connection, args.database)
+        timings["connect"] = perf_counter() - start
+
+        start = perf_counter()
+        statement = lex(args.query)
+        timings["lex"] = perf_counter() - start
+
+        start = perf_counter()
+        query_parser = statement_parser(statement, conn, reader, options)
+        validation_result = query_parser.validate()
+        timings["validate"] = perf_counter() - start
+
+        if validation_result:
+            result = validation_result
+        else:
+            # The files of the tables are listed and pruned by the
+            # partition filters before being read
+            start = perf_counter()
+            if isinstance(query_parser, SELECTParser):
+                for table in query_parser.tables:
+                    query_parser.list_table_files(table)
+            timings["plan"] = perf_counter() - start
+
+            start = perf_counter()
+            result = query_parser.parse()
+            timings["execute"] = perf_counter() - start
+            timings["read"] = reader.seconds
+    except (ValueError, NotImplementedError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if not result.status:
+        print(f"Error: {result.message}", file=sys.stderr)
+        return 1
+
+    start = perf_counter()
+    if args.output is not None:
+        with open(args.output, "wb") as f:
+            rows = _write_result(result, args.format, args.compression, f)
+    else:
+        rows = _write_result(
+            result, args.format, args.compression, sys.stdout.buffer
+        )
+        sys.stdout.buffer.flush()
+    timings["write"] = perf_counter() - start
+
+    if args.profile is not None:
+        _print_profile(
+            _profile(timings, reader, rows, _peak_memory()), args.profile
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
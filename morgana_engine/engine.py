@@ -1,27 +1,247 @@
-from .adapters import connection_factory  # noqa
-from .services.interpreters.lex import lex  # noqa
-from .services.interpreters.parse import parse  # noqa
-from io import BytesIO
+import asyncio
+import os
+from typing import BinaryIO
 import pandas as pd
+import pyarrow as pa  # type: ignore
 import base64
 
+from morgana_engine.models.sql import ParsingResult
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.adapters import connect
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.incremental import incremental_parse
+from morgana_engine.services.pagination import paginated_parse
+from morgana_engine.services.streaming import stream_parse, write_ipc_stream
+from morgana_engine.services.batch import batch_parse
+from morgana_engine.services.asynchronous import async_parse
+from morgana_engine.services.distributed import (
+    distributed_parse,
+    LambdaInvoker,
+)
+from morgana_engine.services.warmup import warm_up
+from morgana_engine.utils.ipc import OUTPUT_COMPRESSIONS, encode_batches
+from morgana_engine.utils.offload import (
+    MAX_INLINE_BODY_BYTES,
+    offload_body,
+    result_location,
+)
+
+
+# Results up to this size, in Arrow buffers, are returned in the format
+# that is the cheapest to produce when the request does not choose one
+SMALL_RESULT_BYTES = 2**20
+
+OUTPUT_EXTENSIONS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def _output_encoding(request_body: dict, small: bool) -> tuple[str, str]:
+    """
+    Chooses the format and the compression of a result, as requested or,
+    by default, uncompressed Arrow IPC for small results and Parquet with
+    zstd compression for the larger ones.
+    """
+    output_format = request_body.get("format")
+    if output_format is None:
+        if small:
+            return "arrow", request_body.get("compression", "none")
+        return "parquet", request_body.get("compression", "zstd")
+    if output_format not in OUTPUT_COMPRESSIONS:
+        raise ValueError(f"Output format {output_format} not supported")
+    default_compression = "gzip" if output_format == "parquet" else "none"
+    return output_format, request_body.get("compression", default_compression)
+
+
+def _encode_result(
+    result: ParsingResult, request_body: dict
+) -> tuple[pa.Buffer, str, str]:
+    """
+    Encodes the data of a successful result into a single buffer, in the
+    chosen format. The intermediate Arrow data is released on return.
+    """
+    if result.batches is not None:
+        # Spilled results are streamed from disk, batch by batch
+        try:
+            output_format, compression = _output_encoding(request_body, False)
+            return (
+                encode_batches(
+                    result.batches.schema,
+                    result.batches.iter_batches(),
+                    output_format,
+                    compression,
+                ),
+                output_format,
+                compression,
+            )
+        finally:
+            result.batches.close()
+    df = result.data
+    assert isinstance(df, pd.DataFrame)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    output_format, compression = _output_encoding(
+        request_body, table.nbytes <= SMALL_RESULT_BYTES
+    )
+    body = encode_batches(
+        table.schema, table.to_batches(), output_format, compression
+    )
+    return body, output_format, compression
+
+
+def _result_response(result: ParsingResult, request_body: dict) -> dict:
+    if not result.status:
+        return {"statusCode": 500, "message": result.message}
+    if "resultLocation" in request_body:
+        return {
+            "statusCode": 500,
+            "message": "The resultLocation is set by the server, with the"
+            + " MORGANA_RESULT_LOCATION environment variable",
+        }
+    try:
+        body, output_format, compression = _encode_result(result, request_body)
+    except ValueError as e:
+        return {"statusCode": 500, "message": str(e)}
+    response = {
+        "statusCode": 200,
+        "format": output_format,
+        "compression": compression,
+    }
+    if result.token is not None:
+        response["token"] = result.token
+    location = result_location()
+    encoded_length = 4 * ((body.size + 2) // 3)
+    if request_body.get("offload", False) or (
+        encoded_length > MAX_INLINE_BODY_BYTES and location is not None
+    ):
+        if location is None:
+            return {
+                "statusCode": 500,
+                "message": "No MORGANA_RESULT_LOCATION set for offloading",
+            }
+        response["uri"] = offload_body(
+            body, location, OUTPUT_EXTENSIONS[output_format]
+        )
+    elif encoded_length > MAX_INLINE_BODY_BYTES:
+        return {
+            "statusCode": 500,
+            "message": "Result exceeds the response size limit, a"
+            + " MORGANA_RESULT_LOCATION or a pageSize must be given",
+        }
+    else:
+        # The base64 text is built from a view of the encoded buffer,
+        # without first copying it to bytes. The buffer, the base64 bytes
+        # and the decoded text are still alive together, so the peak is
+        # about 3.1x the size of an uncompressed Arrow result, as measured
+        # by benchmarks/serialization_memory.py
+        encoded = base64.b64encode(memoryview(body))
+        del body
+        response["body"] = encoded.decode("ascii")
+    return response
+
+
+def _request_connection(request_body: dict) -> Connection:
+    """
+    Returns the connection to the database of a request, which is in S3
+    unless another `connection` kind is given.
+    """
+    return connect(
+        request_body.get("connection", "S3"), request_body["database"]
+    )
+
 
 def select_lambda_endpoint(
     request_body: dict,
 ) -> dict:
-    conn = connection_factory("S3")(request_body["database"])
-    stmt = lex(request_body["query"])
-    result = parse(stmt, conn)
-
-    if result.status:
-        df = result.data
-        assert isinstance(df, pd.DataFrame)
-        f = BytesIO()
-        df.reset_index(drop=True).to_parquet(f, compression="gzip")
-        f.seek(0)
+    conn = _request_connection(request_body)
+    options = ExecutionOptions(
+        memory_budget=request_body.get("memoryBudget"),
+        workers=request_body.get("workers", 1),
+    )
+    if "queries" in request_body:
+        results = batch_parse(
+            [lex(q) for q in request_body["queries"]], conn, options=options
+        )
         return {
             "statusCode": 200,
-            "body": base64.b64encode(f.read()).decode("utf-8"),
+            "results": [_result_response(r, request_body) for r in results],
         }
+
+    stmt = lex(request_body["query"])
+    if "scatter" in request_body:
+        scatter = request_body["scatter"]
+        result = distributed_parse(
+            stmt,
+            conn,
+            LambdaInvoker(scatter["functionName"]),
+            scatter.get("units", 16),
+            request_body.get("connection", "S3"),
+        )
+    elif request_body.get("incremental", False):
+        result = incremental_parse(stmt, conn, request_body.get("token"))
+    elif "pageSize" in request_body:
+        page = request_body.get("page", 0)
+        result = paginated_parse(
+            stmt,
+            conn,
+            request_body["pageSize"],
+            page,
+            request_body.get("cursor"),
+        )
+        response = _result_response(result, request_body)
+        if "token" in response:
+            response["cursor"] = response.pop("token")
+            response["page"] = page
+        return response
     else:
-        return {"statusCode": 500, "message": result.message}
+        result = parse(stmt, conn, options=options)
+    return _result_response(result, request_body)
+
+
+def stream_select_lambda_endpoint(request_body: dict, stream: BinaryIO) -> dict:
+    """
+    Variant of `select_lambda_endpoint` that writes the result to a binary
+    stream, such as the response stream of a function or a socket, in the
+    Arrow IPC stream format, with a record batch for each file as soon as
+    it is read and filtered. The returned dict has the status and, when
+    the query succeeds, the number of rows that were written.
+    """
+    conn = _request_connection(request_body)
+    options = ExecutionOptions(
+        memory_budget=request_body.get("memoryBudget"),
+    )
+    tables = stream_parse(lex(request_body["query"]), conn, options)
+    if isinstance(tables, ParsingResult):
+        return {"statusCode": 500, "message": tables.message}
+    rows = write_ipc_stream(tables, stream)
+    return {"statusCode": 200, "format": "arrow", "rows": rows}
+
+
+async def async_select_lambda_endpoint(
+    request_body: dict,
+) -> dict:
+    """
+    Asynchronous variant of `select_lambda_endpoint`, which fetches the
+    schemas, listings and files of a query concurrently. The batch,
+    scatter, incremental and paginated modes are executed in a worker
+    thread.
+    """
+    if (
+        "queries" in request_body
+        or "scatter" in request_body
+        or "pageSize" in request_body
+        or request_body.get("incremental", False)
+    ):
+        return await asyncio.to_thread(select_lambda_endpoint, request_body)
+    conn = _request_connection(request_body)
+    options = ExecutionOptions(
+        memory_budget=request_body.get("memoryBudget"),
+        workers=request_body.get("workers", 1),
+    )
+    result = await async_parse(lex(request_body["query"]), conn, options)
+    return await asyncio.to_thread(_result_response, result, request_body)
+
+
+# Databases may be warmed up when the function is initialized, which
+# is when the handler is imported
+if os.environ.get("MORGANA_WARM_DATABASES"):
+    warm_up()
@@ -0,0 +1,111 @@
+"""
+Arrow Flight service for the query engine, which streams the results as
+record batches, without the encoding and base64 overhead of the JSON
+responses.
+
+Requires the `pyarrow.flight` module, which is shipped with most
+pyarrow builds.
+
+Usage:
+
+    python -m morgana_engine.flight --database URI [--connection KIND]
+        [--host H] [--port P]
+"""
+
+import argparse
+import json
+from typing import Optional
+
+import pyarrow.flight as flight  # type: ignore
+
+from morgana_engine.models.sql import ParsingResult
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.adapters import connect
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.streaming import stream_parse, record_batches
+
+
+class QueryFlightServer(flight.FlightServerBase):
+    """
+    Class that serves queries through the `do_get` method of Arrow
+    Flight, where each ticket is a query and the record batches of its
+    result are sent as each file of the queried table is read and
+    filtered.
+
+    The ticket may be the SQL query, which is executed in the default
+    database of the server, or a JSON object with the same `query`,
+    `database`, `connection` and `memoryBudget` fields of the payload of
+    `select_lambda_endpoint`.
+
+    Attributes:
+    -----------
+    database : str | None
+        The URI of the database of the tickets without one.
+    connection : str
+        The kind of connection of the tickets without one.
+    location : str
+        The location where the server listens, such as
+        `grpc://127.0.0.1:8815`. If the port is 0, a free one is chosen.
+    """
+
+    def __init__(
+        self,
+        database: Optional[str] = None,
+        connection: str = "S3",
+        location: str = "grpc://127.0.0.1:8815",
+        **kwargs,
+    ) -> None:
+        super().__init__(location, **kwargs)
+        self._database = database
+        self._connection = connection
+
+    def _ticket_request(self, ticket: flight.Ticket) -> dict:
+        content = ticket.ticket.decode("utf-8")
+        if content.lstrip().startswith("{"):
+            request_body = json.loads(content)
+        else:
+            request_body = {"query": content}
+        request_body.setdefault("database", self._database)
+        request_body.setdefault("connection", self._connection)
+        if request_body["database"] is None:
+            raise flight.FlightServerError("No database for the query")
+        return request_body
+
+    def do_get(self, context, ticket: flight.Ticket):
+        try:
+            request_body = self._ticket_request(ticket)
+        except ValueError as e:
+            raise flight.FlightServerError(f"Invalid ticket: {e}")
+        conn = connect(request_body["connection"], request_body["database"])
+        options = ExecutionOptions(
+            memory_budget=request_body.get("memoryBudget"),
+        )
+        tables = stream_parse(lex(request_body["query"]), conn, options)
+        if isinstance(tables, ParsingResult):
+            raise flight.FlightServerError(tables.message)
+        schema, batches = record_batches(tables)
+        return flight.GeneratorStream(schema, batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serves morgana queries over Arrow Flight"
+    )
+    parser.add_argument("--database", default=None)
+    parser.add_argument("--connection", default="S3")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8815)
+    args = parser.parse_args()
+
+    from morgana_engine.services.warmup import warm_up
+
+    if args.database is not None:
+        warm_up([args.database], args.connection)
+    server = QueryFlightServer(
+        args.database, args.connection, f"grpc://{args.host}:{args.port}"
+    )
+    server.serve()
+
+
+if __name__ == "__main__":
+    main()
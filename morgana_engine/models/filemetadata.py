@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class FileMetadata:
+    """
+    Class for representing the metadata of a data file in a table,
+    as reported by the storage that holds it.
+
+    The `version` is an opaque string that changes whenever the file
+    contents change (an ETag for object storages, or modification time
+    and size for filesystems).
+    """
+
+    __slots__ = ["name", "size", "version"]
+
+    name: str
+    size: int
+    version: str
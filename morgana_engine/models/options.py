@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ExecutionOptions:
+    """
+    Class for representing the options that control how a statement
+    is executed, which do not change its result.
+
+    Attributes:
+    -----------
+    memory_budget : int | None
+        The maximum number of bytes that the partial results of a query
+        may hold in memory (measured by their Arrow buffers) before being
+        spilled to local disk. If None, nothing is spilled.
+    spill_directory : str | None
+        The directory where spilled data is written. If None, the default
+        temporary directory is used.
+    workers : int
+        The number of processes used for decoding, filtering and
+        projecting the data files of each table, which are kept in a pool
+        that is shared by the queries of the process. If 1, the files are
+        processed in the calling process.
+    """
+
+    memory_budget: int | None = None
+    spill_directory: str | None = None
+    workers: int = 1
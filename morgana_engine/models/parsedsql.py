@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from typing import Any, Union
+from morgana_engine.models.sql import SQLToken, SQLTokenType, SQLSetToken
 
 
 @dataclass
@@ -59,15 +61,84 @@ class QueryingFilter:
     Class for representing a filter in a SQL query.
     """
 
-    __slots__ = ["column", "operator", "value"]
+    __slots__ = ["column", "operator", "value", "values"]
 
     column: Column
     operator: str
     value: str
+    values: SQLSetToken | None
 
     @property
     def is_collection(self):
+        if self.values is not None:
+            return True
         return "(" in self.value and ")" in self.value
 
     def __repr__(self) -> str:
         return f"{self.column.fullname} {self.operator} {self.value}"
+
+
+@dataclass
+class Predicate:
+    """
+    Class for representing a comparison between a column and constant
+    values in the WHERE clause of a SQL query.
+    """
+
+    __slots__ = ["column", "operator", "values"]
+
+    column: Column
+    operator: SQLToken
+    values: list[SQLToken]
+
+    def __repr__(self) -> str:
+        values = ", ".join([t.text for t in self.values])
+        return f"{self.column.fullname} {self.operator.text} {values}"
+
+
+@dataclass
+class BooleanExpression:
+    """
+    Class for representing the conjunction (AND) or disjunction (OR)
+    of expressions in the WHERE clause of a SQL query. The operands may
+    be predicates, other expressions or filters that were derived from
+    the predicates.
+    """
+
+    __slots__ = ["operator", "operands"]
+
+    operator: SQLTokenType
+    operands: list[Any]
+
+    def map(self, func) -> "BooleanExpression":
+        """
+        Returns an expression with the same structure, where each operand
+        that is not an expression is replaced by the result of `func`.
+        """
+        return BooleanExpression(
+            self.operator,
+            [
+                o.map(func) if isinstance(o, BooleanExpression) else func(o)
+                for o in self.operands
+            ],
+        )
+
+    def leaves(self) -> list[Any]:
+        """
+        Lists the operands that are not expressions, in the order they
+        appear in the query.
+        """
+        result: list[Any] = []
+        for o in self.operands:
+            if isinstance(o, BooleanExpression):
+                result += o.leaves()
+            else:
+                result.append(o)
+        return result
+
+    def __repr__(self) -> str:
+        operator = f" {self.operator.value} "
+        return "(" + operator.join([repr(o) for o in self.operands]) + ")"
+
+
+FilterExpression = Union[Predicate, BooleanExpression]
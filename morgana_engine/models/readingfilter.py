@@ -1,8 +1,12 @@
 from abc import ABC
 from typing import TypeVar, Callable
-from morgana_engine.models.sql import SQLToken, SQLTokenType
+from morgana_engine.models.sql import (
+    SQLToken,
+    SQLTokenType,
+    SQLSetToken,
+    literal_text,
+)
 from morgana_engine.models.parsedsql import Column
-from morgana_engine.utils.sql import unquote_values
 
 
 T = TypeVar("T")
@@ -81,6 +85,24 @@ class ReadingFilter(ABC):
         """
         return [t.text for t in self._values]
 
+    def _literal_values(self) -> list[str]:
+        """
+        Returns the values used in the filter expression as they are
+        casted to the type of the column, with the quoted strings
+        unescaped.
+        """
+        return [literal_text(t) for t in self._values]
+
+    def _value_set(self, casting_func: Callable) -> frozenset:
+        """
+        Returns the set of values used in the filter expression, casted
+        with the given function, reusing the set that is held by the token
+        when the values were given as a list or computed by a subquery.
+        """
+        if len(self._values) == 1 and isinstance(self._values[0], SQLSetToken):
+            return self._values[0].value_set(casting_func)
+        return frozenset([casting_func(v) for v in self._literal_values()])
+
     @classmethod
     def is_filter(cls, operation: SQLToken) -> bool:
         """
@@ -116,6 +138,32 @@ class ReadingFilter(ABC):
         """
         raise NotImplementedError
 
+    def to_sql(
+        self, identifier: str, casting_func: Callable
+    ) -> tuple[str, list] | None:
+        """
+        Translates the filter to a SQL condition over the given (quoted)
+        column identifier, with the values as parameters, for being
+        evaluated by a SQL backend.
+
+        The NULL values are handled as in the filtering of DataFrames,
+        where the negated comparisons keep the missing values.
+
+        Parameters:
+        -----------
+        identifier : str
+            The quoted identifier of the column in the SQL backend.
+        casting_func : Callable
+            A function used to cast the values to the appropriate type.
+
+        Returns:
+        --------
+        tuple[str, list] | None
+            The condition and its parameters, or None if the filter
+            cannot be translated.
+        """
+        return None
+
 
 class EqualityReadingFilter(ReadingFilter):
     """
@@ -128,14 +176,20 @@ class EqualityReadingFilter(ReadingFilter):
         return token.type in [SQLTokenType.EQUALS, SQLTokenType.DIFFERENT]
 
     def apply(self, values: list[T], casting_func: Callable) -> list[T]:
-        casted_values = self._values = [
-            casting_func(v) for v in unquote_values(self.values)
-        ]
+        casted_values = [casting_func(v) for v in self._literal_values()]
         if self.operator.type == SQLTokenType.EQUALS:
             return [v for v in values if v in casted_values]
         else:
             return [v for v in values if v not in casted_values]
 
+    def to_sql(
+        self, identifier: str, casting_func: Callable
+    ) -> tuple[str, list] | None:
+        value = casting_func(self._literal_values()[0])
+        if self.operator.type == SQLTokenType.EQUALS:
+            return f"{identifier} = ?", [value]
+        return f"({identifier} != ? OR {identifier} IS NULL)", [value]
+
 
 class UnequalityReadingFilter(ReadingFilter):
     """
@@ -153,7 +207,7 @@ class UnequalityReadingFilter(ReadingFilter):
         ]
 
     def apply(self, values: list[T], casting_func: Callable) -> list[T]:
-        casted_values = [casting_func(v) for v in unquote_values(self.values)]
+        casted_values = [casting_func(v) for v in self._literal_values()]
         if self.operator.type == SQLTokenType.GREATER:
             return [v for v in values if v > casted_values[0]]
         elif self.operator.type == SQLTokenType.LESS:
@@ -164,6 +218,12 @@ class UnequalityReadingFilter(ReadingFilter):
             return [v for v in values if v <= casted_values[0]]
         return []
 
+    def to_sql(
+        self, identifier: str, casting_func: Callable
+    ) -> tuple[str, list] | None:
+        value = casting_func(self._literal_values()[0])
+        return f"{identifier} {self.operator.text} ?", [value]
+
 
 class InSetReadingFilter(ReadingFilter):
     @classmethod
@@ -171,10 +231,17 @@ class InSetReadingFilter(ReadingFilter):
         return token.type == SQLTokenType.IN
 
     def apply(self, values: list[T], casting_func: Callable) -> list[T]:
-        casted_values = self._values = [
-            casting_func(v) for v in unquote_values(self.values)
-        ]
-        return [v for v in values if v in casted_values]
+        value_set = self._value_set(casting_func)
+        return [v for v in values if v in value_set]
+
+    def to_sql(
+        self, identifier: str, casting_func: Callable
+    ) -> tuple[str, list] | None:
+        value_set = self._value_set(casting_func)
+        if len(value_set) == 0:
+            return "0", []
+        placeholders = ", ".join(["?"] * len(value_set))
+        return f"{identifier} IN ({placeholders})", list(value_set)
 
 
 class NotInSetReadingFilter(ReadingFilter):
@@ -183,10 +250,20 @@ class NotInSetReadingFilter(ReadingFilter):
         return token.type == SQLTokenType.NOT_IN
 
     def apply(self, values: list[T], casting_func: Callable) -> list[T]:
-        casted_values = self._values = [
-            casting_func(v) for v in unquote_values(self.values)
-        ]
-        return [v for v in values if v not in casted_values]
+        value_set = self._value_set(casting_func)
+        return [v for v in values if v not in value_set]
+
+    def to_sql(
+        self, identifier: str, casting_func: Callable
+    ) -> tuple[str, list] | None:
+        value_set = self._value_set(casting_func)
+        if len(value_set) == 0:
+            return "1", []
+        placeholders = ", ".join(["?"] * len(value_set))
+        return (
+            f"({identifier} NOT IN ({placeholders}) OR {identifier} IS NULL)",
+            list(value_set),
+        )
 
 
 def type_factory(operation_token: SQLToken) -> type[ReadingFilter]:
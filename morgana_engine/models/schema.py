@@ -1,3 +1,7 @@
+from types import MappingProxyType
+from typing import Mapping
+
+
 class Schema:
     """
     Implements a generic schema that can describe either a database or
@@ -30,6 +34,22 @@ class Schema:
     def __init__(self, json_dict: dict) -> None:
         super().__init__()
         self._json_dict = json_dict
+        # The lookups are built once, as they are accessed for every
+        # file that is read, and are read-only since the schema is
+        # shared among connections
+        self._tables: Mapping[str, str] = MappingProxyType(
+            {t["name"]: t["uri"] for t in json_dict.get("tables", [])}
+        )
+        self._columns: Mapping[str, str] = MappingProxyType(
+            {c["name"]: c["type"] for c in json_dict.get("columns", [])}
+            if self.is_table
+            else {}
+        )
+        self._partitions: Mapping[str, str] = MappingProxyType(
+            {k["name"]: k["type"] for k in json_dict.get("partitions", [])}
+            if self.is_table
+            else {}
+        )
 
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, Schema):
@@ -66,22 +86,13 @@ class Schema:
         return "columns" in self._json_dict
 
     @property
-    def tables(self) -> dict[str, str]:
-        if self.is_database:
-            return {t["name"]: t["uri"] for t in self._json_dict["tables"]}
-        else:
-            return {}
+    def tables(self) -> Mapping[str, str]:
+        return self._tables
 
     @property
-    def columns(self) -> dict[str, str]:
-        if self.is_table:
-            return {c["name"]: c["type"] for c in self._json_dict["columns"]}
-        else:
-            return {}
+    def columns(self) -> Mapping[str, str]:
+        return self._columns
 
     @property
-    def partitions(self) -> dict[str, str]:
-        if self.is_table:
-            return {k["name"]: k["type"] for k in self._json_dict["partitions"]}
-        else:
-            return {}
+    def partitions(self) -> Mapping[str, str]:
+        return self._partitions
@@ -1,8 +1,14 @@
 from enum import Enum
-from typing import Optional, List
+from typing import Callable, Optional, List, TYPE_CHECKING
 from dataclasses import dataclass
-import pandas as pd  # type: ignore
-from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.utils.sql import unquote_values
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from morgana_engine.adapters.repository.connection import Connection
+    from morgana_engine.adapters.repository.reader import FileReader
+    from morgana_engine.adapters.repository.spill import ResultBuffer
 
 
 class SQLTokenType(Enum):
@@ -57,10 +63,12 @@ class SQLTokenType(Enum):
 
     @classmethod
     def factory(cls, val: str) -> Optional["SQLTokenType"]:
-        for member in cls:
-            if member.value == val:
-                return member
-        return None
+        return TOKEN_TYPES_BY_VALUE.get(val)
+
+
+TOKEN_TYPES_BY_VALUE = {
+    member.value: member for member in SQLTokenType if member.value is not None
+}
 
 
 PUNCTUATION_TOKEN_TYPES = [
@@ -116,6 +124,75 @@ class SQLToken:
         return SQLToken(token_type, value)
 
 
+class SQLLiteralToken(SQLToken):
+    """
+    Token for a numeric or quoted string literal, which keeps the
+    original text together with the value that it represents.
+    """
+
+    def __init__(self, text: str, value: int | float | str):
+        super().__init__(SQLTokenType.ENTITY, text)
+        self.value = value
+
+
+def literal_text(token: SQLToken) -> str:
+    """
+    Returns the text of a value that is casted to the type of the
+    compared column: the unescaped string of a quoted literal, or the
+    text of any other value, as written.
+    """
+    if isinstance(token, SQLLiteralToken) and isinstance(token.value, str):
+        return token.value
+    return unquote_values([token.text])[0]
+
+
+class SQLSetToken(SQLToken):
+    """
+    Token that holds a set of values which were computed while
+    interpreting the statement, such as the result of a subquery, so
+    that membership tests may be made directly against a hash set.
+    """
+
+    def __init__(self, text: str, values: frozenset):
+        super().__init__(SQLTokenType.ENTITY, text)
+        self.values = values
+
+    def value_set(self, casting_func: Callable) -> frozenset:
+        """
+        Returns the set of values to be compared with a column. The values
+        of a computed set already have the column type, so they are not
+        casted.
+        """
+        return self.values
+
+
+class SQLValueListToken(SQLSetToken):
+    """
+    Token that holds a list of literal values, as in the operand of IN,
+    which is kept as a set of distinct values and is casted to the type
+    of each compared column only once.
+
+    The values are casted from their text, as the ones compared with
+    `=`, so that `00123` matches the string '00123' and `1.5` is not
+    truncated when compared with an integer column. Only the quoted
+    strings are kept unescaped.
+    """
+
+    def __init__(self, tokens: List[SQLToken]):
+        super().__init__(
+            "(" + " , ".join([t.text for t in tokens]) + ")",
+            frozenset([literal_text(t) for t in tokens]),
+        )
+        self._casted_sets: dict[Callable, frozenset] = {}
+
+    def value_set(self, casting_func: Callable) -> frozenset:
+        if casting_func not in self._casted_sets:
+            self._casted_sets[casting_func] = frozenset(
+                [casting_func(v) for v in self.values]
+            )
+        return self._casted_sets[casting_func]
+
+
 class SQLStatement:
     def __init__(self, tokens: List[SQLToken]) -> None:
         self.tokens = tokens
@@ -129,13 +206,27 @@ class SQLStatement:
 class ParsingResult:
     status: bool
     message: str
-    data: Optional[pd.DataFrame]
+    data: Optional["pd.DataFrame"]
+    token: Optional[dict] = None
+    batches: Optional["ResultBuffer"] = None
 
 
 class SQLParser:
-    def __init__(self, statement: SQLStatement, conn: Connection) -> None:
+    def __init__(
+        self,
+        statement: SQLStatement,
+        conn: "Connection",
+        reader: Optional["FileReader"] = None,
+        options: Optional[ExecutionOptions] = None,
+    ) -> None:
         self.statement = statement
         self.conn = conn
+        if reader is None:
+            from morgana_engine.adapters.repository.reader import FileReader
+
+            reader = FileReader()
+        self.reader = reader
+        self.options = options if options is not None else ExecutionOptions()
 
     @staticmethod
     def match_statement(statement: SQLStatement) -> bool:
@@ -0,0 +1,227 @@
+"""
+Long-running HTTP server for the query engine, which keeps the
+connections, schemas and caches of the process warm across requests.
+
+Usage:
+
+    python -m morgana_engine.server [--host H] [--port P] [--concurrency N]
+        [--connection KIND] [--warm DATABASE ...]
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Optional
+
+# Maximum size of the request bodies, in bytes
+MAX_REQUEST_BYTES = 2**20
+
+
+def _error(status: HTTPStatus, message: str) -> tuple[int, dict]:
+    return status.value, {"statusCode": status.value, "message": message}
+
+
+class QueryServer:
+    """
+    Class that serves the same request and response contract of
+    `select_lambda_endpoint` over HTTP, where each `POST` request has the
+    JSON payload of an invocation and is answered with the JSON response,
+    whose `statusCode` is also the HTTP status.
+
+    The queries are executed by a pool of threads, so that all of them
+    share the process-wide registry of connections, schemas, pinned
+    tables and caches, while the event loop keeps accepting requests.
+    A `GET` request answers whether the server is alive.
+
+    Attributes:
+    -----------
+    host : str
+        The address where the server listens.
+    port : int
+        The port where the server listens. If 0, a free port is chosen.
+    concurrency : int
+        The maximum number of queries that are executed at once.
+    endpoint : Callable[[dict], dict] | None
+        The function that answers the requests. If None, the
+        `select_lambda_endpoint` is used.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        concurrency: int = 4,
+        endpoint: Optional[Callable[[dict], dict]] = None,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._concurrency = concurrency
+        self._endpoint = endpoint
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.Server] = None
+
+    @property
+    def port(self) -> int:
+        """
+        The port where the server listens, once started.
+        """
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self._port
+
+    async def start(self):
+        """
+        Starts listening for requests, without blocking.
+        """
+        if self._endpoint is None:
+            from morgana_engine.engine import select_lambda_endpoint
+
+            self._endpoint = select_lambda_endpoint
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix="morgana"
+        )
+        self._server = await asyncio.start_server(
+            self._handle_connection, self._host, self._port
+        )
+
+    async def serve_forever(self):
+        """
+        Starts the server, if needed, and serves until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stops accepting requests and waits for the running queries.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, True)
+            self._executor = None
+
+    async def _execute(self, payload: bytes) -> tuple[int, dict]:
+        try:
+            request_body = json.loads(payload)
+            if not isinstance(request_body, dict):
+                raise ValueError("The payload must be a JSON object")
+        except ValueError as e:
+            return _error(HTTPStatus.BAD_REQUEST, str(e))
+        assert self._endpoint is not None
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                self._executor, self._endpoint, request_body
+            )
+        except Exception as e:
+            response = {"statusCode": 500, "message": str(e)}
+        return response.get("statusCode", 200), response
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, _, version = request_line.decode("latin-1").split()
+                headers: dict[str, str] = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1")
+                    if line in ["\r\n", "\n", ""]:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0"))
+                if length > MAX_REQUEST_BYTES:
+                    status, response = _error(
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        "Request body too large",
+                    )
+                    await self._write_response(writer, status, response, False)
+                    break
+                payload = await reader.readexactly(length)
+                if method == "GET":
+                    status, response = 200, {"statusCode": 200}
+                elif method == "POST":
+                    status, response = await self._execute(payload)
+                else:
+                    status, response = _error(
+                        HTTPStatus.METHOD_NOT_ALLOWED,
+                        f"Method {method} not allowed",
+                    )
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await self._write_response(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(
+        writer: asyncio.StreamWriter,
+        status: int,
+        response: dict,
+        keep_alive: bool,
+    ):
+        body = json.dumps(response).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            + "Content-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n"
+            + f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            + "\r\n"
+        )
+        writer.write(head.encode("latin-1"))
+        writer.write(body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serves morgana queries over HTTP"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--connection",
+        default="S3",
+        help="The kind of connection to the databases that are warmed up",
+    )
+    parser.add_argument(
+        "--warm",
+        nargs="*",
+        default=[],
+        help="The databases whose schemas and partitions are preloaded",
+    )
+    args = parser.parse_args()
+
+    from morgana_engine.services.warmup import warm_up
+
+    warm_up(args.warm, args.connection)
+    server = QueryServer(args.host, args.port, args.concurrency)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import asyncio
+from os.path import join
+
+from morgana_engine.models.sql import SQLStatement, SQLTokenType, ParsingResult
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.adapters.repository.reader import PrefetchedFileReader
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+
+
+async def _prefetch_schemas(
+    statement: SQLStatement, conn: Connection, semaphore: asyncio.Semaphore
+):
+    """
+    Loads the schemas of the tables that are named in the statement
+    concurrently, so that they are already cached when the statement
+    is validated.
+    """
+
+    async def __load(func):
+        async with semaphore:
+            return await asyncio.to_thread(func)
+
+    database_schema = await __load(lambda: conn.schema)
+    names = set(
+        [
+            t.text
+            for t in statement.tokens
+            if t.type == SQLTokenType.ENTITY
+            and t.text in database_schema.tables
+        ]
+    )
+    await asyncio.gather(
+        *[__load(lambda n=n: conn.access(n).schema) for n in names]
+    )
+
+
+class _PrefetchWindow:
+    """
+    Bounds the number of files, and optionally of bytes, whose contents
+    were fetched, or are being fetched, but not yet read. A single file
+    is always allowed, even if larger than the bytes.
+    """
+
+    def __init__(self, max_files: int, max_bytes: int | None) -> None:
+        self._max_files = max_files
+        self._max_bytes = max_bytes
+        self._files = 0
+        self._nbytes = 0
+        self._condition = asyncio.Condition()
+
+    def _fits(self, size: int) -> bool:
+        if self._files == 0:
+            return True
+        if self._files >= self._max_files:
+            return False
+        return self._max_bytes is None or self._nbytes + size <= self._max_bytes
+
+    async def acquire(self, size: int):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._fits(size))
+            self._files += 1
+            self._nbytes += size
+
+    async def release(self, size: int):
+        async with self._condition:
+            self._files -= 1
+            self._nbytes -= size
+            self._condition.notify_all()
+
+
+async def async_parse(
+    statement: SQLStatement,
+    conn: Connection,
+    options: ExecutionOptions | None = None,
+    max_concurrency: int = 32,
+    prefetch_window: int = 64,
+) -> ParsingResult:
+    """
+    Executes a statement overlapping the latency of its I/O operations.
+
+    The schemas and the listings of the queried tables are obtained
+    concurrently, and the contents of the files that must be read are
+    fetched concurrently through the asynchronous filesystem of the
+    connection, or through the local object cache when there is one,
+    while the files are decoded in a worker thread, so that the event
+    loop is not blocked. The files are fetched in the order that they
+    are read, and only a window of them is held in memory, which is
+    bounded by a number of files and, when the options have a memory
+    budget, by their sizes. The tables that are pinned in memory or read
+    by SQL backends are not fetched.
+
+    Parameters:
+    -----------
+    statement : SQLStatement
+        The statement to be executed.
+    conn : Connection
+        The connection to the database.
+    options : ExecutionOptions | None
+        The options for executing the statement.
+    max_concurrency : int
+        The maximum number of I/O operations that are made at once.
+    prefetch_window : int
+        The maximum number of files that are fetched but not yet read.
+
+    Returns:
+    --------
+    ParsingResult
+        The result of the statement.
+    """
+    if not SELECTParser.match_statement(statement):
+        return await asyncio.to_thread(parse, statement, conn, options=options)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    await _prefetch_schemas(statement, conn, semaphore)
+
+    loop = asyncio.get_running_loop()
+    memory_budget = options.memory_budget if options else None
+    window = _PrefetchWindow(prefetch_window, memory_budget)
+    sizes: dict[tuple[str, str], int] = {}
+
+    def __release(table_conn: Connection, file: str):
+        size = sizes[(table_conn.uri, file)]
+        asyncio.run_coroutine_threadsafe(window.release(size), loop)
+
+    reader = PrefetchedFileReader(__release)
+    parser = SELECTParser(statement, conn, reader, options)
+    validation_result = await asyncio.to_thread(parser.validate)
+    if validation_result:
+        return validation_result
+
+    async def __list(table):
+        async with semaphore:
+            return await asyncio.to_thread(parser.list_table_files, table)
+
+    table_files = await asyncio.gather(*[__list(t) for t in parser.tables])
+    fetches = [
+        (parser.table_connection(t), f)
+        for t, files in zip(parser.tables, table_files)
+        for f in files
+        if not (
+            parser.table_connection(t).pinned
+            or parser.table_connection(t).pushdown
+        )
+    ]
+    if len(fetches) == 0:
+        return await asyncio.to_thread(parser.parse)
+
+    if memory_budget is not None:
+        for table_conn in set([c for c, _ in fetches]):
+            metadata = await asyncio.to_thread(table_conn.list_files_metadata)
+            for f, m in metadata.items():
+                sizes[(table_conn.uri, f)] = m.size
+    cache = registry.object_cache()
+
+    async with conn.async_filesystem() as fs:
+
+        async def __fetch(table_conn: Connection, file: str, size: int):
+            content = None
+            try:
+                async with semaphore:
+                    if cache is not None:
+                        content = await asyncio.to_thread(
+                            table_conn.cached_content, file
+                        )
+                    if content is None:
+                        path = join(
+                            table_conn.path,
+                            file + str(table_conn.schema.file_type),
+                        )
+                        content = await fs._cat_file(path)
+            except Exception:
+                # Read again by the parser, which reports the error
+                content = None
+            reader.add(table_conn, file, content)
+            if content is None:
+                await window.release(size)
+
+        async def __fetch_all():
+            tasks = []
+            try:
+                for table_conn, file in fetches:
+                    size = sizes.setdefault((table_conn.uri, file), 0)
+                    await window.acquire(size)
+                    if not reader.start(table_conn, file):
+                        await window.release(size)
+                        continue
+                    tasks.append(
+                        asyncio.create_task(__fetch(table_conn, file, size))
+                    )
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        fetching = asyncio.create_task(__fetch_all())
+        try:
+            return await asyncio.to_thread(parser.parse)
+        finally:
+            # The files that are not read, such as when the statement
+            # fails, are not waited for
+            fetching.cancel()
+            await asyncio.gather(fetching, return_exceptions=True)
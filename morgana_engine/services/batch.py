@@ -0,0 +1,73 @@
+from typing import Optional
+
+from morgana_engine.models.sql import SQLStatement, SQLParser, ParsingResult
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.adapters.repository.reader import SharedFileReader
+from morgana_engine.services.interpreters.parse import _factory
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+
+
+def batch_parse(
+    statements: list[SQLStatement],
+    conn: Connection,
+    reader: Optional[SharedFileReader] = None,
+    options: Optional[ExecutionOptions] = None,
+) -> list[ParsingResult]:
+    """
+    Executes a batch of statements against the same database, planning
+    them together so that each data file is read only once, with the
+    union of the columns that are needed by all the statements.
+
+    Parameters:
+    -----------
+    statements : list[SQLStatement]
+        The statements to be executed.
+    conn : Connection
+        The connection to the database.
+    reader : SharedFileReader | None
+        The reader that is shared among the statements. If None, a new
+        reader is created for the batch.
+    options : ExecutionOptions | None
+        The options for executing each statement.
+
+    Returns:
+    --------
+    list[ParsingResult]
+        The result of each statement, in the same order.
+    """
+    if reader is None:
+        reader = SharedFileReader()
+
+    # Validates all the statements before reading any data
+    parsers: list[Optional[SQLParser]] = []
+    results: list[Optional[ParsingResult]] = []
+    for statement in statements:
+        try:
+            parser_type = _factory(statement)
+        except NotImplementedError as e:
+            parsers.append(None)
+            results.append(
+                ParsingResult(status=False, message=str(e), data=None)
+            )
+            continue
+        parser = parser_type(statement, conn, reader, options)
+        validation_result = parser.validate()
+        parsers.append(None if validation_result else parser)
+        results.append(validation_result)
+
+    # Announces the files and columns that will be read by each statement
+    for p in parsers:
+        if not isinstance(p, SELECTParser):
+            continue
+        for table in p.tables:
+            table_conn = p.table_connection(table)
+            columns = p.source_columns(table)
+            for f in p.list_table_files(table):
+                reader.request(table_conn, f, columns)
+
+    for i, p in enumerate(parsers):
+        if p is not None:
+            results[i] = p.parse()
+
+    return [r for r in results if r is not None]
@@ -0,0 +1,260 @@
+from abc import ABC
+import base64
+import heapq
+import json
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+import pandas as pd
+import pyarrow as pa  # type: ignore
+
+from morgana_engine.models.sql import ParsingResult, SQLStatement
+from morgana_engine.adapters import connect
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+from morgana_engine.utils.ipc import table_to_ipc, ipc_to_table
+from morgana_engine.utils.offload import (
+    MAX_INLINE_BODY_BYTES,
+    offload_body,
+    read_offloaded,
+    result_location,
+)
+
+
+class Invoker(ABC):
+    """
+    Class that dispatches work units to the workers of a distributed
+    query and collects their responses.
+
+    Each work unit is a JSON-serializable dict, which must be given to
+    `worker_endpoint` by the worker, and each response is the dict that
+    is returned by it.
+    """
+
+    def invoke(self, work_units: list[dict]) -> list[dict]:
+        """
+        Executes the work units, returning the responses in the same order.
+        """
+        raise NotImplementedError
+
+
+class LocalInvoker(Invoker):
+    """
+    Invoker that executes the work units in a pool of local processes,
+    mainly for testing and for running in multi-core hosts.
+    """
+
+    def __init__(self, processes: int | None = None) -> None:
+        self._processes = processes
+
+    def invoke(self, work_units: list[dict]) -> list[dict]:
+        with get_context().Pool(self._processes) as pool:
+            return pool.map(worker_endpoint, work_units)
+
+
+class LambdaInvoker(Invoker):
+    """
+    Invoker that executes each work unit in an AWS Lambda function, which
+    must call `worker_endpoint` with its event. The invocations are made
+    concurrently by a pool of threads.
+    """
+
+    def __init__(
+        self, function_name: str, max_concurrency: int = 64, client=None
+    ) -> None:
+        self._function_name = function_name
+        self._max_concurrency = max_concurrency
+        self._client = client
+
+    def _invoke_one(self, work_unit: dict) -> dict:
+        response = self._client.invoke(
+            FunctionName=self._function_name,
+            InvocationType="RequestResponse",
+            Payload=json.dumps(work_unit).encode("utf-8"),
+        )
+        return json.loads(response["Payload"].read())
+
+    def invoke(self, work_units: list[dict]) -> list[dict]:
+        if self._client is None:
+            import boto3  # type: ignore
+
+            self._client = boto3.client("lambda")
+        with ThreadPoolExecutor(
+            max_workers=min(self._max_concurrency, max(len(work_units), 1))
+        ) as executor:
+            return list(executor.map(self._invoke_one, work_units))
+
+
+def balance_work_units(
+    file_sizes: dict[str, int], num_units: int
+) -> list[list[str]]:
+    """
+    Splits files into work units with similar total sizes, assigning
+    the largest files first to the unit with the smallest total.
+
+    Parameters:
+    -----------
+    file_sizes : dict[str, int]
+        The size of each file, in bytes.
+    num_units : int
+        The maximum number of work units.
+
+    Returns:
+    --------
+    list[list[str]]
+        The files of each work unit. Empty units are not returned.
+    """
+    units: list[list[str]] = [[] for _ in range(max(num_units, 1))]
+    heap = [(0, i) for i in range(len(units))]
+    for f in sorted(file_sizes, key=lambda f: file_sizes[f], reverse=True):
+        total, i = heapq.heappop(heap)
+        units[i].append(f)
+        heapq.heappush(heap, (total + file_sizes[f], i))
+    return [u for u in units if len(u) > 0]
+
+
+def worker_endpoint(request_body: dict) -> dict:
+    """
+    Executes a work unit of a distributed query, reading only the given
+    files of the queried table.
+
+    The request must contain the `database`, `query`, `files` and,
+    optionally, the `connection` kind (defaults to S3). The filtered rows
+    are encoded in the Arrow IPC format and, when the
+    `MORGANA_RESULT_LOCATION` environment variable is set, written to a
+    new object in that location, whose `uri` is returned for the
+    coordinator to read, since the partial results may exceed the
+    response size limit. Otherwise, they are returned in the `body`,
+    encoded with base64. The response also has the number of rows that
+    came from each file.
+    """
+    conn = connect(
+        request_body.get("connection", "S3"), request_body["database"]
+    )
+    parser = SELECTParser(lex(request_body["query"]), conn)
+    validation_result = parser.validate()
+    if validation_result:
+        return {"statusCode": 500, "message": validation_result.message}
+    table = parser.tables[0]
+    dfs = [parser.scan_table_file(table, f) for f in request_body["files"]]
+    df = pd.concat(dfs, ignore_index=True)
+    body = table_to_ipc(pa.Table.from_pandas(df, preserve_index=False))
+    response: dict = {"statusCode": 200, "rows": [len(d) for d in dfs]}
+    location = result_location()
+    if location is not None:
+        response["uri"] = offload_body(body, location, ".arrow")
+    elif 4 * ((len(body) + 2) // 3) > MAX_INLINE_BODY_BYTES:
+        return {
+            "statusCode": 500,
+            "message": "Partial result exceeds the response size limit, a"
+            + " MORGANA_RESULT_LOCATION must be set for the workers",
+        }
+    else:
+        response["body"] = base64.b64encode(body).decode("utf-8")
+    return response
+
+
+def _read_partial_result(response: dict) -> pd.DataFrame:
+    """
+    Reads the partial result of a worker, from the object that it was
+    written to, which is removed afterwards, or from the response body.
+    """
+    if "uri" in response:
+        body = read_offloaded(response["uri"], remove=True)
+    else:
+        body = base64.b64decode(response["body"])
+    return ipc_to_table(body).to_pandas()
+
+
+def distributed_parse(
+    statement: SQLStatement,
+    conn: Connection,
+    invoker: Invoker,
+    num_units: int,
+    connection_kind: str = "S3",
+) -> ParsingResult:
+    """
+    Executes a SELECT statement by scattering the files of the queried
+    table among workers and gathering their partial results.
+
+    The files are pruned by the partition filters, split into work units
+    balanced by file size and dispatched through the invoker. The rows
+    returned by the workers are merged in the same order of the files,
+    so the result is the same of a single-process execution.
+
+    Parameters:
+    -----------
+    statement : SQLStatement
+        The statement to be executed. Must be a SELECT from a single table.
+    conn : Connection
+        The connection to the database.
+    invoker : Invoker
+        The invoker that dispatches the work units.
+    num_units : int
+        The maximum number of work units.
+    connection_kind : str
+        The kind of connection that the workers must use for accessing
+        the database.
+
+    Returns:
+    --------
+    ParsingResult
+        The merged result of the query.
+    """
+    if not SELECTParser.match_statement(statement):
+        return ParsingResult(
+            status=False,
+            message="Distributed queries only support SELECT statements",
+            data=None,
+        )
+    parser = SELECTParser(statement, conn)
+    validation_result = parser.validate()
+    if validation_result:
+        return validation_result
+    if parser.has_joins or len(parser.tables) != 1:
+        return ParsingResult(
+            status=False,
+            message="Distributed queries must select from a single table",
+            data=None,
+        )
+
+    table = parser.tables[0]
+    files = parser.list_table_files(table)
+    metadata = parser.table_connection(table).list_files_metadata()
+    units = balance_work_units(
+        {f: metadata[f].size if f in metadata else 0 for f in files},
+        num_units,
+    )
+    query = " ".join([t.text for t in statement.tokens])
+    responses = invoker.invoke(
+        [
+            {
+                "database": conn.uri,
+                "connection": connection_kind,
+                "query": query,
+                "files": unit,
+            }
+            for unit in units
+        ]
+    )
+
+    # Slices the partial results by file, for merging in the file order
+    file_data: dict[str, pd.DataFrame] = {}
+    for unit, response in zip(units, responses):
+        if response.get("statusCode") != 200:
+            return ParsingResult(
+                status=False,
+                message=response.get("message", "Worker failed"),
+                data=None,
+            )
+        df = _read_partial_result(response)
+        offset = 0
+        for f, rows in zip(unit, response["rows"]):
+            file_data[f] = df.iloc[offset : offset + rows]
+            offset += rows
+
+    if len(files) > 0:
+        data = pd.concat([file_data[f] for f in files], ignore_index=True)
+    else:
+        data = pd.DataFrame(columns=[c.fullname for c in table.columns])
+    return ParsingResult(status=True, message=str(files), data=data)
@@ -0,0 +1,166 @@
+import hashlib
+import pandas as pd
+from typing import Optional
+
+from morgana_engine.models.sql import SQLStatement, ParsingResult
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+
+
+def statement_hash(statement: SQLStatement) -> str:
+    """
+    Returns a digest that identifies a statement, used for checking if
+    an incremental token was produced by the same query.
+    """
+    text = " ".join([t.text for t in statement.tokens])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _token_files(token: Optional[dict], query_hash: str) -> list[dict]:
+    if token is None or token.get("query") != query_hash:
+        return []
+    return token.get("files", [])
+
+
+def merge_incremental(
+    previous: pd.DataFrame,
+    previous_token: Optional[dict],
+    delta: pd.DataFrame,
+    token: dict,
+) -> pd.DataFrame:
+    """
+    Merges the result of a previous query with the delta that was
+    obtained by an incremental query, replacing the rows that came
+    from files which were modified or removed.
+
+    Parameters:
+    -----------
+    previous : pd.DataFrame
+        The result that was obtained with the previous token.
+    previous_token : dict | None
+        The token that was returned together with the previous result.
+    delta : pd.DataFrame
+        The result of the incremental query.
+    token : dict
+        The token that was returned together with the delta.
+
+    Returns:
+    --------
+    pd.DataFrame
+        The result as if the query was executed over all the files.
+    """
+    previous_slices: dict[tuple[str, str], tuple[str, int, int]] = {}
+    offset = 0
+    for f in _token_files(previous_token, token["query"]):
+        previous_slices[(f["table"], f["name"])] = (
+            f["version"],
+            offset,
+            f["rows"],
+        )
+        offset += f["rows"]
+
+    parts: list[pd.DataFrame] = []
+    delta_offset = 0
+    for f in token["files"]:
+        previous_slice = previous_slices.get((f["table"], f["name"]))
+        if previous_slice is not None and previous_slice[0] == f["version"]:
+            _, start, rows = previous_slice
+            parts.append(previous.iloc[start : start + rows])
+        else:
+            rows = f["rows"]
+            parts.append(delta.iloc[delta_offset : delta_offset + rows])
+            delta_offset += rows
+    if len(parts) == 0:
+        return delta.iloc[0:0]
+    return pd.concat(parts, ignore_index=True)
+
+
+def incremental_parse(
+    statement: SQLStatement,
+    conn: Connection,
+    token: Optional[dict] = None,
+    previous: Optional[pd.DataFrame] = None,
+) -> ParsingResult:
+    """
+    Executes a SELECT statement reading only the files that are new or
+    were modified since the given token was produced.
+
+    The token is a JSON-serializable dict that lists the files that
+    contributed to the result, with their versions and number of rows
+    after filtering. If no token is given, or if the token was produced
+    by another query, all the files are read.
+
+    Parameters:
+    -----------
+    statement : SQLStatement
+        The statement to be executed. Must be a SELECT from a single table.
+    conn : Connection
+        The connection to the database.
+    token : dict | None
+        The token returned by the previous execution of the query.
+    previous : pd.DataFrame | None
+        The data returned by the previous execution of the query. If given,
+        the result is merged with the delta, otherwise only the delta
+        is returned.
+
+    Returns:
+    --------
+    ParsingResult
+        The result of the query, with the new token.
+    """
+    if not SELECTParser.match_statement(statement):
+        return ParsingResult(
+            status=False,
+            message="Incremental queries only support SELECT statements",
+            data=None,
+        )
+    parser = SELECTParser(statement, conn)
+    validation_result = parser.validate()
+    if validation_result:
+        return validation_result
+    if parser.has_joins or len(parser.tables) != 1:
+        return ParsingResult(
+            status=False,
+            message="Incremental queries must select from a single table",
+            data=None,
+        )
+
+    table = parser.tables[0]
+    query_hash = statement_hash(statement)
+    known_files = {
+        (f["table"], f["name"]): f for f in _token_files(token, query_hash)
+    }
+    metadata = parser.table_connection(table).list_files_metadata()
+
+    token_files: list[dict] = []
+    read_files: list[str] = []
+    dfs: list[pd.DataFrame] = []
+    for f in sorted(parser.list_table_files(table)):
+        version = metadata[f].version if f in metadata else ""
+        known_file = known_files.get((table.name, f))
+        if known_file is not None and known_file["version"] == version:
+            token_files.append(known_file)
+            continue
+        df = parser.filter_data(parser.read_table_file(table, f))
+        dfs.append(df)
+        read_files.append(f)
+        token_files.append(
+            {
+                "table": table.name,
+                "name": f,
+                "version": version,
+                "rows": len(df),
+            }
+        )
+
+    new_token = {"query": query_hash, "files": token_files}
+    if len(dfs) > 0:
+        data = pd.concat(dfs, ignore_index=True)
+    else:
+        data = pd.DataFrame(columns=[c.fullname for c in table.columns])
+    if previous is not None:
+        data = merge_incremental(previous, token, data, new_token)
+
+    return ParsingResult(
+        status=True, message=str(read_files), data=data, token=new_token
+    )
@@ -1,55 +1,64 @@
+import re
 from morgana_engine.models.sql import SQLTokenType, SQLToken, SQLStatement
-from morgana_engine.models.sql import (
-    PUNCTUATION_TOKEN_TYPES,
+from morgana_engine.models.sql import SQLLiteralToken
+from typing import List
+
+# Alternatives are tried in order at each position, so the longer
+# operators must come before their prefixes.
+_DELIMITERS = r"\s,;()=<>!'\".*"
+_TOKEN_PATTERN = re.compile(
+    rf"""
+    (?P<space>\s+)
+    | '(?P<single_quoted>(?:[^']|'')*)'
+    | "(?P<double_quoted>(?:[^"]|"")*)"
+    | (?P<number>-?\d+(?P<fraction>\.\d+)?(?:[eE][+-]?\d+)?)
+      (?![^{_DELIMITERS}])
+    | (?P<operator>!=|>=|<=|[,;()=<>.*])
+    | (?P<word>[^{_DELIMITERS}]+)
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
 )
-from typing import List, Optional
 
 
 class SQLLexer:
     @staticmethod
-    def _contains_punctuation_token(value: str) -> Optional[SQLTokenType]:
-        for punctuation_token in PUNCTUATION_TOKEN_TYPES:
-            if punctuation_token.value in value:
-                return punctuation_token
-        return None
-
-    @staticmethod
-    def _recursive_lex(query: str) -> List[SQLToken]:
-        parts = [q_part for q_part in query.split(" ") if len(q_part) > 0]
-        result = []
-        for part in parts:
-            token = SQLToken.factory(part)
-            if token:
-                result.append(token)
-            else:
-                # Searches for punctuation inside part
-                punctuation_token = SQLLexer._contains_punctuation_token(part)
-                if punctuation_token == SQLTokenType.DOT:
-                    if all(
-                        [
-                            s.isnumeric()
-                            for s in part.split(SQLTokenType.DOT.value)
-                        ]
-                    ):
-                        result.append(SQLToken(SQLTokenType.ENTITY, part))
-                        continue
-                if punctuation_token:
-                    value = punctuation_token.value
-                    new_query = part.replace(value, f" {value} ")
-                    result += SQLLexer._recursive_lex(new_query)
+    def _scan(query: str) -> List[SQLToken]:
+        """
+        Splits the query into tokens in a single pass, stopping at the
+        first semicolon outside of a string literal.
+        """
+        result: List[SQLToken] = []
+        for match in _TOKEN_PATTERN.finditer(query):
+            kind = match.lastgroup
+            text = match.group(0)
+            if kind == "space":
+                continue
+            elif kind in ("single_quoted", "double_quoted"):
+                quote = text[0]
+                value = match.group(kind).replace(quote * 2, quote)
+                result.append(SQLLiteralToken(text, value))
+            elif kind == "number":
+                if match.group("fraction") is not None or "e" in text.lower():
+                    result.append(SQLLiteralToken(text, float(text)))
                 else:
-                    result.append(SQLToken(SQLTokenType.ENTITY, part))
+                    result.append(SQLLiteralToken(text, int(text)))
+            elif kind == "operator":
+                token_type = SQLTokenType.factory(text)
+                assert token_type is not None
+                if token_type == SQLTokenType.SEMICOLON:
+                    break
+                result.append(SQLToken(token_type, text))
+            else:
+                token_type = SQLTokenType.factory(text.upper())
+                result.append(
+                    SQLToken(
+                        token_type if token_type else SQLTokenType.ENTITY,
+                        text,
+                    )
+                )
         return result
 
 
 def lex(query: str) -> SQLStatement:
-    q = query.strip().replace("\n", "")
-    tokens = SQLLexer._recursive_lex(q)
-
-    def _find_semicolon(t: SQLToken) -> bool:
-        return t.type == SQLTokenType.SEMICOLON
-
-    semicolon = list(filter(_find_semicolon, tokens))
-    if len(semicolon) > 0:
-        tokens = tokens[: tokens.index(semicolon[0])]
-    return SQLStatement(tokens)
+    return SQLStatement(SQLLexer._scan(query.strip()))
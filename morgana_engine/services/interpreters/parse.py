@@ -3,10 +3,12 @@ from morgana_engine.models.sql import (
     ParsingResult,
     SQLParser,
 )
-from typing import List, Type
+from typing import List, Optional, Type
 
 from morgana_engine.services.interpreters.parsers.select import SELECTParser
 from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.adapters.repository.reader import FileReader
+from morgana_engine.models.options import ExecutionOptions
 
 PARSERS: List[Type[SQLParser]] = [SELECTParser]
 
@@ -23,9 +25,26 @@ def _factory(
         )
 
 
-def parse(statement: SQLStatement, conn: Connection) -> ParsingResult:
-    parser_type = _factory(statement)
-    parser = parser_type(statement, conn)
+def statement_parser(
+    statement: SQLStatement,
+    conn: Connection,
+    reader: Optional[FileReader] = None,
+    options: Optional[ExecutionOptions] = None,
+) -> SQLParser:
+    """
+    Returns the parser of a statement, which must still be validated
+    before being parsed, for executing its stages separately.
+    """
+    return _factory(statement)(statement, conn, reader, options)
+
+
+def parse(
+    statement: SQLStatement,
+    conn: Connection,
+    reader: Optional[FileReader] = None,
+    options: Optional[ExecutionOptions] = None,
+) -> ParsingResult:
+    parser = statement_parser(statement, conn, reader, options)
     validation_result = parser.validate()
     if validation_result:
         return validation_result
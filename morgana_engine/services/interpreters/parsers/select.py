@@ -1,48 +1,215 @@
 from morgana_engine.models.sql import (
     SQLTokenType,
     SQLToken,
+    SQLSetToken,
+    SQLValueListToken,
     SQLStatement,
     SQLParser,
     ParsingResult,
-    OPERATION_TOKEN_TYPES,
+    literal_text,
 )
 
-import numpy as np
+import operator
 import pandas as pd
+import pyarrow as pa  # type: ignore
+import pickle
+import uuid
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
 from pandas.api.types import is_datetime64_any_dtype as is_datetime
 from pandas.api.types import is_float_dtype as is_float
 from pandas.api.types import is_integer_dtype as is_integer
 from pandas.api.types import is_bool_dtype as is_boolean
 from pandas.api.types import is_string_dtype as is_string
+from morgana_engine.adapters.repository import registry
 from morgana_engine.adapters.repository.connection import Connection
-from morgana_engine.adapters.repository.dataio import factory as io_factory
+from morgana_engine.adapters.repository.reader import FileReader
+from morgana_engine.adapters.repository.spill import ResultBuffer
+from morgana_engine.models.options import ExecutionOptions
 from morgana_engine.models.readingfilter import type_factory, ReadingFilter
-from morgana_engine.models.parsedsql import Column, Table, QueryingFilter
+from morgana_engine.models.parsedsql import (
+    Column,
+    Table,
+    QueryingFilter,
+    Predicate,
+    BooleanExpression,
+    FilterExpression,
+)
 from morgana_engine.utils.types import casting_functions
+from morgana_engine.utils.ipc import table_to_ipc, ipc_to_table
 from morgana_engine.utils.sql import (
     partitions_in_file,
     partition_value_in_file,
+    current_partition_files,
+    quote_identifier,
+)
+from functools import reduce
+from typing import (
+    Optional,
+    Union,
+    List,
+    Tuple,
+    Any,
+    Iterator,
+    Callable,
+    Mapping,
 )
-from os.path import join
-from typing import Optional, Union, List, Tuple, Any
+
+COMPARISON_TOKEN_TYPES = [
+    SQLTokenType.EQUALS,
+    SQLTokenType.DIFFERENT,
+    SQLTokenType.GREATER,
+    SQLTokenType.GREATER_EQUAL,
+    SQLTokenType.LESS,
+    SQLTokenType.LESS_EQUAL,
+    SQLTokenType.IN,
+]
+
+LOGICAL_OPERATOR_PRECEDENCES = {
+    SQLTokenType.OR: 1,
+    SQLTokenType.AND: 2,
+}
+
+# Maximum number of nested parentheses in the WHERE clause, which keeps
+# the recursion of the parser and of the filters far from the limit
+MAX_FILTER_DEPTH = 64
+
+ROW_OPERATORS: dict[str, Callable[[pd.Series, Any], pd.Series]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda s, v: s.isin(v),
+    "not in": lambda s, v: ~s.isin(v),
+}
+
+# Column types whose filters are pushed down to SQL backends, since
+# their values compare in the same way in the backend and in pandas
+PUSHDOWN_COLUMN_TYPES = ["int", "float", "string"]
+
+# Maximum number of parameters in a condition that is pushed down
+PUSHDOWN_MAX_PARAMETERS = 999
 
 
 class SELECTParser(SQLParser):
-    def __init__(self, statement: SQLStatement, conn: Connection):
-        super().__init__(statement, conn)
+    def __init__(
+        self,
+        statement: SQLStatement,
+        conn: Connection,
+        reader: Optional[FileReader] = None,
+        options: Optional[ExecutionOptions] = None,
+    ):
+        super().__init__(statement, conn, reader, options)
         self.__tables: List[Table] = []
+        self.__table_files: dict[str, list[str]] = {}
+        self.__table_conns: dict[str, Connection] = {}
+        self.__rows_filtered: bool = False
         self.__select_index: int = -1
         self.__from_index: int = -1
         self.__where_index: int = -1
         self.__filtered: bool = False
         self.__joining_columns: List[Tuple[Column, Column, str]] = []
-        self.__reading_filters: List[ReadingFilter] = []
-        self.__querying_filters: List[Union[QueryingFilter, str]] = []
+        self.__filter_expression: Optional[FilterExpression] = None
+        self.__reading_filters: Any = None
+        self.__querying_filters: Any = None
+        self.__scan_context: Optional[tuple[str, bytes]] = None
 
     @staticmethod
     def match_statement(statement: SQLStatement) -> bool:
         return statement.tokens[0].type == SQLTokenType.SELECT
 
+    def __resolve_subqueries(self) -> Optional[ParsingResult]:
+        """
+        Executes the subqueries that are given as the values of IN or
+        NOT IN operations, replacing each one by a token that holds the
+        set of values in the first column of its result. The set is then
+        used both for pruning the partitions and for filtering the rows
+        of the outer query, as in a semi-join.
+        """
+        tokens = self.statement.tokens
+        resolved_tokens: List[SQLToken] = []
+        i = 0
+        while i < len(tokens):
+            is_subquery = (
+                tokens[i].type == SQLTokenType.LPAREN
+                and i > 0
+                and tokens[i - 1].type in [SQLTokenType.IN, SQLTokenType.NOT_IN]
+                and i + 1 < len(tokens)
+                and tokens[i + 1].type == SQLTokenType.SELECT
+            )
+            if not is_subquery:
+                resolved_tokens.append(tokens[i])
+                i += 1
+                continue
+            # Finds the closing parenthesis of the subquery
+            depth = 0
+            end_index = -1
+            for j in range(i, len(tokens)):
+                if tokens[j].type == SQLTokenType.LPAREN:
+                    depth += 1
+                elif tokens[j].type == SQLTokenType.RPAREN:
+                    depth -= 1
+                    if depth == 0:
+                        end_index = j
+                        break
+            if end_index == -1:
+                return ParsingResult(
+                    status=False,
+                    message="Subquery without closing parenthesis",
+                    data=None,
+                )
+            subquery_tokens = tokens[i + 1 : end_index]
+            subquery = SELECTParser(
+                SQLStatement(subquery_tokens),
+                self.conn,
+                self.reader,
+                self.options,
+            )
+            r = subquery.validate()
+            if r is None:
+                r = subquery.parse()
+            if not r.status:
+                return r
+            values = self.__subquery_values(r)
+            if values is None:
+                return ParsingResult(
+                    status=False,
+                    message="Subquery must select at least one column",
+                    data=None,
+                )
+            resolved_tokens.append(
+                SQLSetToken(" ".join([t.text for t in subquery_tokens]), values)
+            )
+            i = end_index + 1
+        if len(resolved_tokens) != len(tokens):
+            self.statement = SQLStatement(resolved_tokens)
+        return None
+
+    @staticmethod
+    def __subquery_values(result: ParsingResult) -> Optional[frozenset]:
+        """
+        Returns the distinct non-null values of the first column of the
+        result of a subquery, reading the spilled results batch by batch,
+        or None when the result has no columns.
+        """
+        if result.batches is not None:
+            try:
+                schema = result.batches.schema
+                if schema is None or len(schema) == 0:
+                    return None
+                values: set = set()
+                for batch in result.batches.iter_batches():
+                    column = batch.column(0).to_pandas()
+                    values.update(column.dropna().unique().tolist())
+                return frozenset(values)
+            finally:
+                result.batches.close()
+        if result.data is None or len(result.data.columns) == 0:
+            return None
+        return frozenset(result.data.iloc[:, 0].dropna().unique().tolist())
+
     def __validate_select_from(self) -> Optional[ParsingResult]:
         tokens = self.statement.tokens
         select_tokens = list(
@@ -170,6 +337,7 @@ class SELECTParser(SQLParser):
                     message=f"Table {table.name} not found",
                     data=None,
                 )
+            self.__table_conns[table.name] = table_conn
             for (
                 column_name,
                 column_type,
@@ -357,303 +525,209 @@ class SELECTParser(SQLParser):
 
         return None
 
-    def __recursive_get_reading_filters(
-        self, tokens: List[SQLToken], context_depths: np.ndarray
-    ) -> Union[Tuple[List[SQLToken], np.ndarray], ParsingResult]:
-        # Get deepest context and extract tokens
-        max_context_depth = max(context_depths)
-        indices = np.where(context_depths == max_context_depth)[0]
-        internal_tokens: List[SQLToken] = [tokens[i] for i in indices]
-        initial_index = indices[0]
-        final_index = indices[-1]
-        before_tokens, before_depths = (
-            tokens[:initial_index],
-            context_depths[:initial_index],
-        )
-        after_tokens, after_depths = (
-            tokens[final_index + 1 :],
-            context_depths[final_index + 1 :],
-        )
-        if SQLTokenType.LPAREN in [t.type for t in internal_tokens]:
-            initial_index += 1
-            internal_tokens = internal_tokens[1:]
-        if SQLTokenType.RPAREN in [t.type for t in internal_tokens]:
-            final_index -= 1
-            internal_tokens = internal_tokens[:-1]
-
-        if all(
-            [
-                t.type in [SQLTokenType.ENTITY, SQLTokenType.COMMA]
-                for t in internal_tokens
-            ]
-            + [len(tokens) > 0]
-        ):
-            # If there are only entities and commas, it is a list
-            # of values.
-            value_list_token = SQLToken(
-                SQLTokenType.ENTITY,
-                text=" ".join([t.text for t in internal_tokens]),
-            )
-            tokens_to_add = [value_list_token]
-            depths_to_add = np.array(
-                [max_context_depth - 1] * len(tokens_to_add), dtype=int
-            )
-        else:
-            tokens_to_add = []
-            depths_to_add = np.array([])
-            # Split be AND and OR operators
-            subfilters = self.__split_by_token_type(
-                internal_tokens, [SQLTokenType.AND, SQLTokenType.OR]
+    def __parse_predicate(
+        self, tokens: List[SQLToken], start: int
+    ) -> Union[Tuple[Predicate, int], ParsingResult]:
+        """
+        Parses a comparison between a column and constant values, which
+        begins at the given position, returning the predicate and the
+        position of the next token.
+        """
+
+        def __error(message: str) -> ParsingResult:
+            context = [str(t) for t in tokens[start : i + 1]]
+            return ParsingResult(
+                status=False, message=f"{message} {context}", data=None
             )
-            # Create each reading filter
-            for f in subfilters:
-                operation = list(
-                    filter(
-                        lambda t: t.type in OPERATION_TOKEN_TYPES,
-                        f,
-                    )
-                )
-                if len(operation) == 0:
-                    return ParsingResult(
-                        status=False,
-                        message="No operation found in filter"
-                        + f" {[str(t) for t in f]}",
-                        data=None,
-                    )
-                else:
-                    column_tokens = f[: f.index(operation[0])]
-                    value_tokens = f[f.index(operation[-1]) + 1 :]
-                    if len(operation) == 2:
-                        if not all(
-                            [
-                                t.type
-                                in [
-                                    SQLTokenType.NOT,
-                                    SQLTokenType.IN,
-                                ]
-                                for t in operation
-                            ]
-                        ):
-                            return ParsingResult(
-                                status=False,
-                                message="Invalid operation found in filter"
-                                + f" {[str(t) for t in operation]}",
-                                data=None,
-                            )
-                        else:
-                            operation = [
-                                SQLToken(SQLTokenType.NOT_IN, text="NOT IN")
-                            ]
-                column_or_result = self.__get_column_from_token_list(
-                    column_tokens
-                )
 
-                if isinstance(column_or_result, ParsingResult):
-                    return column_or_result
+        # Column, possibly with the table name or alias
+        i = start
+        while i < len(tokens) and tokens[i].type in [
+            SQLTokenType.ENTITY,
+            SQLTokenType.DOT,
+        ]:
+            i += 1
+        if i == start or i == len(tokens):
+            return __error("No operation found in filter")
+        column_tokens = tokens[start:i]
+
+        operator = tokens[i]
+        if (
+            operator.type == SQLTokenType.NOT
+            and i + 1 < len(tokens)
+            and tokens[i + 1].type == SQLTokenType.IN
+        ):
+            operator = SQLToken(SQLTokenType.NOT_IN, text="NOT IN")
+            i += 1
+        elif operator.type not in COMPARISON_TOKEN_TYPES:
+            return __error("Invalid operation found in filter")
+        i += 1
+
+        values: List[SQLToken] = []
+        if operator.type not in [SQLTokenType.IN, SQLTokenType.NOT_IN]:
+            if i == len(tokens) or tokens[i].type != SQLTokenType.ENTITY:
+                return __error("No value found in filter")
+            values.append(tokens[i])
+            i += 1
+        elif i < len(tokens) and isinstance(tokens[i], SQLSetToken):
+            values.append(tokens[i])
+            i += 1
+        else:
+            # Values list, which may end with a comma, is kept as a
+            # single token with the set of values
+            if i == len(tokens) or tokens[i].type != SQLTokenType.LPAREN:
+                return __error("No values list found in filter")
+            i += 1
+            list_tokens: List[SQLToken] = []
+            while i < len(tokens) and tokens[i].type == SQLTokenType.ENTITY:
+                list_tokens.append(tokens[i])
+                i += 1
+                if i < len(tokens) and tokens[i].type == SQLTokenType.COMMA:
+                    i += 1
                 else:
-                    column = column_or_result
-                reading_filter_type = type_factory(operation[0])
-                r = reading_filter_type(column, operation[0], value_tokens)
-                self.__reading_filters.append(r)
-
-        return (
-            before_tokens + tokens_to_add + after_tokens,
-            np.concatenate([before_depths, depths_to_add, after_depths]),
-        )
-
-    def __get_reading_filters(self) -> Optional[ParsingResult]:
-        def __add_token_context_depths(tokens: List[SQLToken]) -> np.ndarray:
-            context_depths: np.ndarray = np.zeros_like(tokens, dtype=int)
-            current_context = 0
-            for i, t in enumerate(tokens):
-                if t.type == SQLTokenType.LPAREN:
-                    current_context += 1
-                context_depths[i] = current_context
-                if t.type == SQLTokenType.RPAREN:
-                    current_context -= 1
-            return context_depths
-
+                    break
+            if i == len(tokens) or tokens[i].type != SQLTokenType.RPAREN:
+                return __error("Invalid values list found in filter")
+            values.append(SQLValueListToken(list_tokens))
+            i += 1
+
+        column = self.__get_column_from_token_list(column_tokens)
+        if isinstance(column, ParsingResult):
+            return column
+        return Predicate(column, operator, values), i
+
+    def __get_filter_expression(self) -> Optional[ParsingResult]:
+        """
+        Builds the expression tree of the WHERE clause by precedence
+        climbing, where AND binds tighter than OR, in a single pass over
+        the tokens. Chains of the same logical operator are kept as a
+        single node with many operands.
+        """
         if self.__where_index == -1:
             return None
 
         tokens = self.statement.tokens[self.__where_index + 1 :]
-        context_depths = __add_token_context_depths(tokens)
-
-        # Recursively parses tokens and context depths, replacing
-        # inner contexts with single tokens whenever possible
-        # and creating the reading filters
-
-        while len(tokens) > 0:
-            r = self.__recursive_get_reading_filters(tokens, context_depths)
-            if isinstance(r, ParsingResult):
-                return r
-            else:
-                tokens, context_depths = r
-        return None
-
-    def __recursive_get_querying_filters(
-        self, tokens: List[SQLToken], context_depths: np.ndarray
-    ) -> Union[Tuple[List[SQLToken], np.ndarray], ParsingResult]:
-        # Get deepest context and extract tokens
-        max_context_depth = max(context_depths)
-        indices = np.where(context_depths == max_context_depth)[0]
-        internal_tokens: List[SQLToken] = [tokens[i] for i in indices]
-        initial_index = indices[0]
-        final_index = indices[-1]
-        before_tokens, before_depths = (
-            tokens[:initial_index],
-            context_depths[:initial_index],
-        )
-        after_tokens, after_depths = (
-            tokens[final_index + 1 :],
-            context_depths[final_index + 1 :],
-        )
-        if SQLTokenType.LPAREN in [t.type for t in internal_tokens]:
-            initial_index += 1
-            internal_tokens = internal_tokens[1:]
-        if SQLTokenType.RPAREN in [t.type for t in internal_tokens]:
-            final_index -= 1
-            internal_tokens = internal_tokens[:-1]
-
-        if all(
-            [
-                t.type in [SQLTokenType.ENTITY, SQLTokenType.COMMA]
-                for t in internal_tokens
-            ]
-            + [len(tokens) > 0]
-        ):
-            # If there are only entities and commas, it is a list
-            # of values.
-            value_list_token = SQLToken(
-                SQLTokenType.ENTITY,
-                text=" ".join([t.text for t in internal_tokens]),
-            )
-            tokens_to_add = [value_list_token]
-            depths_to_add = np.array(
-                [max_context_depth - 1] * len(tokens_to_add), dtype=int
-            )
-        else:
-            tokens_to_add = []
-            depths_to_add = np.array([])
-            # Split be AND and OR operators
-            subfilters = self.__split_by_token_type(
-                internal_tokens, [SQLTokenType.AND, SQLTokenType.OR]
-            )
-            filter_delimiters = [
-                t
-                for t in internal_tokens
-                if t.type in [SQLTokenType.AND, SQLTokenType.OR]
-            ]
-            # Create each reading filter
-            for i, f in enumerate(subfilters):
-                operation = list(
-                    filter(
-                        lambda t: t.type in OPERATION_TOKEN_TYPES,
-                        f,
-                    )
-                )
-                if len(operation) == 0:
-                    return ParsingResult(
-                        status=False,
-                        message="No operation found in filter"
-                        + f" {[str(t) for t in f]}",
-                        data=None,
-                    )
-                else:
-                    column_tokens = f[: f.index(operation[0])]
-                    value_tokens = f[f.index(operation[-1]) + 1 :]
-                    if len(operation) == 2:
-                        if not all(
-                            [
-                                t.type
-                                in [
-                                    SQLTokenType.NOT,
-                                    SQLTokenType.IN,
-                                ]
-                                for t in operation
-                            ]
-                        ):
-                            return ParsingResult(
-                                status=False,
-                                message="Invalid operation found in filter"
-                                + f" {[str(t) for t in operation]}",
-                                data=None,
-                            )
-                        else:
-                            operation = [
-                                SQLToken(SQLTokenType.NOT_IN, text="NOT IN")
-                            ]
-                column_or_result = self.__get_column_from_token_list(
-                    column_tokens
+        position = 0
+        depth = 0
+
+        def __parse_operand() -> Union[FilterExpression, ParsingResult]:
+            nonlocal position, depth
+            if tokens[position].type != SQLTokenType.LPAREN:
+                r = self.__parse_predicate(tokens, position)
+                if isinstance(r, ParsingResult):
+                    return r
+                predicate, position = r
+                return predicate
+            if depth == MAX_FILTER_DEPTH:
+                return ParsingResult(
+                    status=False,
+                    message="Filter nested too deeply",
+                    data=None,
                 )
-                if isinstance(column_or_result, ParsingResult):
-                    return column_or_result
-                else:
-                    column = column_or_result
-                logical_operator_mappings: dict[str, str] = {
-                    "=": "==",
-                    "AND": "&",
-                    "OR": "|",
-                    "NOT IN": "not in",
-                    "IN": "in",
-                }
-                operation_token = operation[0]
-                operator = logical_operator_mappings.get(
-                    operation_token.text,
-                    operation_token.text,
+            position += 1
+            depth += 1
+            expression = __parse_expression(0)
+            depth -= 1
+            if isinstance(expression, ParsingResult):
+                return expression
+            if (
+                position == len(tokens)
+                or tokens[position].type != SQLTokenType.RPAREN
+            ):
+                return ParsingResult(
+                    status=False,
+                    message="Filter without closing parenthesis",
+                    data=None,
                 )
-                value_str = (
-                    "(" + value_tokens[0].text + ")"
-                    if operation_token.type
-                    in [SQLTokenType.IN, SQLTokenType.NOT_IN]
-                    else value_tokens[0].text
+            position += 1
+            return expression
+
+        def __parse_expression(
+            min_precedence: int,
+        ) -> Union[FilterExpression, ParsingResult]:
+            nonlocal position
+            if position == len(tokens):
+                return ParsingResult(
+                    status=False,
+                    message="No filter found after logical operator",
+                    data=None,
                 )
-                q = QueryingFilter(column, operator, value_str)
-                self.__querying_filters.append(q)
-                if i < len(filter_delimiters):
-                    delimiter = logical_operator_mappings.get(
-                        filter_delimiters[i].text,
-                        filter_delimiters[i].text,
-                    )
-                    self.__querying_filters.append(delimiter)
-
-        return (
-            before_tokens + tokens_to_add + after_tokens,
-            np.concatenate([before_depths, depths_to_add, after_depths]),
-        )
+            lhs = __parse_operand()
+            if isinstance(lhs, ParsingResult):
+                return lhs
+            while position < len(tokens):
+                operator = tokens[position].type
+                precedence = LOGICAL_OPERATOR_PRECEDENCES.get(operator)
+                if precedence is None or precedence < min_precedence:
+                    break
+                position += 1
+                rhs = __parse_expression(precedence + 1)
+                if isinstance(rhs, ParsingResult):
+                    return rhs
+                if (
+                    isinstance(lhs, BooleanExpression)
+                    and lhs.operator == operator
+                ):
+                    lhs.operands.append(rhs)
+                else:
+                    lhs = BooleanExpression(operator, [lhs, rhs])
+            return lhs
 
-    def __get_querying_filters(self) -> Optional[ParsingResult]:
-        def __add_token_context_depths(tokens: List[SQLToken]) -> np.ndarray:
-            context_depths: np.ndarray = np.zeros_like(tokens, dtype=int)
-            current_context = 0
-            for i, t in enumerate(tokens):
-                if t.type == SQLTokenType.LPAREN:
-                    current_context += 1
-                context_depths[i] = current_context
-                if t.type == SQLTokenType.RPAREN:
-                    current_context -= 1
-            return context_depths
+        expression = __parse_expression(0)
+        if isinstance(expression, ParsingResult):
+            return expression
+        if position < len(tokens):
+            return ParsingResult(
+                status=False,
+                message=f"Unexpected token in filter {tokens[position]}",
+                data=None,
+            )
+        self.__filter_expression = expression
+        return None
 
-        if self.__where_index == -1:
+    @staticmethod
+    def __map_filter_expression(
+        expression: Optional[FilterExpression], func: Callable
+    ) -> Any:
+        if expression is None:
             return None
+        if isinstance(expression, BooleanExpression):
+            return expression.map(func)
+        return func(expression)
 
-        tokens = self.statement.tokens[self.__where_index + 1 :]
-        context_depths = __add_token_context_depths(tokens)
+    def __get_reading_filters(self) -> Optional[ParsingResult]:
+        def __reading_filter(p: Predicate) -> ReadingFilter:
+            return type_factory(p.operator)(p.column, p.operator, p.values)
 
-        # Recursively parses tokens and context depths, replacing
-        # inner contexts with single tokens whenever possible
-        # and creating the reading filters
+        self.__reading_filters = self.__map_filter_expression(
+            self.__filter_expression, __reading_filter
+        )
+        return None
 
-        while len(tokens) > 0:
-            r = self.__recursive_get_querying_filters(tokens, context_depths)
-            if isinstance(r, ParsingResult):
-                return r
-            else:
-                tokens, context_depths = r
+    def __get_querying_filters(self) -> Optional[ParsingResult]:
+        logical_operator_mappings: dict[str, str] = {
+            "=": "==",
+            "NOT IN": "not in",
+            "IN": "in",
+        }
+
+        def __querying_filter(p: Predicate) -> QueryingFilter:
+            operator = logical_operator_mappings.get(
+                p.operator.text, p.operator.text
+            )
+            value = p.values[0]
+            if isinstance(value, SQLSetToken):
+                return QueryingFilter(p.column, operator, value.text, value)
+            return QueryingFilter(p.column, operator, literal_text(value), None)
+
+        self.__querying_filters = self.__map_filter_expression(
+            self.__filter_expression, __querying_filter
+        )
         return None
 
     def validate(self) -> Optional[ParsingResult]:
         validators = [
+            self.__resolve_subqueries,
             self.__validate_select_from,
             self.__validate_where,
             self.__get_querying_tables,
@@ -661,6 +735,7 @@ class SELECTParser(SQLParser):
             self.__get_querying_columns,
             self.__filter_querying_columns,
             self.__get_joining_columns,
+            self.__get_filter_expression,
             self.__get_reading_filters,
             self.__get_querying_filters,
         ]
@@ -692,79 +767,94 @@ class SELECTParser(SQLParser):
                 return typestring
         return "string"
 
+    def __cast_querying_filter_value(
+        self, f: QueryingFilter, df: pd.DataFrame
+    ) -> Any:
+        casting_func = casting_functions(
+            self.__dataframe_column_type_casting_keyword(df[f.column.fullname])
+        )
+        if f.values is not None:
+            return f.values.value_set(casting_func)
+        return casting_func(f.value)
+
+    def __evaluate_querying_filters(
+        self, expression: Any, df: pd.DataFrame
+    ) -> pd.Series:
+        """
+        Evaluates the tree of querying filters over the rows of the
+        DataFrame, returning a boolean mask.
+        """
+        if isinstance(expression, BooleanExpression):
+            masks = [
+                self.__evaluate_querying_filters(o, df)
+                for o in expression.operands
+            ]
+            if expression.operator == SQLTokenType.AND:
+                return reduce(lambda m1, m2: m1 & m2, masks)
+            return reduce(lambda m1, m2: m1 | m2, masks)
+        value = self.__cast_querying_filter_value(expression, df)
+        return ROW_OPERATORS[expression.operator](
+            df[expression.column.fullname], value
+        )
+
     def __compose_query_and_query_dataframe(
         self,
         df: pd.DataFrame,
     ) -> pd.DataFrame:
-        def __cast_unquoting_value(f: QueryingFilter) -> Any:
-            value = f.value
-            column = f.column.fullname
-            casting_function_keyword = (
-                self.__dataframe_column_type_casting_keyword(df[column])
-            )
-            unquoted_value = value.replace("'", "").replace('"', "").strip()
-            if f.is_collection:
-                str_values = (
-                    unquoted_value.replace("(", "").replace(")", "").split(",")
-                )
-                return tuple(
-                    [
-                        casting_functions(casting_function_keyword)(v.strip())
-                        for v in str_values
-                        if len(v) > 0
-                    ]
-                )
-
-            else:
-                return casting_functions(casting_function_keyword)(
-                    unquoted_value
-                )
+        if self.__querying_filters is None:
+            return df
+        return df[self.__evaluate_querying_filters(self.__querying_filters, df)]
 
-        casted_filter_values: list[Any] = []
-        query_string_parts: list[str] = []
-        num_filters = 0
-        for f in self.__querying_filters:
-            if isinstance(f, QueryingFilter):
-                query_string_part = (
-                    "("
-                    + f"{f.column.fullname} {f.operator}"
-                    + f" @casted_filter_values[{num_filters}]"
-                    + ")"
+    @staticmethod
+    def __prune_partition_file(
+        expression: Any,
+        file_values: dict[str, Any],
+        allowed_values: dict[int, set],
+    ) -> Optional[bool]:
+        """
+        Evaluates the tree of reading filters with the partition values
+        of a file, in a three-valued logic: the filters over columns that
+        are not partitions of the table are unknown (None), so the file is
+        only pruned when the whole expression is False.
+        """
+        if isinstance(expression, BooleanExpression):
+            results = [
+                SELECTParser.__prune_partition_file(
+                    o, file_values, allowed_values
                 )
-                casted_filter_values.append(__cast_unquoting_value(f))
-                query_string_parts.append(query_string_part)
-                num_filters += 1
-            else:
-                query_string_parts.append(f)
-
-        query_string = " ".join(query_string_parts)
-        if num_filters > 0:
-            # All filters have a (column, operator, value) format
-            df = df.query(query_string)
-            return df
-        else:
-            return df
+                for o in expression.operands
+            ]
+            if expression.operator == SQLTokenType.AND:
+                if any([r is False for r in results]):
+                    return False
+                return True if all(results) else None
+            if any([r is True for r in results]):
+                return True
+            return False if all([r is False for r in results]) else None
+        values = allowed_values.get(id(expression))
+        if values is None or expression.column.name not in file_values:
+            return None
+        return file_values[expression.column.name] in values
 
     def __read_files_with_partitions(
         self,
+        table: Table,
         conn: Connection,
-        partition_columns: dict[str, str],
-        filters: list[ReadingFilter],
+        partition_columns: Mapping[str, str],
     ) -> list[str]:
         """
         Lists the files that must be read from a table with partitions,
-        considering the desired filters for each partitioned column.
+        considering the reading filters over the partitioned columns.
 
         Parameters:
         -----------
+        table :  Table
+            The table object to be read.
         conn : Connection
             The connection to the database where the table is located.
-        partition_columns :  dict[str, str]
+        partition_columns :  Mapping[str, str]
             A mapping between columns and their data types, for each
             column that define a partition.
-        filters : list[ReadingFilter]
-            A list of ReadingFilter objects that are associated with the
-            table, for optimize partition reading.
 
         Returns:
         --------
@@ -775,129 +865,326 @@ class SELECTParser(SQLParser):
 
         table_name = conn.schema.name
         table_format = conn.schema.file_type
-        files_to_read: list[str] = []
+        reading_filters = [
+            f
+            for f in self.__filter_expression_leaves(self.__reading_filters)
+            if f.column.table_name == table.name
+            and f.column.name in partition_columns
+        ]
+        files_values: dict[str, dict[str, Any]] = {}
+        allowed_values: dict[int, set] = {}
         for c, c_type in partition_columns.items():
             partition_files = conn.list_partition_files(c)
             casting_func = casting_functions(c_type)
-            # Builds a value: [files] map
-            partition_maps: dict[Any, list[str]] = {}
+            # Builds a file: {column: value} map
             for partition_file in partition_files:
                 # Remove table name and extension from filename
                 parsed_filename = partition_file.lstrip(table_name).strip(
                     table_format
                 )
                 v = casting_func(partition_value_in_file(parsed_filename, c))
-                if v in partition_maps:
-                    partition_maps[v].append(partition_file)
-                else:
-                    partition_maps[v] = [partition_file]
-            # List all possible values
-            partition_values = [
-                casting_func(v) for v in list(partition_maps.keys())
-            ]
-            # Apply filters
-            column_filters = [f for f in filters if f.column.name == c]
-            if len(column_filters) == 0:
-                filtered_values = partition_values
-            else:
-                filtered_values = []
-                for reading_filter in column_filters:
-                    filtered_values += reading_filter.apply(
-                        partition_values, casting_func
+                files_values.setdefault(partition_file, {})[c] = v
+            # Apply filters to all possible values
+            partition_values = list(
+                set([v[c] for v in files_values.values() if c in v])
+            )
+            for f in reading_filters:
+                if f.column.name == c:
+                    allowed_values[id(f)] = set(
+                        f.apply(partition_values, casting_func)
                     )
-                filtered_values = list(set(filtered_values))
-            # Find files with values
-            value_files = []
-            for v in filtered_values:
-                value_files += partition_maps[v]
-            files_to_read += value_files
-        files_to_read = list(set(files_to_read))
-        return files_to_read
-
-    def __select_from_table(
-        self, table: Table, filters: list[ReadingFilter], conn: Connection
-    ) -> dict:
+        return sorted(
+            current_partition_files(
+                [
+                    f
+                    for f, values in files_values.items()
+                    if self.__prune_partition_file(
+                        self.__reading_filters, values, allowed_values
+                    )
+                    is not False
+                ]
+            )
+        )
+
+    @staticmethod
+    def __filter_expression_leaves(expression: Any) -> list:
+        if expression is None:
+            return []
+        if isinstance(expression, BooleanExpression):
+            return expression.leaves()
+        return [expression]
+
+    def __list_table_files(self, table: Table, conn: Connection) -> list[str]:
         """
-        Processes the content of the SELECT statement with respect
-        to a single table, reading the files that are necessary, casting
-        data types if needed and returning the requested columns.
+        Lists the files that must be read from a single table, considering
+        the partitions of the table and the reading filters.
 
         Parameters:
         -----------
         table :  Table
             The table object to be read.
-        filters : list[ReadingFilter]
-            A list of ReadingFilter objects that are associated with the
-            table, for optimize partition reading.
+        conn : Connection
+            The connection to the table.
 
         Returns:
         --------
-        dict
-            A dict with the dataframe with the requested data from the table
-            and some metadata regarding the reading process.
+        list[str]
+            The list of filenames that must be read.
+        """
+        partition_columns: Mapping[str, str] = conn.schema.partitions
+        if len(partition_columns) == 0:
+            return [table.name]
+        return self.__read_files_with_partitions(table, conn, partition_columns)
 
+    @staticmethod
+    def __source_columns(table: Table) -> list[str]:
         """
-        table_conn = conn.access(table.name)
-        if not table_conn.schema.is_table:
-            raise ValueError(f"Schema {table} is not a table")
-        table_format = str(table_conn.schema.file_type)
-        table_io = io_factory(table_format)
+        Lists the queried columns of a table that are stored inside
+        the data files, i.e. that are not obtained from the filenames.
+        """
+        return [c.name for c in table.columns if not c.partition]
 
-        # List partitioned columns from schema
+    def __pushdown_condition(
+        self, expression: Any, table: Table, column_types: Mapping[str, str]
+    ) -> Optional[Tuple[str, list]]:
+        """
+        Translates the tree of reading filters to a SQL condition over the
+        columns of a table. The filters that cannot be translated are
+        dropped from the conjunctions, which only makes the condition
+        less selective, while disjunctions are only translated as a whole.
+        """
+        if isinstance(expression, BooleanExpression):
+            conditions = [
+                self.__pushdown_condition(o, table, column_types)
+                for o in expression.operands
+            ]
+            if expression.operator == SQLTokenType.AND:
+                translated = [c for c in conditions if c is not None]
+            elif all([c is not None for c in conditions]):
+                translated = [c for c in conditions if c is not None]
+            else:
+                return None
+            if len(translated) == 0:
+                return None
+            if len(translated) == 1:
+                return translated[0]
+            sql_operator = f" {expression.operator.name} "
+            return (
+                "(" + sql_operator.join([c[0] for c in translated]) + ")",
+                [p for c in translated for p in c[1]],
+            )
+        column_type = column_types.get(expression.column.name)
+        if (
+            expression.column.table_name != table.name
+            or column_type not in PUSHDOWN_COLUMN_TYPES
+        ):
+            return None
+        try:
+            return expression.to_sql(
+                quote_identifier(expression.column.name),
+                casting_functions(str(column_type)),
+            )
+        except ValueError:
+            return None
 
-        columns: list[Column] = table.columns
-        column_mappings: dict[str, str] = {c.name: c.fullname for c in columns}
+    def __pushdown_where(
+        self, table: Table, conn: Connection
+    ) -> Tuple[Optional[str], list]:
+        """
+        Builds the condition that is pushed down when reading a table from
+        a SQL backend. The rows are filtered again after reading, so the
+        condition may be less selective than the WHERE clause, but never
+        more. With outer joins, the rows are filtered only after joining.
+        """
+        if self.__reading_filters is None or any(
+            [j[2] != "inner" for j in self.__joining_columns]
+        ):
+            return None, []
+        condition = self.__pushdown_condition(
+            self.__reading_filters, table, conn.schema.columns
+        )
+        if condition is None or len(condition[1]) > PUSHDOWN_MAX_PARAMETERS:
+            return None, []
+        return condition
 
-        partition_columns: dict[str, str] = table_conn.schema.partitions
-        # The main result is the list of filenames that must be read
-        # and concatenated.
-        files_to_read: list[str] = []
-        if len(partition_columns) == 0:
-            files_to_read.append(table.name)
-        else:
-            files_to_read += self.__read_files_with_partitions(
-                table_conn, partition_columns, filters
+    def __read_source_batches(
+        self, table: Table, file: str, conn: Connection
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Reads the columns of a table file that are stored in the data
+        source, pushing down the projection and the filters when the
+        connection supports it, in which case the data comes in batches.
+        """
+        if conn.pushdown:
+            where, parameters = self.__pushdown_where(table, conn)
+            yield from self.reader.select(
+                conn, file, self.__source_columns(table), where, parameters
             )
+        else:
+            yield self.reader.read(conn, file, self.__source_columns(table))
 
-        dfs: list[pd.DataFrame] = []
-        for f in files_to_read:
-            dff = table_io.read(
-                join(table_conn.uri, f),
-                storage_options=table_conn.storage_options,
-            )
-            # Adds partition values as columns
-            f_partitions = partitions_in_file(f)
-            for k, v in f_partitions.items():
-                casting_func = casting_functions(
-                    table_conn.schema.partitions[k]
-                )
-                if k in column_mappings.keys():
-                    dff[k] = casting_func(v)
-            dfs.append(dff[list(column_mappings.keys())].copy())
-        df = pd.concat(dfs, ignore_index=True)
-
-        # List non-partitioned columns from schema
-        non_partitioned_columns: dict[str, str] = table_conn.schema.columns
-        # Filters for the columns that have been queried
+    def __read_table_batches(
+        self, table: Table, file: str, conn: Connection
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Reads a single file of a table in batches, adding the partition
+        values as columns, selecting the requested columns, casting data
+        types if needed and renaming the columns to their queried names.
+
+        Parameters:
+        -----------
+        table :  Table
+            The table object to be read.
+        file : str
+            The filename (without extension) to be read.
+        conn : Connection
+            The connection to the table.
+
+        Returns:
+        --------
+        Iterator[pd.DataFrame]
+            The data from the file, with the requested columns.
+        """
+        for dff in self.__read_source_batches(table, file, conn):
+            yield self.__prepare_table_data(table, file, conn, dff)
+
+    def __read_table_file(
+        self, table: Table, file: str, conn: Connection
+    ) -> pd.DataFrame:
+        """
+        Reads a single file of a table, with the requested columns.
+        """
+        dfs = list(self.__read_table_batches(table, file, conn))
+        if len(dfs) == 1:
+            return dfs[0]
+        return pd.concat(dfs, ignore_index=True)
+
+    def __prepare_table_data(
+        self, table: Table, file: str, conn: Connection, dff: pd.DataFrame
+    ) -> pd.DataFrame:
+        column_mappings: dict[str, str] = {
+            c.name: c.fullname for c in table.columns
+        }
+        # Adds partition values as columns
+        f_partitions = partitions_in_file(file)
+        for k, v in f_partitions.items():
+            casting_func = casting_functions(conn.schema.partitions[k])
+            if k in column_mappings.keys():
+                dff[k] = casting_func(v)
+        if list(dff.columns) != list(column_mappings.keys()):
+            dff = dff[list(column_mappings.keys())].copy()
+
+        # Non-partitioned columns from schema that have been queried
         non_partitioned_columns = {
-            k: v for k, v in non_partitioned_columns.items() if k in df.columns
+            k: v for k, v in conn.schema.columns.items() if k in dff.columns
         }
         for col, col_type in non_partitioned_columns.items():
             # Casts columns to the right types when date or datetime
-            if pd.api.types.is_object_dtype(df[col]) and col_type in [
+            if pd.api.types.is_object_dtype(dff[col]) and col_type in [
                 "date",
                 "datetime",
             ]:
-                df[col] = pd.to_datetime(df[col])
+                dff[col] = pd.to_datetime(dff[col])
 
         # Rename due columns
-        df = df.rename(columns=column_mappings)
+        return dff.rename(columns=column_mappings)
 
+    def __select_from_table(self, table: Table) -> dict:
+        """
+        Processes the content of the SELECT statement with respect
+        to a single table, reading the files that are necessary, casting
+        data types if needed and returning the requested columns.
+
+        Parameters:
+        -----------
+        table :  Table
+            The table object to be read.
+
+        Returns:
+        --------
+        dict
+            A dict with the dataframe with the requested data from the table
+            and some metadata regarding the reading process.
+
+        """
+        table_conn = self.table_connection(table)
+
+        # The main result is the list of filenames that must be read
+        # and concatenated.
+        files_to_read = self.list_table_files(table)
+        use_pool = self.options.workers > 1 and len(files_to_read) > 1
+
+        if self.options.memory_budget is None:
+            if use_pool:
+                # Rows are filtered by the workers when there are no joins
+                self.__rows_filtered = not self.has_joins
+                dfs = [
+                    t.to_pandas()
+                    for t in self.__scan_table_files_in_pool(
+                        table, files_to_read
+                    )
+                ]
+            else:
+                dfs = [
+                    self.__read_table_file(table, f, table_conn)
+                    for f in files_to_read
+                ]
+            return {
+                "processedFiles": files_to_read,
+                "data": pd.concat(dfs, ignore_index=True),
+            }
+
+        # With a memory budget, each file is converted to Arrow and
+        # accounted as soon as it is read. When there are no joins,
+        # the rows are also filtered before being buffered.
+        buffer = ResultBuffer(
+            self.options.memory_budget, self.options.spill_directory
+        )
+        if use_pool:
+            for t in self.__scan_table_files_in_pool(table, files_to_read):
+                buffer.append_table(t)
+        else:
+            for f in files_to_read:
+                for df in self.scan_table_batches(table, f):
+                    buffer.append(df)
         return {
             "processedFiles": files_to_read,
-            "data": df,
+            "data": buffer,
         }
 
+    def __scan_table_files_in_pool(
+        self, table: Table, files: list[str]
+    ) -> Iterator[pa.Table]:
+        """
+        Decodes, projects and filters (when there are no joins) the files
+        of a table in a pool of processes, which return their results
+        serialized in the Arrow IPC format, in the same order of the files.
+
+        The pool is shared by all the queries of the process. The statement
+        is serialized once for each query, and each process validates it
+        only on the first file of the query that it scans.
+        """
+        if self.__scan_context is None:
+            self.__scan_context = (
+                uuid.uuid4().hex,
+                pickle.dumps((self.statement, self.conn, self.options)),
+            )
+        key, context = self.__scan_context
+        table_index = self.__tables.index(table)
+        pool = registry.process_pool(self.options.workers)
+        try:
+            for data in pool.map(
+                _scan_file_to_ipc,
+                [key] * len(files),
+                [context] * len(files),
+                [table_index] * len(files),
+                files,
+            ):
+                yield ipc_to_table(data)
+        except BrokenProcessPool:
+            registry.discard_process_pool(pool)
+            raise
+
     def __select_from_tables(self) -> dict:
         """
         Processes the SELECT statement for each table separately,
@@ -925,16 +1212,7 @@ class SELECTParser(SQLParser):
         files: list[str] = []
         dfs: list[pd.DataFrame] = []
         for table in self.__tables:
-            name = table.name
-            table_select_result = self.__select_from_table(
-                table,
-                [
-                    f
-                    for f in self.__reading_filters
-                    if f.column.table_name == name
-                ],
-                self.conn,
-            )
+            table_select_result = self.__select_from_table(table)
             files += table_select_result["processedFiles"]
             dfs.append(table_select_result["data"])
         return {
@@ -988,12 +1266,161 @@ class SELECTParser(SQLParser):
         else:
             return dfs[0]
 
+    @property
+    def tables(self) -> List[Table]:
+        """
+        The tables that are queried by the statement, with their
+        requested columns. Only available after validation.
+        """
+        return self.__tables
+
+    @property
+    def has_joins(self) -> bool:
+        """
+        Whether the statement joins more than one table.
+        """
+        return len(self.__joining_columns) > 0
+
+    def table_connection(self, table: Table) -> Connection:
+        """
+        Returns the connection to a table that is queried by the statement.
+        """
+        if table.name not in self.__table_conns:
+            table_conn = self.conn.access(table.name)
+            if not table_conn.schema.is_table:
+                raise ValueError(f"Schema {table} is not a table")
+            self.__table_conns[table.name] = table_conn
+        return self.__table_conns[table.name]
+
+    def list_table_files(self, table: Table) -> list[str]:
+        """
+        Lists the files that must be read from a table that is queried
+        by the statement, after applying the partition pruning.
+        """
+        if table.name not in self.__table_files:
+            self.__table_files[table.name] = self.__list_table_files(
+                table, self.table_connection(table)
+            )
+        return self.__table_files[table.name]
+
+    def source_columns(self, table: Table) -> list[str]:
+        """
+        Lists the queried columns of a table that must be read from
+        its data files.
+        """
+        return self.__source_columns(table)
+
+    def read_table_file(self, table: Table, file: str) -> pd.DataFrame:
+        """
+        Reads a single file from a table that is queried by the statement,
+        returning only the requested columns, with their queried names.
+        """
+        return self.__read_table_file(table, file, self.table_connection(table))
+
+    def scan_table_batches(
+        self, table: Table, file: str
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Reads a single file from a table that is queried by the statement
+        in batches (a single one, unless the rows are fetched in batches
+        from a SQL backend) and, if the statement has no joins, filters
+        their rows.
+        """
+        for df in self.__read_table_batches(
+            table, file, self.table_connection(table)
+        ):
+            if not self.has_joins:
+                df = self.filter_data(df)
+            yield df
+
+    def scan_table_file(self, table: Table, file: str) -> pd.DataFrame:
+        """
+        Reads a single file from a table that is queried by the statement
+        and, if the statement has no joins, filters its rows.
+        """
+        dfs = list(self.scan_table_batches(table, file))
+        if len(dfs) == 1:
+            return dfs[0]
+        return pd.concat(dfs, ignore_index=True)
+
+    def filter_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the WHERE clause of the statement to the data, which
+        must contain the queried columns.
+        """
+        return self.__compose_query_and_query_dataframe(df)
+
+    def __buffered_result(
+        self, buffer: ResultBuffer, message: str
+    ) -> ParsingResult:
+        """
+        Builds the result of a query whose rows were already filtered
+        into a buffer, keeping the data on disk if it was spilled.
+        """
+        if buffer.spilled:
+            return ParsingResult(
+                status=True, message=message, data=None, batches=buffer
+            )
+        if buffer.schema is None:
+            df = pd.DataFrame(
+                columns=[c.fullname for c in self.__tables[0].columns]
+            )
+        else:
+            df = buffer.to_pandas()
+        buffer.close()
+        return ParsingResult(status=True, message=message, data=df)
+
     def parse(self) -> ParsingResult:
         select_result = self.__select_from_tables()
-        df = self.__join_tables(select_result["data"])
+        message = str(select_result["processedFiles"])
+        data = select_result["data"]
+        if self.options.memory_budget is not None:
+            if not self.has_joins:
+                return self.__buffered_result(data[0], message)
+            # Joins require all the data in memory
+            buffers = data
+            data = [b.to_pandas() for b in buffers]
+            for b in buffers:
+                b.close()
+        df = self.__join_tables(data)
         if isinstance(df, ParsingResult):
             return df
-        df = self.__compose_query_and_query_dataframe(df)
-        return ParsingResult(
-            status=True, message=str(select_result["processedFiles"]), data=df
-        )
+        if not self.__rows_filtered:
+            df = self.__compose_query_and_query_dataframe(df)
+        return ParsingResult(status=True, message=message, data=df)
+
+
+# Parsers of the recent queries in a process of the scanning pool,
+# indexed by the keys of the queries
+_SCAN_WORKER_PARSERS: OrderedDict[str, SELECTParser] = OrderedDict()
+_SCAN_WORKER_PARSERS_LIMIT = 8
+
+
+def _scan_worker_parser(key: str, context: bytes) -> SELECTParser:
+    """
+    Returns the parser of a query in a process of the scanning pool,
+    validating the statement only on the first file of the query that
+    the process scans.
+    """
+    parser = _SCAN_WORKER_PARSERS.pop(key, None)
+    if parser is None:
+        statement, conn, options = pickle.loads(context)
+        parser = SELECTParser(statement, conn, FileReader(), options)
+        parser.validate()
+    _SCAN_WORKER_PARSERS[key] = parser
+    while len(_SCAN_WORKER_PARSERS) > _SCAN_WORKER_PARSERS_LIMIT:
+        _SCAN_WORKER_PARSERS.popitem(last=False)
+    return parser
+
+
+def _scan_file_to_ipc(
+    key: str, context: bytes, table_index: int, file: str
+) -> bytes:
+    """
+    Scans a file in a process of the scanning pool, returning the result
+    in the Arrow IPC format, which is cheaper to transfer between processes
+    than a pickled DataFrame.
+    """
+    parser = _scan_worker_parser(key, context)
+    df = parser.scan_table_file(parser.tables[table_index], file)
+    return table_to_ipc(pa.Table.from_pandas(df, preserve_index=False))
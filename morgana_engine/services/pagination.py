@@ -0,0 +1,143 @@
+import pandas as pd
+from typing import Optional
+
+from morgana_engine.models.sql import SQLStatement, ParsingResult
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.services.incremental import statement_hash
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+
+
+def _cursor_files(cursor: Optional[dict], query_hash: str, page_size: int):
+    if (
+        cursor is None
+        or cursor.get("query") != query_hash
+        or cursor.get("pageSize") != page_size
+    ):
+        return None
+    return [dict(f) for f in cursor.get("files", [])]
+
+
+def _file_key(f: dict) -> tuple:
+    return (f.get("name"), f.get("version"))
+
+
+def _known_rows(f: dict) -> Optional[int]:
+    rows = f.get("rows")
+    if isinstance(rows, int) and not isinstance(rows, bool) and rows >= 0:
+        return rows
+    return None
+
+
+def paginated_parse(
+    statement: SQLStatement,
+    conn: Connection,
+    page_size: int,
+    page: int = 0,
+    cursor: Optional[dict] = None,
+) -> ParsingResult:
+    """
+    Executes a SELECT statement returning only a page of its result,
+    which is the range of rows `[page * page_size, (page + 1) * page_size)`.
+
+    The cursor is a JSON-serializable dict that holds the files of the
+    queried table, after the partition pruning, with their versions and
+    the number of rows that each file contributes to the result, when
+    already known. With the cursor of a previous page, the files that end
+    before the requested page are not read.
+
+    The files are listed for every page, and the cursor is only accepted
+    when it has the same files, with the same versions, as the listing.
+    Otherwise the pages would shift silently, so the query fails and must
+    be restarted from the first page. The cursor therefore never makes
+    the engine read files that the query would not read.
+
+    Parameters:
+    -----------
+    statement : SQLStatement
+        The statement to be executed. Must be a SELECT from a single table.
+    conn : Connection
+        The connection to the database.
+    page_size : int
+        The number of rows in each page.
+    page : int
+        The number of the page, starting at 0.
+    cursor : dict | None
+        The cursor returned together with a previous page of the query.
+
+    Returns:
+    --------
+    ParsingResult
+        The rows of the page, with the updated cursor as the token. The
+        last page is the first one with fewer than `page_size` rows.
+    """
+    if not SELECTParser.match_statement(statement):
+        return ParsingResult(
+            status=False,
+            message="Paginated queries only support SELECT statements",
+            data=None,
+        )
+    if page_size <= 0 or page < 0:
+        return ParsingResult(
+            status=False,
+            message="Invalid page size or page number",
+            data=None,
+        )
+    parser = SELECTParser(statement, conn)
+    validation_result = parser.validate()
+    if validation_result:
+        return validation_result
+    if parser.has_joins or len(parser.tables) != 1:
+        return ParsingResult(
+            status=False,
+            message="Paginated queries must select from a single table",
+            data=None,
+        )
+
+    table = parser.tables[0]
+    query_hash = statement_hash(statement)
+    metadata = parser.table_connection(table).list_files_metadata()
+    files: list[dict] = [
+        {
+            "name": f,
+            "version": metadata[f].version if f in metadata else None,
+            "rows": None,
+        }
+        for f in parser.list_table_files(table)
+    ]
+    cursor_files = _cursor_files(cursor, query_hash, page_size)
+    if cursor_files is not None:
+        if list(map(_file_key, cursor_files)) != list(map(_file_key, files)):
+            return ParsingResult(
+                status=False,
+                message="The files of the table changed since the cursor"
+                + " was created, the query must restart from the first page",
+                data=None,
+            )
+        for f, cursor_file in zip(files, cursor_files):
+            f["rows"] = _known_rows(cursor_file)
+
+    start = page * page_size
+    end = start + page_size
+    offset = 0
+    read_files: list[str] = []
+    dfs: list[pd.DataFrame] = []
+    for f in files:
+        if offset >= end:
+            break
+        if f["rows"] is not None and offset + f["rows"] <= start:
+            offset += f["rows"]
+            continue
+        df = parser.scan_table_file(table, f["name"])
+        f["rows"] = len(df)
+        read_files.append(f["name"])
+        dfs.append(df.iloc[max(start - offset, 0) : end - offset])
+        offset += len(df)
+
+    if len(dfs) > 0:
+        data = pd.concat(dfs, ignore_index=True)
+    else:
+        data = pd.DataFrame(columns=[c.fullname for c in table.columns])
+    new_cursor = {"query": query_hash, "pageSize": page_size, "files": files}
+    return ParsingResult(
+        status=True, message=str(read_files), data=data, token=new_cursor
+    )
@@ -0,0 +1,150 @@
+import itertools
+import pandas as pd
+import pyarrow as pa  # type: ignore
+from typing import BinaryIO, Iterator, Optional, Union
+
+from morgana_engine.models.sql import SQLStatement, ParsingResult
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.adapters.repository.connection import Connection
+from morgana_engine.services.interpreters.parsers.select import SELECTParser
+from morgana_engine.utils.ipc import has_null_fields
+
+
+def _scan_tables(parser: SELECTParser) -> Iterator[pa.Table]:
+    table = parser.tables[0]
+    files = parser.list_table_files(table)
+    for f in files:
+        for df in parser.scan_table_batches(table, f):
+            yield pa.Table.from_pandas(df, preserve_index=False)
+    if len(files) == 0:
+        yield pa.Table.from_pandas(
+            pd.DataFrame(columns=[c.fullname for c in table.columns]),
+            preserve_index=False,
+        )
+
+
+def _result_tables(result: ParsingResult) -> Iterator[pa.Table]:
+    if result.batches is not None:
+        for batch in result.batches.iter_batches():
+            yield pa.Table.from_batches([batch])
+        result.batches.close()
+    else:
+        yield pa.Table.from_pandas(result.data, preserve_index=False)
+
+
+def stream_parse(
+    statement: SQLStatement,
+    conn: Connection,
+    options: Optional[ExecutionOptions] = None,
+) -> Union[Iterator[pa.Table], ParsingResult]:
+    """
+    Executes a SELECT statement producing its result incrementally, as
+    each file of the queried table is read and filtered, so that only
+    the data of a single file is held in memory at a time.
+
+    The statements with joins need all the joined data before the rows
+    are filtered, so their result is produced at once.
+
+    Parameters:
+    -----------
+    statement : SQLStatement
+        The statement to be executed.
+    conn : Connection
+        The connection to the database.
+    options : ExecutionOptions | None
+        The options for executing the statement, which are only used
+        by the statements with joins.
+
+    Returns:
+    --------
+    Iterator[pa.Table] | ParsingResult
+        The partial results, in the same order of a non-streamed
+        execution, or the failure of the statement validation.
+    """
+    if not SELECTParser.match_statement(statement):
+        return ParsingResult(
+            status=False,
+            message="Streamed queries only support SELECT statements",
+            data=None,
+        )
+    parser = SELECTParser(statement, conn, options=options)
+    validation_result = parser.validate()
+    if validation_result:
+        return validation_result
+    if parser.has_joins or len(parser.tables) != 1:
+        result = parser.parse()
+        if not result.status:
+            return result
+        return _result_tables(result)
+    return _scan_tables(parser)
+
+
+def record_batches(
+    tables: Iterator[pa.Table],
+) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    """
+    Unifies partial results into a single sequence of record batches,
+    with the schema of the first non-empty partial results, which are
+    read before returning. The empty partial results are skipped, and the
+    schema of the first one is used when the whole result is empty.
+
+    A column whose values are all missing in a partial result has no
+    type, so the following partial results are also read, until one of
+    them gives the type of each such column, and their schemas are
+    unified. The columns that are missing in the whole result keep the
+    null type.
+
+    Parameters:
+    -----------
+    tables : Iterator[pa.Table]
+        The partial results, such as the ones produced by `stream_parse`.
+
+    Returns:
+    --------
+    tuple[pa.Schema, Iterator[pa.RecordBatch]]
+        The schema of the result and its remaining record batches.
+    """
+    tables = iter(tables)
+    schema: Optional[pa.Schema] = None
+    first: list[pa.Table] = []
+    for table in tables:
+        if schema is None:
+            schema = table.schema
+        if table.num_rows == 0:
+            continue
+        first.append(table)
+        schema = pa.unify_schemas([t.schema for t in first])
+        if not has_null_fields(schema):
+            break
+    if schema is None:
+        schema = pa.schema([])
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        for table in itertools.chain(first, tables):
+            if table.num_rows == 0:
+                continue
+            if not table.schema.equals(schema, check_metadata=False):
+                table = table.cast(schema)
+            yield from table.to_batches()
+
+    return schema, batches()
+
+
+def write_ipc_stream(tables: Iterator[pa.Table], stream: BinaryIO) -> int:
+    """
+    Writes partial results to a binary stream in the Arrow IPC stream
+    format, as soon as each one is produced, flushing the stream after
+    each record batch. The empty partial results are skipped, unless the
+    whole result is empty, when only its schema is written.
+
+    Returns the number of rows that were written.
+    """
+    schema, batches = record_batches(tables)
+    rows = 0
+    with pa.ipc.new_stream(stream, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            if hasattr(stream, "flush"):
+                stream.flush()
+            rows += batch.num_rows
+    return rows
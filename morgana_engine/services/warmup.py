@@ -0,0 +1,65 @@
+import os
+from importlib import import_module
+
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import connect
+
+# Modules that are imported on first use by the queries
+HEAVY_MODULES = [
+    "pandas",
+    "pyarrow",
+    "pyarrow.parquet",
+    "morgana_engine.services.interpreters.parsers.select",
+]
+
+
+def warm_up(
+    databases: list[str] | None = None, kind: str | None = None
+) -> dict[str, list[str]]:
+    """
+    Prepares the process for answering queries, ideally during the
+    initialization of a function, before the first request arrives.
+
+    The heavy modules are imported and, for each database, the filesystem
+    client and the connections are created and the database and table
+    schemas are loaded into the process-wide cache. The partition files of
+    each table are also listed, which opens the connections to the
+    storage, but the listings are not kept, since the queries always list
+    the files again for seeing the ones written meanwhile.
+
+    Parameters:
+    -----------
+    databases : list[str] | None
+        The URIs of the databases. If None, the comma-separated URIs in the
+        `MORGANA_WARM_DATABASES` environment variable are used.
+    kind : str | None
+        The kind of connection to the databases. If None, the value of the
+        `MORGANA_WARM_CONNECTION` environment variable is used, defaulting
+        to S3.
+
+    Returns:
+    --------
+    dict[str, list[str]]
+        The names of the tables that were loaded, for each database.
+    """
+    if databases is None:
+        databases = [
+            d.strip()
+            for d in os.environ.get("MORGANA_WARM_DATABASES", "").split(",")
+            if len(d.strip()) > 0
+        ]
+    if kind is None:
+        kind = os.environ.get("MORGANA_WARM_CONNECTION", "S3")
+    for module in HEAVY_MODULES:
+        import_module(module)
+    registry.object_cache()
+
+    tables: dict[str, list[str]] = {}
+    for uri in databases:
+        conn = connect(kind, uri)
+        tables[uri] = sorted(conn.schema.tables.keys())
+        for name in tables[uri]:
+            table_conn = conn.access(name)
+            for column in table_conn.schema.partitions:
+                table_conn.list_partition_files(column)
+    return tables
@@ -0,0 +1,83 @@
+from typing import Iterable
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+
+
+def table_to_ipc(table: pa.Table) -> bytes:
+    """Serializes an Arrow table to bytes in the Arrow IPC stream format"""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def ipc_to_table(data: bytes) -> pa.Table:
+    """Deserializes an Arrow table from bytes in the Arrow IPC stream format,
+    without copying the column buffers"""
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+
+
+def has_null_fields(schema: pa.Schema) -> bool:
+    """Whether some column of the schema has the null type, as the columns
+    whose values are all missing in a partial result"""
+    return any(pa.types.is_null(f.type) for f in schema)
+
+
+def promote_null_fields(schema: pa.Schema, other: pa.Schema) -> pa.Schema:
+    """Returns the schema with the type of each of its null-typed columns
+    replaced by the type of the same column in another schema"""
+    fields = []
+    for field in schema:
+        index = other.get_field_index(field.name)
+        if pa.types.is_null(field.type) and index >= 0:
+            field = field.with_type(other.field(index).type)
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+# Compression codecs that are supported by each output format
+OUTPUT_COMPRESSIONS: dict[str, list[str]] = {
+    "arrow": ["none", "lz4", "zstd"],
+    "parquet": ["none", "snappy", "gzip", "zstd", "lz4", "brotli"],
+}
+
+
+def encode_batches(
+    schema: pa.Schema,
+    batches: Iterable[pa.RecordBatch],
+    output_format: str,
+    compression: str,
+) -> pa.Buffer:
+    """Serializes record batches in the Arrow IPC stream format or in the
+    Parquet format, with the given compression codec, into a single buffer.
+    When the batches are given as a list and are written in the Arrow IPC
+    format, the buffer is preallocated with the exact encoded size"""
+    if compression not in OUTPUT_COMPRESSIONS.get(output_format, []):
+        raise ValueError(
+            f"Compression {compression} not supported for {output_format}"
+        )
+    codec = None if compression == "none" else compression
+    if output_format == "arrow":
+        options = pa.ipc.IpcWriteOptions(compression=codec)
+        if isinstance(batches, list):
+            # A first pass only counts the bytes, without writing them
+            mock = pa.MockOutputStream()
+            with pa.ipc.new_stream(mock, schema, options=options) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+            buffer = pa.allocate_buffer(mock.size())
+            sink = pa.FixedSizeBufferWriter(buffer)
+            with pa.ipc.new_stream(sink, schema, options=options) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+            return buffer
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema, options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        sink = pa.BufferOutputStream()
+        with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    return sink.getvalue()
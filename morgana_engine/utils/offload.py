@@ -0,0 +1,46 @@
+import os
+import uuid
+
+
+# Maximum length of the base64 body that is returned inline, below the
+# payload limit of the Lambda responses (6 MB)
+MAX_INLINE_BODY_BYTES = 5 * 2**20
+
+
+def result_location() -> str | None:
+    """
+    Returns the location where the results that are not returned inline
+    are written, which is set for the process with the
+    `MORGANA_RESULT_LOCATION` environment variable, and never by the
+    requests, so that the callers cannot choose where the process writes.
+    """
+    location = os.environ.get("MORGANA_RESULT_LOCATION", "").strip()
+    return location if len(location) > 0 else None
+
+
+def offload_body(body, location: str, extension: str) -> str:
+    """
+    Writes an encoded result to a new object in the given location,
+    which may be an object storage or a local directory, returning its URI.
+    """
+    import fsspec  # type: ignore
+
+    uri = location.rstrip("/") + "/" + uuid.uuid4().hex + extension
+    with fsspec.open(uri, "wb") as f:
+        f.write(memoryview(body))
+    return uri
+
+
+def read_offloaded(uri: str, remove: bool = False) -> bytes:
+    """
+    Reads a result that was written by `offload_body`, optionally removing
+    it afterwards, when the result is only read once.
+    """
+    import fsspec  # type: ignore
+
+    with fsspec.open(uri, "rb") as f:
+        body = f.read()
+    if remove:
+        fs, path = fsspec.core.url_to_fs(uri)
+        fs.rm(path)
+    return body
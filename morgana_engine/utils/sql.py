@@ -2,6 +2,9 @@ def partitions_in_file(filename: str) -> dict[str, str]:
     parts = [p for p in filename.split("-")[1:] if len(p) > 0]
     partition_values: dict[str, str] = {}
     for p in parts:
+        # Segments without a value identify one of the files of a partition
+        if "=" not in p:
+            continue
         part_key_value = p.split("=")
         partition_values[part_key_value[0]] = part_key_value[1]
     return partition_values
@@ -11,5 +14,119 @@ def partition_value_in_file(filename: str, column: str) -> str | None:
     return partitions_in_file(filename).get(column)
 
 
+def split_file_part(filename: str) -> tuple[str, str | None]:
+    """
+    Splits a filename in the name of its partition and the segment that
+    identifies the file among the files of the partition, if any.
+    """
+    name, _, part = filename.rpartition("-")
+    if len(name) == 0 or "=" in part:
+        return filename, None
+    return name, part
+
+
+def file_generation(part: str | None) -> tuple[int, int, int] | None:
+    """
+    Parses the segment of a partition file as (generation, index, count).
+    The files without a segment are the generation 0 of the partition, the
+    appended files `<generation>` have no index or count (-1) and the
+    compacted files `<generation>_<index>_<count>` are one of the `count`
+    files that replace every file of the partition up to `generation`.
+    """
+    if part is None:
+        return 0, 0, 1
+    fields = part.split("_")
+    if not all(f.isdigit() for f in fields):
+        return None
+    if len(fields) == 1:
+        return int(fields[0]), -1, -1
+    if len(fields) == 3:
+        return int(fields[0]), int(fields[1]), int(fields[2])
+    return None
+
+
+def _partition_generations(
+    files: list[str],
+) -> list[
+    tuple[tuple[int, int], list[tuple[str, tuple[int, int, int] | None]]]
+]:
+    """
+    Groups the files of the partitions of a table, returning, for each
+    partition, the (generation, count) of its newest complete generation
+    and the parsed generation of each file.
+    """
+    partitions: dict[str, list[tuple[str, tuple[int, int, int] | None]]] = {}
+    for f in files:
+        name, part = split_file_part(f)
+        partitions.setdefault(name, []).append((f, file_generation(part)))
+    generations = []
+    for partition_files in partitions.values():
+        snapshots: dict[tuple[int, int], set[int]] = {}
+        for _, generation in partition_files:
+            if generation is not None and generation[2] > 0:
+                key = (generation[0], generation[2])
+                snapshots.setdefault(key, set()).add(generation[1])
+        complete = [
+            k for k, indices in snapshots.items() if indices == set(range(k[1]))
+        ]
+        snapshot = max(complete) if len(complete) > 0 else (-1, 0)
+        generations.append((snapshot, partition_files))
+    return generations
+
+
+def current_partition_files(files: list[str]) -> list[str]:
+    """
+    Selects, among the files of the partitions of a table, the ones that
+    hold the current data of each partition: the files of the newest
+    complete generation, which are the partition file itself or the files
+    of a compaction, and the files appended after it. A compaction becomes
+    current when its last file is written, so the readers switch between
+    the generations at once, and the files that it replaced may be removed
+    afterwards.
+
+    Parameters:
+    -----------
+    files : list[str]
+        The filenames of the partitions, without extensions.
+
+    Returns:
+    --------
+    list[str]
+        The filenames that must be read, in the given order.
+    """
+    current: set[str] = set()
+    for snapshot, partition_files in _partition_generations(files):
+        for f, generation in partition_files:
+            if (
+                generation is None
+                or (generation[2] < 0 and generation[0] > snapshot[0])
+                or (generation[0], generation[2]) == snapshot
+            ):
+                current.add(f)
+    return [f for f in files if f in current]
+
+
+def superseded_partition_files(files: list[str]) -> list[str]:
+    """
+    Selects, among the files of the partitions of a table, the ones that
+    were replaced by a newer complete generation of their partitions,
+    which are no longer read and may be removed.
+    """
+    superseded: set[str] = set()
+    for snapshot, partition_files in _partition_generations(files):
+        for f, generation in partition_files:
+            if (
+                generation is not None
+                and generation[0] <= snapshot[0]
+                and (generation[0], generation[2]) != snapshot
+            ):
+                superseded.add(f)
+    return [f for f in files if f in superseded]
+
+
 def unquote_values(values: list[str]) -> list[str]:
     return [v.replace("'", "").replace('"', "") for v in values]
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
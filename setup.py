@@ -28,4 +28,7 @@ setup(
     ],
     python_requires=">=3.10",
     install_requires=requirements,
+    entry_points={
+        "console_scripts": ["morgana=morgana_engine.cli:main"],
+    },
 )
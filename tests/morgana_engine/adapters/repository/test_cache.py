@@ -0,0 +1,164 @@
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.cache import ObjectCache
+from morgana_engine.adapters.repository.connection import S3Connection
+
+
+class FakeS3:
+    def __init__(self) -> None:
+        self.objects = {
+            "bucket/table/schema.json": json.dumps(
+                {
+                    "name": "table",
+                    "uri": "table/schema.json",
+                    "fileType": ".csv",
+                    "columns": [{"name": "a", "type": "int"}],
+                    "partitions": [],
+                }
+            ).encode("utf-8"),
+            "bucket/table/table.csv": b"a\n1\n2\n",
+        }
+        self.etags = {k: '"1"' for k in self.objects}
+        self.fetches = 0
+
+    def info(self, path, refresh=False):
+        return {"ETag": self.etags[path]}
+
+    def invalidate_cache(self, path=None):
+        pass
+
+    def open(self, path, mode):
+        if mode == "rb":
+            self.fetches += 1
+            f = io.BytesIO(self.objects[path])
+            f.details = {"ETag": self.etags[path]}
+            return f
+        return io.StringIO(self.objects[path].decode("utf-8"))
+
+
+def _files(tmp_path):
+    return list((tmp_path / str(os.getpid())).iterdir())
+
+
+class TestObjectCache:
+    def test_read(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 100)
+        assert cache.read("a", "1", lambda: (b"content", "1")) == b"content"
+        assert cache.read("a", "1", lambda: (b"other", "1")) == b"content"
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.nbytes == 7
+
+    def test_version_change(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 100)
+        cache.put("a", "1", b"old")
+        assert cache.get("a", "2") is None
+        assert cache.nbytes == 0
+        assert cache.read("a", "2", lambda: (b"new", "2")) == b"new"
+
+    def test_fetched_version(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 100)
+        assert cache.read("a", "1", lambda: (b"new", "2")) == b"new"
+        assert cache.get("a", "1") is None
+        cache.put("a", "2", b"new")
+        assert cache.get("a", "2") == b"new"
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 10)
+        cache.put("a", "1", b"aaaa")
+        cache.put("b", "1", b"bbbb")
+        assert cache.get("a", "1") == b"aaaa"
+        cache.put("c", "1", b"cccc")
+        assert cache.get("b", "1") is None
+        assert cache.get("a", "1") == b"aaaa"
+        assert cache.get("c", "1") == b"cccc"
+        assert cache.nbytes == 8
+        assert len(_files(tmp_path)) == 2
+
+    def test_larger_than_budget(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 2)
+        cache.put("a", "1", b"aaaa")
+        assert cache.get("a", "1") is None
+
+    def test_concurrent_puts(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 2**20)
+        contents = [bytes([i]) * 10000 for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(
+                executor.map(
+                    lambda c: [cache.put("a", "1", c) for _ in range(20)],
+                    contents,
+                )
+            )
+        assert cache.get("a", "1") in contents
+        assert len(_files(tmp_path)) == 1
+
+    def test_index_from_directory(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 10)
+        cache.put("a", "1", b"aaaa")
+        cache.put("b", "1", b"bbbb")
+        # The files of a process that is no longer alive
+        os.rename(tmp_path / str(os.getpid()), tmp_path / "999999999")
+        cache = ObjectCache(str(tmp_path), 10)
+        assert cache.nbytes == 8
+        assert cache.get("a", "1") == b"aaaa"
+        assert not (tmp_path / "999999999").exists()
+        cache.put("c", "1", b"cccc")
+        assert cache.get("b", "1") is None
+        assert cache.nbytes == 8
+        assert len(_files(tmp_path)) == 2
+
+    def test_budget_on_init(self, tmp_path):
+        cache = ObjectCache(str(tmp_path), 100)
+        for key in "abc":
+            cache.put(key, "1", b"x" * 4)
+        os.rename(tmp_path / str(os.getpid()), tmp_path / "999999999")
+        cache = ObjectCache(str(tmp_path), 8)
+        assert cache.nbytes == 8
+        assert len(_files(tmp_path)) == 2
+
+
+class TestS3ConnectionCache:
+    def setup_method(self):
+        registry.clear()
+
+    def teardown_method(self):
+        registry.clear()
+
+    def test_cached_content(self, tmp_path):
+        fake_s3 = FakeS3()
+        conn = S3Connection("s3://bucket/table")
+        conn._s3 = fake_s3
+        assert conn.cached_content("table") is None
+        registry.set_object_cache(ObjectCache(str(tmp_path), 1000))
+        assert conn.cached_content("table") == b"a\n1\n2\n"
+        assert conn.cached_content("table") == b"a\n1\n2\n"
+        assert fake_s3.fetches == 1
+        fake_s3.objects["bucket/table/table.csv"] = b"a\n3\n"
+        fake_s3.etags["bucket/table/table.csv"] = '"2"'
+        assert conn.cached_content("table") == b"a\n3\n"
+        assert fake_s3.fetches == 2
+
+    def test_changed_after_info(self, tmp_path):
+        fake_s3 = FakeS3()
+        conn = S3Connection("s3://bucket/table")
+        conn._s3 = fake_s3
+        registry.set_object_cache(ObjectCache(str(tmp_path), 1000))
+        info = fake_s3.info
+
+        def changing_info(path, refresh=False):
+            result = info(path, refresh)
+            # Modified between the listing and the read of the content
+            fake_s3.objects["bucket/table/table.csv"] = b"a\n3\n"
+            fake_s3.etags["bucket/table/table.csv"] = '"2"'
+            return result
+
+        fake_s3.info = changing_info
+        assert conn.cached_content("table") == b"a\n3\n"
+        fake_s3.info = info
+        assert conn.cached_content("table") == b"a\n3\n"
+        assert fake_s3.fetches == 1
@@ -0,0 +1,170 @@
+import json
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.compaction import compact_table
+from morgana_engine.adapters.repository.writer import (
+    remove_superseded_files,
+    write_table,
+)
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.utils.sql import current_partition_files
+
+QUERY = "SELECT quadricula, dia_previsao, valor FROM previsoes"
+
+
+@pytest.fixture
+def database(tmp_path):
+    schema = {"name": "db", "uri": "schema.json", "tables": []}
+    (tmp_path / "schema.json").write_text(json.dumps(schema))
+    registry.clear()
+    yield tmp_path
+    registry.clear()
+
+
+def _batch(seed: int, rows: int = 50) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "quadricula": rng.integers(1, 3, rows),
+            "dia_previsao": rng.integers(1, 15, rows),
+            "valor": rng.random(rows),
+        }
+    )
+
+
+def _query(database, query: str = QUERY) -> pd.DataFrame:
+    registry.clear()
+    result = parse(lex(query), FSConnection(str(database)))
+    assert result.status
+    return result.data.sort_values(["valor"]).reset_index(drop=True)
+
+
+def _expected(batches: list[pd.DataFrame]) -> pd.DataFrame:
+    df = pd.concat(batches, ignore_index=True)
+    df = df[["dia_previsao", "valor", "quadricula"]]
+    return df.sort_values(["valor"]).reset_index(drop=True)
+
+
+def _data_files(database) -> list[str]:
+    return sorted(
+        p.name
+        for p in (database / "previsoes").iterdir()
+        if p.name != "schema.json"
+    )
+
+
+class TestCurrentPartitionFiles:
+    def test_generations(self):
+        files = [
+            "t-id=1",
+            "t-id=1-10",
+            "t-id=1-20",
+            "t-id=1-20_0_2",
+            "t-id=1-20_1_2",
+            "t-id=1-30",
+            "t-id=1-40_0_2",
+            "t-id=2",
+            "t-id=2-5",
+        ]
+        assert current_partition_files(files) == [
+            "t-id=1-20_0_2",
+            "t-id=1-20_1_2",
+            "t-id=1-30",
+            "t-id=2",
+            "t-id=2-5",
+        ]
+
+
+class TestCompactTable:
+    def test_compact_appended_files(self, database):
+        uri = str(database / "previsoes")
+        batches = [_batch(0)]
+        write_table(batches[0], uri, ["quadricula"], database=str(database))
+        for seed in range(1, 6):
+            batches.append(_batch(seed))
+            write_table(batches[-1], uri, ["quadricula"], append=True)
+        assert len(_data_files(database)) == 12
+        assert _query(database).equals(_expected(batches))
+
+        written = compact_table(uri, sort_by=["dia_previsao"])
+        assert len(written) == 2
+        # The replaced files are kept for the queries in progress
+        assert len(_data_files(database)) == 14
+        assert _query(database).equals(_expected(batches))
+        assert len(remove_superseded_files(uri)) == 12
+        files = _data_files(database)
+        assert len(files) == 2
+        assert all(f.endswith("_0_1.parquet") for f in files)
+        days = pq.read_table(written[0][len("file://") :])["dia_previsao"]
+        assert days.to_pylist() == sorted(days.to_pylist())
+        assert _query(database).equals(_expected(batches))
+
+        # Compacted partitions are not compacted again
+        assert compact_table(uri, sort_by=["dia_previsao"]) == []
+
+    def test_switch_between_generations(self, database):
+        uri = str(database / "previsoes")
+        batches = [_batch(seed) for seed in range(6)]
+        write_table(batches[0], uri, ["quadricula"], database=str(database))
+        for batch in batches[1:5]:
+            write_table(batch, uri, ["quadricula"], append=True)
+        written = compact_table(uri, target_file_bytes=4096)
+        assert len(written) > 2
+        assert len(_data_files(database)) == 10 + len(written)
+        # Appended after the compaction
+        write_table(batches[5], uri, ["quadricula"], append=True)
+        expected = _expected(batches)
+        assert _query(database).equals(expected)
+
+        removed = remove_superseded_files(uri)
+        assert len(removed) == 10
+        assert _query(database).equals(expected)
+
+        # An incomplete generation is not read
+        for w in written:
+            if "_0_" in w:
+                (database / "previsoes" / w.rpartition("/")[2]).unlink()
+        result = parse(lex(QUERY), FSConnection(str(database)))
+        assert len(result.data) < len(expected)
+
+    def test_remove_superseded(self, database):
+        uri = str(database / "previsoes")
+        batches = [_batch(seed) for seed in range(3)]
+        write_table(batches[0], uri, ["quadricula"], database=str(database))
+        for batch in batches[1:]:
+            write_table(batch, uri, ["quadricula"], append=True)
+        written = compact_table(uri, remove_superseded=True)
+        assert sorted(_data_files(database)) == sorted(
+            w.rpartition("/")[2] for w in written
+        )
+        assert _query(database).equals(_expected(batches))
+
+    def test_replace_appended_partition(self, database):
+        uri = str(database / "previsoes")
+        write_table(_batch(0), uri, ["quadricula"], database=str(database))
+        write_table(_batch(1), uri, ["quadricula"], append=True)
+        replacement = _batch(2)
+        replacement = replacement[replacement["quadricula"] == 1]
+        write_table(replacement, uri, ["quadricula"])
+        # The replaced files are kept for the queries in progress
+        assert len(_data_files(database)) == 5
+        query = QUERY + " WHERE quadricula = 1"
+        assert _query(database, query).equals(_expected([replacement]))
+        assert len(remove_superseded_files(uri)) == 2
+        assert len(_data_files(database)) == 3
+        assert _query(database, query).equals(_expected([replacement]))
+
+        write_table(_batch(3), uri, ["quadricula"], append=True)
+        write_table(replacement, uri, ["quadricula"], remove_superseded=True)
+        # Only the files of the replaced partition are removed
+        assert len(_data_files(database)) == 4
+        assert _query(database, query).equals(_expected([replacement]))
+
+    def test_append_requires_partitions(self, database):
+        with pytest.raises(ValueError):
+            write_table(_batch(0), str(database / "previsoes"), append=True)
@@ -1,9 +1,11 @@
 import pytest
+import sqlite3
 from pathlib import Path
 from morgana_engine.models.schema import Schema
 from morgana_engine.adapters.repository.connection import (
     Connection,
     FSConnection,
+    SQLConnection,
 )
 from morgana_engine.utils.uri import path_to_uri
 
@@ -14,6 +16,16 @@ class TestConnection:
         with pytest.raises(NotImplementedError):
             conn.uri
 
+    def test_path(self):
+        conn = Connection()
+        with pytest.raises(NotImplementedError):
+            conn.path
+
+    def test_async_filesystem(self):
+        conn = Connection()
+        with pytest.raises(NotImplementedError):
+            conn.async_filesystem()
+
     def test_storage_options(self):
         conn = Connection()
         with pytest.raises(NotImplementedError):
@@ -29,6 +41,11 @@ class TestConnection:
         with pytest.raises(NotImplementedError):
             conn.list_files()
 
+    def test_list_files_metadata(self):
+        conn = Connection()
+        with pytest.raises(NotImplementedError):
+            conn.list_files_metadata()
+
     def test_list_partition_files(self):
         conn = Connection()
         with pytest.raises(NotImplementedError):
@@ -93,3 +110,66 @@ class TestFSConnection:
         conn = FSConnection("tests/data/usinas_part_subsis")
         files = conn.list_partition_files("subsistema_geografico")
         assert len(files) == 2
+
+    def test_list_files_metadata(self):
+        conn = FSConnection("tests/data/usinas_part_subsis")
+        metadata = conn.list_files_metadata()
+        files = conn.list_partition_files("subsistema_geografico")
+        assert set(metadata.keys()) == set(files)
+        for name, m in metadata.items():
+            assert m.name == name
+            assert m.size > 0
+            assert len(m.version) > 0
+
+
+@pytest.fixture
+def sqlite_database(tmp_path) -> str:
+    path = str(tmp_path / "usinas.db")
+    with sqlite3.connect(path) as db:
+        db.execute(
+            "CREATE TABLE usinas (id INTEGER, nome TEXT, capacidade REAL,"
+            + " data_inicio_operacao DATE)"
+        )
+        db.executemany(
+            "INSERT INTO usinas VALUES (?, ?, ?, ?)",
+            [(i, f"usina {i}", i * 1.5, "2023-01-01") for i in range(10)],
+        )
+    return path
+
+
+class TestSQLConnection:
+    def test_schema(self, sqlite_database):
+        conn = SQLConnection(sqlite_database)
+        assert conn.uri == f"sqlite://{sqlite_database}"
+        assert conn.schema.is_database
+        assert conn.schema.tables == {"usinas": f"{conn.uri}?table=usinas"}
+        with pytest.raises(ValueError):
+            conn.list_files()
+
+    def test_access(self, sqlite_database):
+        conn = SQLConnection(sqlite_database)
+        with pytest.raises(ValueError):
+            conn.access("non_existent_table")
+        sub_conn = conn.access("usinas")
+        assert isinstance(sub_conn, SQLConnection)
+        assert sub_conn.pushdown
+        assert sub_conn.schema.is_table
+        assert sub_conn.schema.columns == {
+            "id": "int",
+            "nome": "string",
+            "capacidade": "float",
+            "data_inicio_operacao": "date",
+        }
+        assert sub_conn.list_files() == ["usinas"]
+        assert sub_conn.list_partition_files("id") == []
+        assert sub_conn.list_files_metadata()["usinas"].size > 0
+
+    def test_select(self, sqlite_database):
+        conn = SQLConnection(sqlite_database).access("usinas")
+        conn.BATCH_SIZE = 4
+        batches = list(conn.select(["id", "nome"], '"id" >= ?', [3]))
+        assert [len(b) for b in batches] == [4, 3]
+        assert list(batches[0].columns) == ["id", "nome"]
+        batches = list(conn.select(["id"], '"id" > ?', [100]))
+        assert len(batches) == 1
+        assert len(batches[0]) == 0
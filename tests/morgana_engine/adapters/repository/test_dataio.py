@@ -13,6 +13,10 @@ class TestDataIO:
         with pytest.raises(NotImplementedError):
             DataIO.read("path/to/file")
 
+    def test_read_buffer_not_implemented(self):
+        with pytest.raises(NotImplementedError):
+            DataIO.read_buffer(b"")
+
     def test_write_not_implemented(self):
         df = pd.DataFrame({"col1": [1, 2], "col2": ["a", "b"]})
         with pytest.raises(NotImplementedError):
@@ -32,6 +36,14 @@ class TestParquetIO:
         # check if the dataframes are equal
         pd.testing.assert_frame_equal(result, df)
 
+    def test_read_buffer(self, tmp_path):
+        df = pd.DataFrame({"col1": [1, 2], "col2": ["a", "b"]})
+        path = str(tmp_path / "test")
+        df.to_parquet(path + ParquetIO.EXTENSION)
+        with open(path + ParquetIO.EXTENSION, "rb") as f:
+            result = ParquetIO.read_buffer(f.read(), columns=["col2"])
+        assert result.equals(df[["col2"]])
+
     def test_write(self, tmp_path):
         # create a test dataframe
         df = pd.DataFrame({"col1": [1, 2], "col2": ["a", "b"]})
@@ -0,0 +1,63 @@
+import shutil
+import pandas as pd
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.dataio import ParquetGzipIO
+from morgana_engine.adapters.repository.pinned import (
+    PinnedConnection,
+    pin_tables,
+    unpin_tables,
+)
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+
+
+class TestPinnedConnection:
+    def setup_method(self):
+        registry.clear()
+
+    def teardown_method(self):
+        registry.clear()
+
+    def test_pin_tables(self, monkeypatch):
+        conn = FSConnection("tests/data")
+        query = """SELECT id, up.id, nome, up.nome
+                   FROM usinas_part_id
+                   INNER JOIN usinas_part_subsis AS up
+                   ON usinas_part_id.id = up.id
+                   WHERE id < 5"""
+        expected_df = parse(lex(query), conn).data
+        pinned = pin_tables(conn, ["usinas_part_id", "usinas_part_subsis"])
+        assert all([isinstance(p, PinnedConnection) for p in pinned])
+        assert conn.access("usinas_part_id") is pinned[0]
+        assert pinned[0].nbytes > 0
+        source = FSConnection("tests/data/usinas_part_subsis")
+        assert pinned[1].list_partition_files("subsistema_geografico") == (
+            sorted(source.list_partition_files("subsistema_geografico"))
+        )
+
+        def __read(*args, **kwargs):
+            raise AssertionError("Pinned tables must not be read")
+
+        monkeypatch.setattr(ParquetGzipIO, "read", __read)
+        result = parse(lex(query), conn)
+        assert result.data.equals(expected_df)
+
+        unpin_tables(conn, ["usinas_part_id", "usinas_part_subsis"])
+        assert not conn.access("usinas_part_id").pinned
+
+    def test_refresh_on_change(self, tmp_path, monkeypatch):
+        shutil.copytree("tests/data", tmp_path / "data")
+        conn = FSConnection(str(tmp_path / "data"))
+        query = "SELECT id, nome FROM usinas"
+        expected_df = parse(lex(query), conn).data
+        (pinned,) = pin_tables(conn, ["usinas"])
+        data_file = tmp_path / "data" / "usinas" / "usinas.parquet.gzip"
+        pd.read_parquet(data_file).iloc[:10].to_parquet(
+            data_file, compression="gzip"
+        )
+
+        # Changes are only seen after the revalidation interval
+        assert parse(lex(query), conn).data.equals(expected_df)
+        monkeypatch.setattr(PinnedConnection, "REVALIDATION_INTERVAL", 0.0)
+        assert parse(lex(query), conn).data.equals(expected_df.iloc[:10])
@@ -0,0 +1,52 @@
+import pandas as pd
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.reader import (
+    FileReader,
+    SharedFileReader,
+)
+
+
+class TestFileReader:
+    def test_read_columns(self):
+        conn = FSConnection("tests/data/usinas")
+        df = FileReader().read(conn, "usinas", ["id", "nome"])
+        expected_df = pd.read_parquet(
+            "tests/data/usinas/usinas.parquet.gzip", columns=["id", "nome"]
+        )
+        assert df.equals(expected_df)
+
+    def test_read_all_columns(self):
+        conn = FSConnection("tests/data/usinas")
+        df = FileReader().read(conn, "usinas", [])
+        expected_df = pd.read_parquet("tests/data/usinas/usinas.parquet.gzip")
+        assert df.equals(expected_df)
+
+
+class TestSharedFileReader:
+    def test_read_once_with_union_of_columns(self):
+        conn = FSConnection("tests/data/usinas")
+        reader = SharedFileReader()
+        reader.request(conn, "usinas", ["id"])
+        reader.request(conn, "usinas", ["nome"])
+        df_id = reader.read(conn, "usinas", ["id"])
+        df_nome = reader.read(conn, "usinas", ["nome"])
+        assert reader.reads == 1
+        assert list(df_id.columns) == ["id"]
+        assert list(df_nome.columns) == ["nome"]
+
+    def test_release_after_last_read(self):
+        conn = FSConnection("tests/data/usinas")
+        reader = SharedFileReader()
+        reader.request(conn, "usinas", ["id"])
+        reader.read(conn, "usinas", ["id"])
+        reader.read(conn, "usinas", ["id"])
+        assert reader.reads == 1
+
+    def test_callers_do_not_share_new_columns(self):
+        conn = FSConnection("tests/data/usinas")
+        reader = SharedFileReader()
+        reader.request(conn, "usinas", None)
+        reader.request(conn, "usinas", None)
+        df = reader.read(conn, "usinas")
+        df["new_column"] = 1
+        assert "new_column" not in reader.read(conn, "usinas").columns
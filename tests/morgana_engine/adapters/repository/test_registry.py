@@ -0,0 +1,57 @@
+import json
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import (
+    FSConnection,
+    connect,
+)
+
+
+class FakeFileSystem:
+    instances = 0
+
+    def __init__(self, **kwargs) -> None:
+        FakeFileSystem.instances += 1
+        self.options = kwargs
+
+
+class TestRegistry:
+    def setup_method(self):
+        registry.clear()
+
+    def test_filesystem(self):
+        FakeFileSystem.instances = 0
+        fs = registry.filesystem({"key": "a", "secret": "b"}, FakeFileSystem)
+        same_fs = registry.filesystem(
+            {"secret": "b", "key": "a"}, FakeFileSystem
+        )
+        other_fs = registry.filesystem({"key": "c"}, FakeFileSystem)
+        assert fs is same_fs
+        assert fs is not other_fs
+        assert FakeFileSystem.instances == 2
+        assert fs.options == {"key": "a", "secret": "b"}
+
+    def test_connection(self):
+        conn = connect("FS", FSConnection("tests/data").uri)
+        assert conn is connect("FS", conn.uri)
+        assert isinstance(conn, FSConnection)
+        table_conn = conn.access("usinas")
+        assert table_conn is conn.access("usinas")
+        assert table_conn is FSConnection("tests/data").access("usinas")
+
+    def test_schema_revalidation(self, tmp_path, monkeypatch):
+        schema_path = tmp_path / "schema.json"
+        schema_path.write_text(json.dumps({"name": "a", "tables": []}))
+        conn = FSConnection(str(tmp_path))
+        schema = conn.schema
+        assert schema is FSConnection(str(tmp_path)).schema
+        # Changes are only seen after the revalidation interval
+        schema_path.write_text(json.dumps({"name": "bb", "tables": []}))
+        assert conn.schema is schema
+        monkeypatch.setattr(registry, "SCHEMA_REVALIDATION_INTERVAL", 0.0)
+        assert conn.schema.name == "bb"
+        assert conn.schema is conn.schema
+
+    def test_clear(self):
+        conn = connect("FS", FSConnection("tests/data").uri)
+        registry.clear()
+        assert conn is not connect("FS", conn.uri)
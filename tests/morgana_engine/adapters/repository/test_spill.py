@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+import pyarrow as pa
+from morgana_engine.adapters.repository.spill import ResultBuffer
+
+
+class TestResultBuffer:
+    df = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+
+    def test_no_budget(self):
+        buffer = ResultBuffer()
+        buffer.append(self.df)
+        buffer.append(self.df)
+        assert not buffer.spilled
+        assert buffer.num_rows == 6
+        assert buffer.nbytes > 0
+        expected_df = pd.concat([self.df, self.df], ignore_index=True)
+        assert buffer.to_pandas().equals(expected_df)
+
+    def test_spill(self, tmp_path):
+        buffer = ResultBuffer(memory_budget=1, directory=str(tmp_path))
+        buffer.append(self.df)
+        buffer.append(self.df.iloc[:1])
+        assert buffer.spilled
+        assert buffer.nbytes == 0
+        assert len(os.listdir(tmp_path)) == 1
+        expected_df = pd.concat([self.df, self.df.iloc[:1]], ignore_index=True)
+        assert buffer.to_pandas().equals(expected_df)
+        assert sum(b.num_rows for b in buffer.iter_batches()) == 4
+        buffer.close()
+        assert len(os.listdir(tmp_path)) == 0
+
+    def test_order_after_spill(self):
+        buffer = ResultBuffer(memory_budget=100)
+        for i in range(10):
+            buffer.append(pd.DataFrame({"col1": [i] * 5}))
+        assert buffer.spilled
+        assert list(buffer.to_pandas()["col1"]) == [
+            i for i in range(10) for _ in range(5)
+        ]
+        buffer.close()
+
+    def test_empty_first_table(self, tmp_path):
+        for budget in [None, 1]:
+            buffer = ResultBuffer(memory_budget=budget, directory=str(tmp_path))
+            buffer.append(self.df.iloc[:0])
+            buffer.append(self.df)
+            assert buffer.schema.field("col2").type == pa.string()
+            assert buffer.to_pandas().equals(self.df)
+            buffer.close()
+
+    def test_null_columns_promoted(self, tmp_path):
+        buffer = ResultBuffer(memory_budget=1, directory=str(tmp_path))
+        buffer.append(pd.DataFrame({"col1": [1, 2], "col2": [None, None]}))
+        assert buffer.spilled
+        buffer.append(pd.DataFrame({"col1": [3], "col2": ["c"]}))
+        buffer.append(pd.DataFrame({"col1": [4], "col2": [None]}))
+        assert buffer.schema.field("col2").type == pa.string()
+        df = buffer.to_pandas()
+        assert list(df["col1"]) == [1, 2, 3, 4]
+        assert list(df["col2"]) == [None, None, "c", None]
+        buffer.close()
+        assert len(os.listdir(tmp_path)) == 0
@@ -0,0 +1,147 @@
+import json
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.writer import write_table
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+
+
+@pytest.fixture
+def database(tmp_path):
+    schema = {
+        "name": "db",
+        "description": "",
+        "uri": "schema.json",
+        "version": "1.0.0",
+        "tables": [],
+    }
+    (tmp_path / "schema.json").write_text(json.dumps(schema))
+    registry.clear()
+    yield tmp_path
+    registry.clear()
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = 1000
+    return pd.DataFrame(
+        {
+            "quadricula": rng.integers(1, 4, rows),
+            "dia_previsao": rng.integers(1, 15, rows),
+            "valor": rng.random(rows),
+            "nome": [f"n{i}" for i in range(rows)],
+        }
+    )
+
+
+class TestWriteTable:
+    def test_partitioned_table(self, database, data):
+        files = write_table(
+            data,
+            str(database / "previsoes"),
+            partition_keys=["quadricula"],
+            sort_by=["dia_previsao"],
+            row_group_size=100,
+            database=str(database),
+        )
+        assert sorted(files) == [
+            f"file://{database}/previsoes/previsoes-quadricula={i}.parquet"
+            for i in [1, 2, 3]
+        ]
+        schema = json.loads((database / "schema.json").read_text())
+        assert schema["tables"] == [{"name": "previsoes", "uri": "previsoes"}]
+        schema = json.loads((database / "previsoes/schema.json").read_text())
+        assert schema["fileType"] == ".parquet"
+        assert schema["partitions"] == [{"name": "quadricula", "type": "int"}]
+        assert [c["type"] for c in schema["columns"]] == [
+            "int",
+            "float",
+            "string",
+        ]
+
+        f = pq.ParquetFile(
+            database / "previsoes/previsoes-quadricula=1.parquet"
+        )
+        assert f.metadata.num_row_groups > 1
+        assert "quadricula" not in f.schema_arrow.names
+        row_group = f.metadata.row_group(0)
+        assert row_group.sorting_columns[0].column_index == 0
+        assert row_group.column(0).statistics.has_min_max
+        assert row_group.column(0).has_offset_index
+        days = f.read().column("dia_previsao").to_pylist()
+        assert days == sorted(days)
+
+        query = "SELECT quadricula, dia_previsao, valor FROM previsoes"
+        query += " WHERE quadricula = 2 AND dia_previsao < 5"
+        result = parse(lex(query), FSConnection(str(database)))
+        assert result.message == "['previsoes-quadricula=2']"
+        expected = data[(data["quadricula"] == 2) & (data["dia_previsao"] < 5)]
+        df = result.data.sort_values(["dia_previsao", "valor"])
+        expected = expected[list(df.columns)]
+        expected = expected.sort_values(["dia_previsao", "valor"])
+        assert np.array_equal(df.to_numpy(), expected.to_numpy())
+
+    def test_round_trip(self, database, data):
+        data = data.rename(columns={"nome": "nome usina"})
+        data["data"] = pd.date_range(
+            "2024-01-01 00:00:00.000001", periods=len(data), freq="us", tz="UTC"
+        )
+        write_table(
+            data,
+            str(database / "previsoes"),
+            ["quadricula"],
+            database=str(database),
+        )
+        f = pq.ParquetFile(
+            database / "previsoes/previsoes-quadricula=1.parquet"
+        )
+        assert f.schema_arrow.names == list(data.columns.drop("quadricula"))
+        for i in range(f.metadata.num_columns):
+            assert f.metadata.row_group(0).column(i).is_stats_set
+
+        query = "SELECT * FROM previsoes"
+        result = parse(lex(query), FSConnection(str(database)))
+        assert result.status
+        df = result.data.sort_values("data").reset_index(drop=True)
+        expected = data[list(df.columns)].sort_values("data")
+        assert df.equals(expected.reset_index(drop=True))
+
+    def test_replace_partitions(self, database, data):
+        uri = str(database / "previsoes")
+        write_table(data, uri, ["quadricula"])
+        write_table(
+            data[data["quadricula"] == 1].iloc[:10], uri, ["quadricula"]
+        )
+        for i, rows in [(1, 10), (2, (data["quadricula"] == 2).sum())]:
+            path = database / f"previsoes/previsoes-quadricula={i}.parquet"
+            assert pq.ParquetFile(path).metadata.num_rows == rows
+        assert sorted(p.name for p in (database / "previsoes").iterdir()) == [
+            "previsoes-quadricula=1.parquet",
+            "previsoes-quadricula=2.parquet",
+            "previsoes-quadricula=3.parquet",
+            "schema.json",
+        ]
+
+    def test_schema_conflicts(self, database, data):
+        uri = str(database / "previsoes")
+        write_table(data, uri, ["quadricula"])
+        with pytest.raises(ValueError):
+            write_table(data, uri, ["dia_previsao"])
+        with pytest.raises(ValueError):
+            write_table(data, uri, ["quadricula"], file_type=".parquet.gzip")
+        with pytest.raises(ValueError):
+            write_table(data.astype({"valor": str}), uri, ["quadricula"])
+
+    def test_invalid_partition_values(self, database, data):
+        with pytest.raises(ValueError):
+            write_table(data, str(database / "previsoes"), ["valor"])
+        data["data"] = "2024-01-01"
+        with pytest.raises(ValueError):
+            write_table(data, str(database / "previsoes"), ["data"])
+        assert not (database / "previsoes/schema.json").exists()
+        assert len(list((database / "previsoes").iterdir())) == 0
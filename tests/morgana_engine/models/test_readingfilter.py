@@ -6,7 +6,13 @@ from morgana_engine.models.readingfilter import (
     NotInSetReadingFilter,
 )
 from morgana_engine.models.parsedsql import Column
-from morgana_engine.models.sql import SQLToken, SQLTokenType
+from morgana_engine.models.sql import (
+    SQLToken,
+    SQLTokenType,
+    SQLSetToken,
+    SQLLiteralToken,
+    SQLValueListToken,
+)
 import pytest
 
 
@@ -116,6 +122,21 @@ class TestEqualityReadingFilter:
         casting_func = int
         assert filter.apply(values, casting_func) == [5, 15, 20]
 
+    def test_apply_quoted_strings(self):
+        filter = EqualityReadingFilter(
+            TestEqualityReadingFilter.column,
+            TestEqualityReadingFilter.equal_token,
+            [SQLLiteralToken("'D''Avila'", "D'Avila")],
+        )
+        values = ["D'Avila", "DAvila", 'say "hi"']
+        assert filter.apply(values, str) == ["D'Avila"]
+        filter = EqualityReadingFilter(
+            TestEqualityReadingFilter.column,
+            TestEqualityReadingFilter.equal_token,
+            [SQLLiteralToken("'say \"hi\"'", 'say "hi"')],
+        )
+        assert filter.apply(values, str) == ['say "hi"']
+
 
 class TestUnequalityReadingFilter:
     gt_token = SQLToken(SQLTokenType.GREATER, ">")
@@ -231,6 +252,45 @@ class TestInSetReadingFilter:
         casting_func = int
         assert filter.apply(values, casting_func) == [10, 15]
 
+    def test_apply_value_set(self):
+        filter = InSetReadingFilter(
+            TestInSetReadingFilter.column,
+            TestInSetReadingFilter.in_token,
+            [SQLSetToken("SELECT colname FROM other", frozenset([10, 15]))],
+        )
+        values = [5, 10, 15, 20]
+        casting_func = int
+        assert filter.apply(values, casting_func) == [10, 15]
+
+    def test_apply_value_list(self):
+        value_list = SQLValueListToken(
+            [SQLLiteralToken("10", 10), SQLLiteralToken("'15'", "15")]
+        )
+        filter = InSetReadingFilter(
+            TestInSetReadingFilter.column,
+            TestInSetReadingFilter.in_token,
+            [value_list],
+        )
+        values = [5, 10, 15, 20]
+        casting_func = int
+        assert filter.apply(values, casting_func) == [10, 15]
+        assert value_list.value_set(int) is value_list.value_set(int)
+
+    def test_value_list_casted_from_text(self):
+        value_list = SQLValueListToken(
+            [
+                SQLLiteralToken("00123", 123),
+                SQLLiteralToken("'D''Avila'", "D'Avila"),
+            ]
+        )
+        assert value_list.value_set(str) == frozenset(["00123", "D'Avila"])
+        value_list = SQLValueListToken(
+            [SQLLiteralToken("1.5", 1.5), SQLLiteralToken("2", 2)]
+        )
+        assert value_list.value_set(float) == frozenset([1.5, 2.0])
+        with pytest.raises(ValueError):
+            value_list.value_set(int)
+
 
 class TestNotInSetReadingFilter:
     not_in_token = SQLToken(SQLTokenType.NOT_IN, "NOT IN")
@@ -286,3 +346,13 @@ class TestNotInSetReadingFilter:
         values = [5, 10, 15, 20]
         casting_func = int
         assert filter.apply(values, casting_func) == [5, 20]
+
+    def test_apply_value_set(self):
+        filter = NotInSetReadingFilter(
+            TestNotInSetReadingFilter.column,
+            TestNotInSetReadingFilter.not_in_token,
+            [SQLSetToken("SELECT colname FROM other", frozenset([10, 15]))],
+        )
+        values = [5, 10, 15, 20]
+        casting_func = int
+        assert filter.apply(values, casting_func) == [5, 20]
@@ -1,3 +1,4 @@
+import pytest
 from morgana_engine.models.schema import Schema
 
 
@@ -85,6 +86,18 @@ class TestSchema:
         schema = Schema(schema_dict)
         assert schema.partitions == {"key1": "int", "key2": "string"}
 
+    def test_lookups_are_read_only(self):
+        schema_dict = {
+            "uri": "test_uri",
+            "name": "test_name",
+            "columns": [{"name": "col1", "type": "int"}],
+        }
+        schema = Schema(schema_dict)
+        assert schema.columns is schema.columns
+        assert schema.partitions == {}
+        with pytest.raises(TypeError):
+            schema.columns["col2"] = "string"  # type: ignore
+
     def test_eq(self):
         schema_dict1 = {
             "uri": "test_uri",
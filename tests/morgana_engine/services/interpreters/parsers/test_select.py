@@ -1,7 +1,14 @@
 from morgana_engine.services.interpreters.lex import lex
 from morgana_engine.services.interpreters.parse import parse
-from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.connection import (
+    FSConnection,
+    SQLConnection,
+)
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.adapters.repository import registry
 import pandas as pd
+import sqlite3
+import pytest
 import pytz
 from datetime import datetime
 
@@ -461,3 +468,286 @@ class TestSELECT:
         assert df.reset_index(drop=True).equals(
             expected_df.reset_index(drop=True)[["nome_usina", "subsis"]]
         )
+
+    def test_where_in_subquery(self):
+        conn = FSConnection("tests/data")
+        query = (
+            "SELECT id, nome FROM usinas_part_id WHERE id IN"
+            + " (SELECT id, capacidade_instalada FROM usinas"
+            + " WHERE capacidade_instalada > 100)"
+        )
+        result = parse(lex(query), conn)
+        df = result.data
+        usinas_df = pd.read_parquet("tests/data/usinas/usinas.parquet.gzip")
+        ids = usinas_df.loc[usinas_df["capacidade_instalada"] > 100, "id"]
+        assert result.message == str(["usinas_part_id-id=1"])
+        assert df["id"].isin(ids).all()
+        assert len(df) == 1
+
+    def test_where_not_in_subquery(self):
+        conn = FSConnection("tests/data")
+        query = (
+            "SELECT id, nome FROM usinas WHERE id NOT IN"
+            + " (SELECT id FROM usinas_part_id) AND id < 20"
+        )
+        result = parse(lex(query), conn)
+        df = result.data
+        assert list(df["id"]) == list(range(11, 20))
+
+    def test_where_nested_boolean_expression(self):
+        conn = FSConnection("tests/data")
+        query = (
+            "SELECT id, capacidade_instalada FROM usinas_part_id"
+            + " WHERE (id = 1 OR id = 5) AND capacidade_instalada > 0"
+        )
+        result = parse(lex(query), conn)
+        assert result.message == str(
+            ["usinas_part_id-id=1", "usinas_part_id-id=5"]
+        )
+        assert sorted(result.data["id"]) == [1, 5]
+
+    def test_where_nested_too_deeply(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT id FROM usinas WHERE {}id = 1{}"
+        result = parse(lex(query.format("(" * 500, ")" * 500)), conn)
+        assert not result.status
+        assert result.message == "Filter nested too deeply"
+        result = parse(lex(query.format("(" * 64, ")" * 64)), conn)
+        assert list(result.data["id"]) == [1]
+
+    def test_where_partition_range_pruning(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome FROM usinas_part_id WHERE id > 2 AND id < 5"
+        result = parse(lex(query), conn)
+        assert result.message == str(
+            ["usinas_part_id-id=3", "usinas_part_id-id=4"]
+        )
+        assert sorted(result.data["id"]) == [3, 4]
+
+    def test_where_partition_in_list(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome FROM usinas_part_id WHERE id IN (1, 2, 3)"
+        result = parse(lex(query), conn)
+        assert sorted(result.data["id"]) == [1, 2, 3]
+
+    def test_where_in_list_lossy_cast(self):
+        conn = FSConnection("tests/data")
+        for query in [
+            "SELECT id FROM usinas WHERE id = 1.5",
+            "SELECT id FROM usinas WHERE id IN (1.5, 2)",
+        ]:
+            with pytest.raises(ValueError):
+                parse(lex(query), conn)
+
+    def test_where_invalid_expression(self):
+        conn = FSConnection("tests/data")
+        for query in [
+            "SELECT id FROM usinas WHERE id = 1 AND",
+            "SELECT id FROM usinas WHERE (id = 1",
+            "SELECT id FROM usinas WHERE id 1",
+        ]:
+            assert not parse(lex(query), conn).status
+
+    def test_memory_budget_spill(self, tmp_path):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome, capacidade_instalada FROM usinas_part_id WHERE id > 3"
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        options = ExecutionOptions(
+            memory_budget=1, spill_directory=str(tmp_path)
+        )
+        result = parse(lex(query), conn, options=options)
+        assert result.status
+        assert result.data is None
+        assert result.batches.spilled
+        assert result.batches.to_pandas().equals(expected_df)
+        result.batches.close()
+
+    def test_memory_budget_spilled_subquery(self, tmp_path):
+        conn = FSConnection("tests/data")
+        query = (
+            "SELECT id, nome FROM usinas_part_id WHERE id IN"
+            + " (SELECT id, nome FROM usinas WHERE id < 4)"
+        )
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        assert sorted(expected_df["id"]) == [1, 2, 3]
+        options = ExecutionOptions(
+            memory_budget=1, spill_directory=str(tmp_path)
+        )
+        result = parse(lex(query), conn, options=options)
+        assert result.status
+        assert result.batches.to_pandas().equals(expected_df)
+        result.batches.close()
+
+    def test_memory_budget_empty_first_partition(self, tmp_path):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome FROM usinas_part_id WHERE nome = 'ENACEL'"
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        assert len(expected_df) == 1
+        for budget in [1, 2**30]:
+            options = ExecutionOptions(
+                memory_budget=budget, spill_directory=str(tmp_path)
+            )
+            result = parse(lex(query), conn, options=options)
+            assert result.status
+            if result.batches is not None:
+                df = result.batches.to_pandas()
+                result.batches.close()
+            else:
+                df = result.data.reset_index(drop=True)
+            assert df.equals(expected_df)
+
+    def test_memory_budget_in_memory(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT * FROM velocidade_vento_100m WHERE dia_previsao = 1"
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        options = ExecutionOptions(memory_budget=2**30)
+        result = parse(lex(query), conn, options=options)
+        assert result.batches is None
+        assert result.data.equals(expected_df)
+
+    def test_process_pool(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome, capacidade_instalada FROM usinas_part_id WHERE capacidade_instalada > 10"
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        options = ExecutionOptions(workers=2)
+        result = parse(lex(query), conn, options=options)
+        assert result.data.equals(expected_df)
+
+    def test_process_pool_join(self):
+        conn = FSConnection("tests/data")
+        query = """SELECT id, up.id, nome, up.nome
+                   FROM usinas_part_id
+                   INNER JOIN usinas_part_subsis AS up
+                   ON usinas_part_id.id = up.id
+                   WHERE id < 5"""
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        options = ExecutionOptions(workers=2, memory_budget=1)
+        result = parse(lex(query), conn, options=options)
+        assert result.data.reset_index(drop=True).equals(expected_df)
+
+    def test_process_pool_reused(self):
+        conn = FSConnection("tests/data")
+        query = (
+            "SELECT id, nome FROM usinas_part_id WHERE id IN"
+            + " (SELECT id FROM usinas_part_subsis WHERE id < 4)"
+        )
+        expected_df = parse(lex(query), conn).data.reset_index(drop=True)
+        options = ExecutionOptions(workers=2)
+        registry.clear()
+        for _ in range(2):
+            result = parse(lex(query), conn, options=options)
+            assert result.data.reset_index(drop=True).equals(expected_df)
+        # The query, its subquery and the repeated query share the pool
+        assert list(registry._PROCESS_POOLS.keys()) == [2]
+        registry.clear()
+        assert len(registry._PROCESS_POOLS) == 0
+
+    def test_sql_pushdown(self, tmp_path, monkeypatch):
+        conn = FSConnection("tests/data")
+        path = str(tmp_path / "data.db")
+        df = parse(lex("SELECT * FROM usinas"), conn).data
+        with sqlite3.connect(path) as db:
+            df.astype({"data_inicio_operacao": str}).drop(
+                columns=["data_inicio_simulacao"]
+            ).to_sql(
+                "usinas",
+                db,
+                index=False,
+                dtype={"data_inicio_operacao": "DATE"},
+            )
+        sql_conn = SQLConnection(path)
+
+        conditions = []
+        select = SQLConnection.select
+
+        def __select(self, columns, where=None, parameters=None):
+            conditions.append((where, parameters))
+            return select(self, columns, where, parameters)
+
+        monkeypatch.setattr(SQLConnection, "select", __select)
+        for query in [
+            "SELECT id, nome, capacidade_instalada FROM usinas"
+            + " WHERE capacidade_instalada > 10 AND id NOT IN (1, 2)",
+            "SELECT id, nome FROM usinas WHERE id = 3 OR nome = 'Angra 1'",
+            "SELECT id, data_inicio_operacao FROM usinas"
+            + " WHERE data_inicio_operacao > '2000-01-01' AND id != 5",
+            "SELECT id, nome, capacidade_instalada FROM usinas",
+        ]:
+            expected = parse(lex(query), conn).data.reset_index(drop=True)
+            result = parse(lex(query), sql_conn)
+            assert result.status
+            assert result.data.reset_index(drop=True).equals(expected)
+        assert conditions[0][0] == (
+            '("capacidade_instalada" > ? AND'
+            + ' ("id" NOT IN (?, ?) OR "id" IS NULL))'
+        )
+        assert conditions[1] == ('("id" = ? OR "nome" = ?)', [3, "Angra 1"])
+        # Dates are filtered only after reading
+        assert conditions[2] == ('("id" != ? OR "id" IS NULL)', [5])
+        # Without filters, the whole table is read
+        assert conditions[3] == (None, [])
+
+    def test_where_quoted_strings(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "data.db")
+        names = ["D'Avila", 'say "hi"', "Avila"]
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE usinas (id INTEGER, nome TEXT)")
+            db.executemany(
+                "INSERT INTO usinas VALUES (?, ?)", list(enumerate(names))
+            )
+        sql_conn = SQLConnection(path)
+        select = SQLConnection.select
+
+        def __select(self, columns, where=None, parameters=None):
+            # Reads the whole table, which is only filtered afterwards
+            return select(self, columns)
+
+        for pushdown in [True, False]:
+            if not pushdown:
+                monkeypatch.setattr(SQLConnection, "select", __select)
+            for literal, ids in [
+                ("'D''Avila'", [0]),
+                ("'say \"hi\"'", [1]),
+                ("'Avila'", [2]),
+            ]:
+                for condition in [f"= {literal}", f"IN ({literal})"]:
+                    query = (
+                        f"SELECT id, nome FROM usinas WHERE nome {condition}"
+                    )
+                    result = parse(lex(query), sql_conn)
+                    assert result.status
+                    assert result.data["id"].tolist() == ids
+
+    def test_sql_pushdown_untyped_columns(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "data.db")
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE usinas (id, nome TEXT)")
+            db.executemany(
+                "INSERT INTO usinas VALUES (?, ?)",
+                [(1, "a"), (2, "b"), (3, "c")],
+            )
+        sql_conn = SQLConnection(path)
+        assert sql_conn.access("usinas").schema.columns["id"] == "any"
+
+        conditions = []
+        select = SQLConnection.select
+
+        def __select(self, columns, where=None, parameters=None):
+            conditions.append((where, parameters))
+            return select(self, columns, where, parameters)
+
+        monkeypatch.setattr(SQLConnection, "select", __select)
+        for query, ids in [
+            ("SELECT id, nome FROM usinas WHERE id = 2", [2]),
+            ("SELECT id, nome FROM usinas WHERE id IN (1, 2)", [1, 2]),
+            ("SELECT id, nome FROM usinas WHERE id = 2 AND nome = 'b'", [2]),
+        ]:
+            result = parse(lex(query), sql_conn)
+            assert result.status
+            assert result.data["id"].tolist() == ids
+        # Only the filters of typed columns are pushed down
+        assert conditions == [
+            (None, []),
+            (None, []),
+            ('"nome" = ?', ["b"]),
+        ]
@@ -0,0 +1,47 @@
+from morgana_engine.models.sql import SQLTokenType, SQLLiteralToken
+from morgana_engine.services.interpreters.lex import lex
+
+
+class TestLex:
+    def test_keywords_and_punctuation(self):
+        tokens = lex("select u.id,nome FROM usinas AS u WHERE id>=2").tokens
+        assert [t.type for t in tokens] == [
+            SQLTokenType.SELECT,
+            SQLTokenType.ENTITY,
+            SQLTokenType.DOT,
+            SQLTokenType.ENTITY,
+            SQLTokenType.COMMA,
+            SQLTokenType.ENTITY,
+            SQLTokenType.FROM,
+            SQLTokenType.ENTITY,
+            SQLTokenType.AS,
+            SQLTokenType.ENTITY,
+            SQLTokenType.WHERE,
+            SQLTokenType.ENTITY,
+            SQLTokenType.GREATER_EQUAL,
+            SQLTokenType.ENTITY,
+        ]
+        assert tokens[0].text == "select"
+
+    def test_typed_literals(self):
+        tokens = lex("SELECT a FROM t WHERE b = 1.5 AND c != -2").tokens
+        assert isinstance(tokens[7], SQLLiteralToken)
+        assert tokens[7].value == 1.5
+        assert tokens[10].type == SQLTokenType.DIFFERENT
+        assert tokens[11].value == -2
+
+    def test_quoted_strings_with_spaces(self):
+        tokens = lex("SELECT a FROM t WHERE b = 'it''s a; b'").tokens
+        assert len(tokens) == 8
+        assert tokens[-1].text == "'it''s a; b'"
+        assert tokens[-1].value == "it's a; b"
+
+    def test_multiline_and_semicolon(self):
+        tokens = lex("SELECT a\nFROM t;\nSELECT b FROM t").tokens
+        assert [t.text for t in tokens] == ["SELECT", "a", "FROM", "t"]
+
+    def test_large_in_list(self):
+        values = ", ".join(str(i) for i in range(20000))
+        tokens = lex(f"SELECT a FROM t WHERE a IN ({values})").tokens
+        assert len(tokens) == 8 + 2 * 20000
+        assert tokens[-2].value == 19999
@@ -0,0 +1,138 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from morgana_engine.models.options import ExecutionOptions
+from morgana_engine.services import asynchronous
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.asynchronous import async_parse
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.cache import ObjectCache
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.reader import PrefetchedFileReader
+
+
+class SlowFileSystem:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fetches = 0
+
+    async def _cat_file(self, path: str) -> bytes:
+        self.fetches += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        with open(path, "rb") as f:
+            return f.read()
+
+
+class WindowReader(PrefetchedFileReader):
+    max_held = 0
+
+    def start(self, conn, file):
+        started = super().start(conn, file)
+        held = len(self._contents) + len(self._fetching)
+        WindowReader.max_held = max(WindowReader.max_held, held)
+        return started
+
+
+class TestAsynchronous:
+    query = (
+        "SELECT id, nome, capacidade_instalada FROM usinas_part_id WHERE id > 3"
+    )
+
+    def test_async_parse(self):
+        conn = FSConnection("tests/data")
+        result = asyncio.run(async_parse(lex(self.query), conn))
+        expected = parse(lex(self.query), conn)
+        assert result.message == expected.message
+        assert result.data.equals(expected.data)
+
+    def test_async_parse_join(self):
+        conn = FSConnection("tests/data")
+        query = """SELECT id, up.id, nome, up.nome
+                   FROM usinas
+                   INNER JOIN usinas_part_subsis AS up
+                   ON usinas.id = up.id"""
+        result = asyncio.run(async_parse(lex(query), conn))
+        expected = parse(lex(query), conn)
+        assert result.data.equals(expected.data)
+
+    def test_concurrent_fetches(self, monkeypatch):
+        conn = FSConnection("tests/data")
+        fs = SlowFileSystem()
+
+        @asynccontextmanager
+        async def async_filesystem():
+            yield fs
+
+        table_conn = conn.access("usinas_part_id")
+        monkeypatch.setattr(conn, "async_filesystem", async_filesystem)
+        result = asyncio.run(async_parse(lex(self.query), conn, None, 3))
+        assert result.status
+        assert len(table_conn.list_files()) > 3
+        assert fs.max_in_flight == 3
+
+    def _slow_connection(self, monkeypatch):
+        conn = FSConnection("tests/data")
+        fs = SlowFileSystem()
+
+        @asynccontextmanager
+        async def async_filesystem():
+            yield fs
+
+        monkeypatch.setattr(conn, "async_filesystem", async_filesystem)
+        return conn, fs
+
+    def test_prefetch_window(self, monkeypatch):
+        conn, fs = self._slow_connection(monkeypatch)
+        monkeypatch.setattr(asynchronous, "PrefetchedFileReader", WindowReader)
+        WindowReader.max_held = 0
+        result = asyncio.run(async_parse(lex(self.query), conn, None, 8, 2))
+        expected = parse(lex(self.query), conn)
+        assert result.data.equals(expected.data)
+        assert fs.fetches > 2
+        assert WindowReader.max_held == 2
+
+    def test_prefetch_memory_budget(self, tmp_path, monkeypatch):
+        conn, fs = self._slow_connection(monkeypatch)
+        monkeypatch.setattr(asynchronous, "PrefetchedFileReader", WindowReader)
+        WindowReader.max_held = 0
+        options = ExecutionOptions(
+            memory_budget=1, spill_directory=str(tmp_path)
+        )
+        result = asyncio.run(async_parse(lex(self.query), conn, options))
+        expected = parse(lex(self.query), conn).data.reset_index(drop=True)
+        assert result.batches.to_pandas().equals(expected)
+        result.batches.close()
+        assert WindowReader.max_held == 1
+
+    def test_fetches_through_cache(self, tmp_path, monkeypatch):
+        conn, fs = self._slow_connection(monkeypatch)
+        cached = []
+
+        def cached_content(self, file):
+            cached.append(file)
+            path = f"{self.path}/{file}{self.schema.file_type}"
+            with open(path, "rb") as f:
+                return f.read()
+
+        monkeypatch.setattr(FSConnection, "cached_content", cached_content)
+        registry.set_object_cache(ObjectCache(str(tmp_path), 2**20))
+        try:
+            result = asyncio.run(async_parse(lex(self.query), conn))
+        finally:
+            registry.clear()
+        expected = parse(lex(self.query), conn)
+        assert result.data.equals(expected.data)
+        assert len(cached) > 0
+        assert fs.fetches == 0
+
+    def test_validation_error(self):
+        conn = FSConnection("tests/data")
+        result = asyncio.run(
+            async_parse(lex("SELECT missing FROM usinas"), conn)
+        )
+        assert not result.status
@@ -0,0 +1,43 @@
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.batch import batch_parse
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.adapters.repository.reader import SharedFileReader
+
+
+class TestBatch:
+    queries = [
+        "SELECT id, nome FROM usinas_part_id WHERE id <= 3",
+        "SELECT id, capacidade_instalada FROM usinas_part_id WHERE id < 5",
+        "SELECT * FROM usinas_part_id WHERE id = 2",
+        "SELECT id, capacidade_instalada FROM usinas"
+        + " WHERE capacidade_instalada > 100",
+    ]
+
+    def test_results_match_single_queries(self):
+        conn = FSConnection("tests/data")
+        results = batch_parse([lex(q) for q in self.queries], conn)
+        assert len(results) == len(self.queries)
+        for q, r in zip(self.queries, results):
+            expected = parse(lex(q), conn)
+            assert r.status
+            assert (
+                r.data.sort_values("id")
+                .reset_index(drop=True)
+                .equals(expected.data.sort_values("id").reset_index(drop=True))
+            )
+
+    def test_files_are_read_once(self):
+        conn = FSConnection("tests/data")
+        reader = SharedFileReader()
+        batch_parse([lex(q) for q in self.queries], conn, reader)
+        # usinas_part_id-id=1 to 4 and usinas
+        assert reader.reads == 5
+
+    def test_invalid_statement(self):
+        conn = FSConnection("tests/data")
+        results = batch_parse(
+            [lex("SELECT id FROM"), lex(self.queries[0])], conn
+        )
+        assert not results[0].status
+        assert results[1].status
@@ -0,0 +1,106 @@
+from morgana_engine.services import distributed
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.distributed import (
+    Invoker,
+    LocalInvoker,
+    balance_work_units,
+    distributed_parse,
+    worker_endpoint,
+)
+from morgana_engine.adapters.repository.connection import FSConnection
+
+
+class InProcessInvoker(Invoker):
+    def __init__(self) -> None:
+        self.work_units: list[dict] = []
+
+    def invoke(self, work_units: list[dict]) -> list[dict]:
+        self.work_units += work_units
+        return [worker_endpoint(w) for w in work_units]
+
+
+class TestDistributed:
+    query = (
+        "SELECT id, nome, capacidade_instalada FROM usinas_part_id WHERE id > 2"
+    )
+
+    def test_balance_work_units(self):
+        sizes = {"a": 10, "b": 7, "c": 5, "d": 3, "e": 2}
+        units = balance_work_units(sizes, 2)
+        assert len(units) == 2
+        totals = sorted(sum(sizes[f] for f in u) for u in units)
+        assert totals == [13, 14]
+        assert balance_work_units(sizes, 10) == [[f] for f in "abcde"]
+
+    def test_merge_in_file_order(self):
+        conn = FSConnection("tests/data")
+        invoker = InProcessInvoker()
+        result = distributed_parse(lex(self.query), conn, invoker, 3, "FS")
+        expected = parse(lex(self.query), conn)
+        assert len(invoker.work_units) == 3
+        assert result.message == expected.message
+        assert result.data.equals(expected.data.reset_index(drop=True))
+
+    def test_local_invoker(self):
+        conn = FSConnection("tests/data")
+        result = distributed_parse(
+            lex(self.query), conn, LocalInvoker(2), 2, "FS"
+        )
+        expected = parse(lex(self.query), conn)
+        assert result.data.equals(expected.data.reset_index(drop=True))
+
+    def test_offloaded_partial_results(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("MORGANA_RESULT_LOCATION", str(tmp_path))
+        conn = FSConnection("tests/data")
+        invoker = InProcessInvoker()
+        result = distributed_parse(lex(self.query), conn, invoker, 3, "FS")
+        expected = parse(lex(self.query), conn)
+        assert result.data.equals(expected.data.reset_index(drop=True))
+        # The objects are removed after being read by the coordinator
+        assert list(tmp_path.iterdir()) == []
+
+    def test_worker_returns_uri(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("MORGANA_RESULT_LOCATION", str(tmp_path))
+        conn = FSConnection("tests/data")
+        response = worker_endpoint(
+            {
+                "database": conn.uri,
+                "connection": "FS",
+                "query": self.query,
+                "files": ["usinas_part_id-id=3"],
+            }
+        )
+        assert response["statusCode"] == 200
+        assert "body" not in response
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_partial_result_too_large(self, monkeypatch):
+        monkeypatch.delenv("MORGANA_RESULT_LOCATION", raising=False)
+        monkeypatch.setattr(distributed, "MAX_INLINE_BODY_BYTES", 16)
+        conn = FSConnection("tests/data")
+        result = distributed_parse(
+            lex(self.query), conn, InProcessInvoker(), 2, "FS"
+        )
+        assert not result.status
+        assert "MORGANA_RESULT_LOCATION" in result.message
+
+    def test_worker_error(self):
+        conn = FSConnection("tests/data")
+        response = worker_endpoint(
+            {
+                "database": conn.uri,
+                "connection": "FS",
+                "query": "SELECT missing FROM usinas_part_id",
+                "files": [],
+            }
+        )
+        assert response["statusCode"] == 500
+
+    def test_join_not_supported(self):
+        conn = FSConnection("tests/data")
+        query = """SELECT id, up.id FROM usinas
+                   INNER JOIN usinas_part_subsis AS up
+                   ON usinas.id = up.id"""
+        result = distributed_parse(lex(query), conn, InProcessInvoker(), 2)
+        assert not result.status
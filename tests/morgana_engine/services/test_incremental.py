@@ -0,0 +1,77 @@
+import os
+import shutil
+import pandas as pd
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.incremental import incremental_parse
+from morgana_engine.adapters.repository.connection import FSConnection
+
+
+def _copy_data(tmp_path) -> str:
+    path = str(tmp_path / "data")
+    shutil.copytree("tests/data", path)
+    return path
+
+
+def _rewrite_file(path: str):
+    df = pd.read_parquet(path)
+    pd.concat([df, df], ignore_index=True).to_parquet(path, compression="gzip")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestIncremental:
+    query = "SELECT id, nome, capacidade_instalada FROM usinas_part_id"
+
+    def test_first_call_reads_all_files(self, tmp_path):
+        conn = FSConnection(_copy_data(tmp_path))
+        result = incremental_parse(lex(self.query), conn)
+        expected = parse(lex(self.query), conn).data
+        assert result.status
+        assert len(result.token["files"]) == 10
+        assert len(result.data) == len(expected)
+        assert set(result.data["id"]) == set(expected["id"])
+
+    def test_unchanged_files_are_not_read(self, tmp_path):
+        conn = FSConnection(_copy_data(tmp_path))
+        first = incremental_parse(lex(self.query), conn)
+        second = incremental_parse(lex(self.query), conn, first.token)
+        assert second.message == "[]"
+        assert len(second.data) == 0
+        assert second.token == first.token
+
+    def test_delta_and_merged(self, tmp_path):
+        path = _copy_data(tmp_path)
+        conn = FSConnection(path)
+        first = incremental_parse(lex(self.query), conn)
+        _rewrite_file(
+            os.path.join(
+                path, "usinas_part_id", "usinas_part_id-id=3.parquet.gzip"
+            )
+        )
+        delta = incremental_parse(lex(self.query), conn, first.token)
+        assert delta.message == str(["usinas_part_id-id=3"])
+        assert list(delta.data["id"]) == [3, 3]
+
+        merged = incremental_parse(
+            lex(self.query), conn, first.token, previous=first.data
+        )
+        full = incremental_parse(lex(self.query), conn)
+        assert merged.data.equals(full.data)
+        assert merged.token == full.token
+
+    def test_token_from_other_query(self, tmp_path):
+        conn = FSConnection(_copy_data(tmp_path))
+        first = incremental_parse(lex(self.query), conn)
+        other = incremental_parse(
+            lex("SELECT id, nome FROM usinas_part_id"), conn, first.token
+        )
+        assert len(other.data) == len(first.data)
+
+    def test_join_not_supported(self):
+        conn = FSConnection("tests/data")
+        query = """SELECT id, up.id FROM usinas
+                   INNER JOIN usinas_part_subsis AS up
+                   ON usinas.id = up.id"""
+        result = incremental_parse(lex(query), conn)
+        assert not result.status
@@ -0,0 +1,75 @@
+import ast
+import json
+import pandas as pd
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.pagination import paginated_parse
+from morgana_engine.adapters.repository.connection import FSConnection
+
+
+class TestPagination:
+    query = "SELECT id, nome FROM usinas_part_id WHERE id > 3"
+
+    def test_pages_cover_result(self):
+        conn = FSConnection("tests/data")
+        expected = parse(lex(self.query), conn).data.reset_index(drop=True)
+        pages = []
+        cursor = None
+        page = 0
+        while True:
+            result = paginated_parse(lex(self.query), conn, 4, page, cursor)
+            assert result.status
+            # The cursor is JSON-serializable
+            cursor = json.loads(json.dumps(result.token))
+            pages.append(result.data)
+            if len(result.data) < 4:
+                break
+            page += 1
+        assert pd.concat(pages, ignore_index=True).equals(expected)
+
+    def test_cursor_skips_previous_files(self):
+        conn = FSConnection("tests/data")
+        expected = parse(lex(self.query), conn).data.reset_index(drop=True)
+        first = paginated_parse(lex(self.query), conn, 2)
+        read_first = ast.literal_eval(first.message)
+        assert len(read_first) < len(first.token["files"])
+        assert all(f["version"] is not None for f in first.token["files"])
+
+        last_page = (len(expected) - 1) // 2
+        result = paginated_parse(
+            lex(self.query), conn, 2, last_page, first.token
+        )
+        assert result.status
+        assert read_first[0] not in ast.literal_eval(result.message)
+        assert result.data.equals(
+            expected.iloc[last_page * 2 :].reset_index(drop=True)
+        )
+
+    def test_cursor_checked_against_listing(self):
+        conn = FSConnection("tests/data")
+        first = paginated_parse(lex(self.query), conn, 2)
+        cursor = json.loads(json.dumps(first.token))
+        cursor["files"][0]["name"] = "../usinas/usinas"
+        result = paginated_parse(lex(self.query), conn, 2, 1, cursor)
+        assert not result.status
+
+        cursor = json.loads(json.dumps(first.token))
+        cursor["files"][0]["version"] = "changed"
+        assert not paginated_parse(lex(self.query), conn, 2, 1, cursor).status
+
+        cursor = json.loads(json.dumps(first.token))
+        cursor["files"] = cursor["files"][1:]
+        assert not paginated_parse(lex(self.query), conn, 2, 1, cursor).status
+
+    def test_page_beyond_result(self):
+        conn = FSConnection("tests/data")
+        result = paginated_parse(lex(self.query), conn, 1000, 5)
+        assert result.status
+        assert len(result.data) == 0
+        expected = parse(lex(self.query), conn).data
+        assert list(result.data.columns) == list(expected.columns)
+
+    def test_invalid_queries(self):
+        conn = FSConnection("tests/data")
+        assert not paginated_parse(lex("SHOW TABLES"), conn, 10).status
+        assert not paginated_parse(lex(self.query), conn, 0).status
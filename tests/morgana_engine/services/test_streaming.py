@@ -0,0 +1,86 @@
+import io
+import pyarrow as pa
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.services.streaming import (
+    record_batches,
+    stream_parse,
+    write_ipc_stream,
+)
+from morgana_engine.adapters.repository.connection import FSConnection
+
+
+class FlushCountingStream(io.BytesIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def _read_stream(stream: io.BytesIO) -> pa.Table:
+    return pa.ipc.open_stream(stream.getvalue()).read_all()
+
+
+class TestStreaming:
+    def test_stream_by_file(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome, capacidade_instalada FROM usinas_part_id"
+        expected = parse(lex(query), conn).data.reset_index(drop=True)
+        tables = stream_parse(lex(query), conn)
+        first = next(tables)
+        # The first file is produced before the others are read
+        assert first.num_rows < len(expected)
+        stream = FlushCountingStream()
+        rows = write_ipc_stream(tables, stream)
+        assert rows == len(expected) - first.num_rows
+        assert stream.flushes == 9
+
+        stream = io.BytesIO()
+        write_ipc_stream(stream_parse(lex(query), conn), stream)
+        assert _read_stream(stream).to_pandas().equals(expected)
+
+    def test_stream_empty_result(self):
+        conn = FSConnection("tests/data")
+        query = "SELECT id, nome FROM usinas_part_id WHERE id < 0"
+        stream = io.BytesIO()
+        assert write_ipc_stream(stream_parse(lex(query), conn), stream) == 0
+        table = _read_stream(stream)
+        assert table.num_rows == 0
+        assert set(table.column_names) == {"id", "nome"}
+
+    def test_stream_join(self):
+        conn = FSConnection("tests/data")
+        query = """SELECT id, up.id, nome, up.nome
+                   FROM usinas_part_id
+                   INNER JOIN usinas_part_subsis AS up
+                   ON usinas_part_id.id = up.id
+                   WHERE id < 5"""
+        expected = parse(lex(query), conn).data.reset_index(drop=True)
+        stream = io.BytesIO()
+        write_ipc_stream(stream_parse(lex(query), conn), stream)
+        assert _read_stream(stream).to_pandas().equals(expected)
+
+    def test_stream_invalid_query(self):
+        conn = FSConnection("tests/data")
+        assert not stream_parse(lex("SHOW TABLES"), conn).status
+        assert not stream_parse(lex("SELECT x FROM usinas"), conn).status
+
+    def test_stream_missing_values(self):
+        tables = [
+            pa.table({"id": [1, 2], "nome": pa.nulls(2)}),
+            pa.table({"id": pa.array([], pa.int64()), "nome": pa.nulls(0)}),
+            pa.table({"id": [3], "nome": ["c"]}),
+            pa.table({"id": [4], "nome": pa.nulls(1)}),
+        ]
+        schema, batches = record_batches(iter(tables))
+        assert schema == pa.schema([("id", pa.int64()), ("nome", pa.string())])
+        table = pa.Table.from_batches(list(batches), schema)
+        assert table.column("id").to_pylist() == [1, 2, 3, 4]
+        assert table.column("nome").to_pylist() == [None, None, "c", None]
+
+        schema, batches = record_batches(iter(tables[:2]))
+        assert pa.types.is_null(schema.field("nome").type)
+        assert sum(b.num_rows for b in batches) == 2
@@ -0,0 +1,49 @@
+import sys
+import subprocess
+from morgana_engine.adapters.repository import registry
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.services.warmup import warm_up
+
+
+class TestWarmUp:
+    def setup_method(self):
+        registry.clear()
+
+    def test_warm_up(self, monkeypatch):
+        monkeypatch.setenv("MORGANA_WARM_DATABASES", "tests/data, ")
+        monkeypatch.setenv("MORGANA_WARM_CONNECTION", "FS")
+        listed = []
+        list_partition_files = FSConnection.list_partition_files
+
+        def __list_partition_files(self, column):
+            listed.append(column)
+            return list_partition_files(self, column)
+
+        monkeypatch.setattr(
+            FSConnection, "list_partition_files", __list_partition_files
+        )
+        tables = warm_up()
+        assert tables == {
+            "tests/data": [
+                "usinas",
+                "usinas_part_id",
+                "usinas_part_subsis",
+                "velocidade_vento_100m",
+            ]
+        }
+        assert "subsistema_geografico" in listed
+        # The database and table schemas are cached
+        assert len(registry._SCHEMAS) == 5
+
+    def test_lazy_imports(self):
+        code = (
+            "import sys, morgana_engine;"
+            + " from morgana_engine.services.interpreters.lex import lex;"
+            + " from morgana_engine.adapters import connect;"
+            + " connect('FS', 'tests/data');"
+            + " assert 'pandas' not in sys.modules;"
+            + " assert callable(morgana_engine.select_lambda_endpoint);"
+            + " assert 'pandas' in sys.modules;"
+            + " assert 's3fs' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
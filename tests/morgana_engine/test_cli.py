@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import pandas as pd
+import pytest
+from morgana_engine.cli import main
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.utils.ipc import ipc_to_table
+
+QUERY = "SELECT id, nome, capacidade_instalada FROM usinas_part_id WHERE id < 5"
+
+
+@pytest.fixture
+def expected() -> pd.DataFrame:
+    result = parse(lex(QUERY), FSConnection("tests/data"))
+    return result.data.reset_index(drop=True)
+
+
+class TestCLI:
+    def test_arrow_output(self, expected, tmp_path):
+        output = tmp_path / "result.arrow"
+        assert (
+            main(
+                [
+                    "tests/data",
+                    QUERY,
+                    "--format",
+                    "arrow",
+                    "--output",
+                    str(output),
+                ]
+            )
+            == 0
+        )
+        assert ipc_to_table(output.read_bytes()).to_pandas().equals(expected)
+
+    def test_parquet_output(self, expected, tmp_path):
+        output = tmp_path / "result.parquet"
+        args = ["--format", "parquet", "--compression", "zstd"]
+        assert main(["tests/data", QUERY, *args, "--output", str(output)]) == 0
+        assert pd.read_parquet(output).equals(expected)
+
+    def test_csv_output(self, expected, capsysbinary):
+        assert main(["tests/data", QUERY, "--format", "csv"]) == 0
+        lines = capsysbinary.readouterr().out.decode("utf-8").splitlines()
+        assert lines[0] == ",".join(expected.columns)
+        assert len(lines) == len(expected) + 1
+
+    def test_profile(self, capsys):
+        assert main(["tests/data", QUERY, "--profile"]) == 0
+        err = capsys.readouterr().err
+        for stage in ["lex", "validate", "plan", "execute", "read", "write"]:
+            assert stage in err
+        assert "files read    4" in err
+        assert "bytes read    0" not in err
+        assert "peak memory" in err
+
+    def test_profile_json(self, capsys):
+        assert main(["tests/data", QUERY, "--profile", "json"]) == 0
+        profile = json.loads(capsys.readouterr().err)
+        assert list(profile["seconds"].keys()) == [
+            "import",
+            "connect",
+            "lex",
+            "validate",
+            "plan",
+            "execute",
+            "read",
+            "write",
+        ]
+        assert profile["rows"] == 4
+        assert len(profile["files"]) == 4
+        assert profile["bytes_read"] > 0
+
+    def test_profile_sql_pushdown(self, capsys, tmp_path):
+        path = tmp_path / "data.db"
+        df = parse(lex("SELECT * FROM usinas"), FSConnection("tests/data")).data
+        with sqlite3.connect(path) as db:
+            df[["id", "nome"]].to_sql("usinas", db, index=False)
+        query = "SELECT id, nome FROM usinas WHERE id < 5"
+        args = ["--connection", "SQL", "--profile", "json"]
+        assert main([str(path), query, *args]) == 0
+        profile = json.loads(capsys.readouterr().err)
+        assert profile["rows"] == 4
+        assert len(profile["files"]) == 1
+        assert profile["bytes_read"] > 0
+
+    def test_invalid_query(self, capsys):
+        assert main(["tests/data", "SELECT id usinas"]) == 1
+        assert "Error" in capsys.readouterr().err
+        assert main(["tests/data", "SELECT id FROM tabela"]) == 1
+        assert "Table tabela not found" in capsys.readouterr().err
+
+    def test_missing_database(self, capsys):
+        assert main(["tests/missing", "SELECT id FROM usinas"]) == 1
+        err = capsys.readouterr().err
+        assert err.startswith("Error: ")
+        assert "Traceback" not in err
+
+    def test_invalid_compression(self):
+        with pytest.raises(SystemExit):
+            main(
+                [
+                    "tests/data",
+                    QUERY,
+                    "--format",
+                    "arrow",
+                    "--compression",
+                    "gzip",
+                ]
+            )
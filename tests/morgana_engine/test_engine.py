@@ -0,0 +1,119 @@
+import base64
+import io
+import pandas as pd
+import pyarrow as pa
+import pytest
+from morgana_engine import engine
+from morgana_engine.engine import _result_response, SMALL_RESULT_BYTES
+from morgana_engine.models.sql import ParsingResult
+from morgana_engine.utils.ipc import encode_batches, ipc_to_table
+
+
+@pytest.fixture
+def result() -> ParsingResult:
+    df = pd.DataFrame({"id": [1, 2, 3], "nome": ["a", "b", "c"]})
+    return ParsingResult(status=True, message="", data=df.iloc[1:])
+
+
+class TestResultResponse:
+    def test_default_small_result(self, result):
+        response = _result_response(result, {})
+        assert response["format"] == "arrow"
+        assert response["compression"] == "none"
+        df = ipc_to_table(base64.b64decode(response["body"])).to_pandas()
+        assert df.equals(result.data.reset_index(drop=True))
+
+    def test_default_large_result(self):
+        rows = SMALL_RESULT_BYTES // 8 + 1
+        data = pd.DataFrame({"valor": [1.0] * rows})
+        response = _result_response(
+            ParsingResult(status=True, message="", data=data), {}
+        )
+        assert response["format"] == "parquet"
+        assert response["compression"] == "zstd"
+        df = pd.read_parquet(io.BytesIO(base64.b64decode(response["body"])))
+        assert df.equals(data)
+
+    @pytest.mark.parametrize(
+        "output_format,compression",
+        [
+            ("arrow", "lz4"),
+            ("arrow", "zstd"),
+            ("parquet", "none"),
+            ("parquet", "snappy"),
+            ("parquet", "lz4"),
+        ],
+    )
+    def test_requested_encoding(self, result, output_format, compression):
+        response = _result_response(
+            result, {"format": output_format, "compression": compression}
+        )
+        assert response["compression"] == compression
+        body = pa.py_buffer(base64.b64decode(response["body"]))
+        if output_format == "arrow":
+            df = pa.ipc.open_stream(body).read_all().to_pandas()
+        else:
+            df = pd.read_parquet(io.BytesIO(body))
+        assert df.equals(result.data.reset_index(drop=True))
+
+    def test_parquet_defaults_to_gzip(self, result):
+        response = _result_response(result, {"format": "parquet"})
+        assert response["compression"] == "gzip"
+
+    def test_invalid_encoding(self, result):
+        assert _result_response(result, {"format": "csv"})["statusCode"] == 500
+        response = _result_response(
+            result, {"format": "arrow", "compression": "gzip"}
+        )
+        assert response["statusCode"] == 500
+
+
+class TestResultOffload:
+    def test_offload(self, result, tmp_path, monkeypatch):
+        monkeypatch.setenv("MORGANA_RESULT_LOCATION", str(tmp_path))
+        response = _result_response(result, {"offload": True})
+        assert response["statusCode"] == 200
+        assert "body" not in response
+        assert response["uri"].startswith(str(tmp_path))
+        assert response["uri"].endswith(".arrow")
+        with open(response["uri"], "rb") as f:
+            df = ipc_to_table(f.read()).to_pandas()
+        assert df.equals(result.data.reset_index(drop=True))
+
+    def test_offload_large_result(self, result, tmp_path, monkeypatch):
+        monkeypatch.setattr(engine, "MAX_INLINE_BODY_BYTES", 16)
+        monkeypatch.setenv("MORGANA_RESULT_LOCATION", str(tmp_path))
+        response = _result_response(result, {"format": "parquet"})
+        assert response["uri"].endswith(".parquet")
+        df = pd.read_parquet(response["uri"])
+        assert df.equals(result.data.reset_index(drop=True))
+
+    def test_location_not_from_request(self, result, tmp_path, monkeypatch):
+        monkeypatch.setenv("MORGANA_RESULT_LOCATION", str(tmp_path / "a"))
+        response = _result_response(
+            result, {"offload": True, "resultLocation": str(tmp_path / "b")}
+        )
+        assert response["statusCode"] == 500
+        assert not (tmp_path / "a").exists()
+        assert not (tmp_path / "b").exists()
+
+    def test_large_result_without_location(self, result, monkeypatch):
+        monkeypatch.delenv("MORGANA_RESULT_LOCATION", raising=False)
+        monkeypatch.setattr(engine, "MAX_INLINE_BODY_BYTES", 16)
+        response = _result_response(result, {})
+        assert response["statusCode"] == 500
+        assert _result_response(result, {"offload": True})["statusCode"] == 500
+
+
+class TestEncodeBatches:
+    def test_preallocated_arrow_buffer(self, result):
+        table = pa.Table.from_pandas(result.data, preserve_index=False)
+        for compression in ["none", "lz4"]:
+            preallocated = encode_batches(
+                table.schema, table.to_batches(), "arrow", compression
+            )
+            streamed = encode_batches(
+                table.schema, iter(table.to_batches()), "arrow", compression
+            )
+            assert preallocated.equals(streamed)
+            assert ipc_to_table(preallocated).equals(table)
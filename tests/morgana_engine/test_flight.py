@@ -0,0 +1,39 @@
+import json
+import pytest
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.adapters.repository.connection import FSConnection
+
+flight = pytest.importorskip("pyarrow.flight")
+
+from morgana_engine.flight import QueryFlightServer  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    server = QueryFlightServer("tests/data", "FS", "grpc://127.0.0.1:0")
+    client = flight.connect(f"grpc://127.0.0.1:{server.port}")
+    yield client
+    client.close()
+    server.shutdown()
+
+
+class TestQueryFlightServer:
+    def test_query_ticket(self, client):
+        query = "SELECT id, nome, capacidade_instalada FROM usinas_part_id"
+        expected = parse(lex(query), FSConnection("tests/data")).data
+        reader = client.do_get(flight.Ticket(query.encode("utf-8")))
+        df = reader.read_all().to_pandas()
+        assert df.equals(expected.reset_index(drop=True))
+
+    def test_json_ticket(self, client):
+        query = "SELECT id, nome FROM usinas WHERE id < 10"
+        expected = parse(lex(query), FSConnection("tests/data")).data
+        ticket = json.dumps({"query": query, "database": "tests/data"})
+        reader = client.do_get(flight.Ticket(ticket.encode("utf-8")))
+        df = reader.read_all().to_pandas()
+        assert df.equals(expected.reset_index(drop=True))
+
+    def test_invalid_query(self, client):
+        with pytest.raises(flight.FlightError):
+            client.do_get(flight.Ticket(b"DELETE FROM usinas")).read_all()
@@ -0,0 +1,70 @@
+import asyncio
+import base64
+import http.client
+import json
+from morgana_engine.server import QueryServer
+from morgana_engine.services.interpreters.lex import lex
+from morgana_engine.services.interpreters.parse import parse
+from morgana_engine.adapters.repository.connection import FSConnection
+from morgana_engine.utils.ipc import ipc_to_table
+
+
+def _requests(port: int, requests: list[tuple[str, bytes]]) -> list:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    responses = []
+    try:
+        for method, body in requests:
+            conn.request(method, "/", body=body)
+            r = conn.getresponse()
+            responses.append((r.status, json.loads(r.read())))
+    finally:
+        conn.close()
+    return responses
+
+
+def _serve(requests: list[tuple[str, bytes]], **kwargs) -> list:
+    async def run():
+        server = QueryServer(port=0, **kwargs)
+        await server.start()
+        try:
+            return await asyncio.to_thread(_requests, server.port, requests)
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+class TestQueryServer:
+    def test_query(self):
+        query = "SELECT id, nome FROM usinas WHERE id < 10"
+        payload = {"database": "tests/data", "connection": "FS", "query": query}
+        # The same connection is kept alive between the requests
+        responses = _serve(
+            [("GET", b""), ("POST", json.dumps(payload).encode("utf-8"))] * 2
+        )
+        assert [status for status, _ in responses] == [200] * 4
+        expected = parse(lex(query), FSConnection("tests/data")).data
+        for _, response in responses[1::2]:
+            assert response["statusCode"] == 200
+            df = ipc_to_table(base64.b64decode(response["body"])).to_pandas()
+            assert df.equals(expected.reset_index(drop=True))
+
+    def test_errors(self):
+        payload = {"database": "tests/data", "connection": "FS", "query": "x"}
+        responses = _serve(
+            [
+                ("POST", b"{"),
+                ("POST", b"[]"),
+                ("PUT", b""),
+                ("POST", json.dumps(payload).encode("utf-8")),
+            ]
+        )
+        assert [status for status, _ in responses] == [400, 400, 405, 500]
+
+    def test_endpoint_exception(self):
+        def endpoint(request_body: dict) -> dict:
+            raise RuntimeError("failure")
+
+        [(status, response)] = _serve([("POST", b"{}")], endpoint=endpoint)
+        assert status == 500
+        assert response["message"] == "failure"